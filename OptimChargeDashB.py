@@ -1,57 +1,110 @@
 import streamlit as st
 import pandas as pd
 import folium
-from folium.plugins import MarkerCluster, HeatMap
-from streamlit_folium import folium_static
+from folium.plugins import HeatMap
 import os
+from data_service import DataService, enable_copy_on_write
+from emissions_grid import EMISSION_DTYPES, aggregate_emissions, heatmap_points
+from ingest import cached_columns, dataset_version, load_columns, load_numeric_columns
+from map_layers import render_map_html, station_layer
+from render_cache import RenderCache
+from station_index import StationIndex
+from town_search import TownIndex, normalize
 
 # --- Page Configuration ---
 st.set_page_config(page_title="OptimCharge Dashboard", layout="wide")
+enable_copy_on_write()
 
 # --- Helper Functions ---
-@st.cache_data
-def load_data(file_path, required_columns=None):
-    """Loads data from an Excel file and checks required columns."""
+@st.cache_resource
+def get_data_service():
+    """Returns the read-only table store shared by every session on this server."""
+    return DataService()
+
+
+def load_data(file_path, required_columns=None, usecols=None):
+    """Returns a shared read-only view of an Excel file's columnar cache after checking required columns."""
     if not os.path.exists(file_path):
         st.error(f"File not found: {file_path}")
         return pd.DataFrame()
     try:
-        data = pd.read_excel(file_path)
         if required_columns:
-            missing_cols = [col for col in required_columns if col not in data.columns]
+            available_cols = cached_columns(file_path)
+            missing_cols = [col for col in required_columns if col not in available_cols]
             if missing_cols:
                 st.error(f"Missing columns in {file_path}: {', '.join(missing_cols)}")
                 return pd.DataFrame()
-            data = data.dropna(subset=required_columns)
-        return data
+
+        def load():
+            data = load_columns(file_path, usecols)
+            return data.dropna(subset=required_columns) if required_columns else data
+
+        key = (file_path, tuple(required_columns or ()), tuple(usecols or ()))
+        return get_data_service().table(key, dataset_version(file_path), load)
     except Exception as e:
         st.error(f"Error loading data from {file_path}: {e}")
         return pd.DataFrame()
 
-def display_station_map(data, location=[-1.95, 30.06], zoom_start=8):
+def load_emissions_data(file_path):
+    """Returns a shared read-only view of the emission columns, streamed into a numeric columnar cache."""
+    if not os.path.exists(file_path):
+        st.error(f"File not found: {file_path}")
+        return pd.DataFrame()
+    try:
+        return get_data_service().table((file_path, "emissions"),
+                                        dataset_version(file_path, columns=EMISSION_DTYPES),
+                                        lambda: load_numeric_columns(file_path, EMISSION_DTYPES))
+    except KeyError as e:
+        st.error(e.args[0])
+    except Exception as e:
+        st.error(f"Error loading data from {file_path}: {e}")
+    return pd.DataFrame()
+
+@st.cache_resource
+def get_render_cache():
+    """Returns the rendered-map cache shared by every session on this server."""
+    return RenderCache()
+
+def display_map(build_map, cache_key=None, width=800, height=500):
+    """Embeds a Folium map, reusing its rendered HTML from the shared cache when `cache_key` is given."""
+    if cache_key is None:
+        html = render_map_html(build_map())
+    else:
+        html = get_render_cache().get_or_render(cache_key, lambda: render_map_html(build_map()))
+    st.components.v1.html(html, width=width, height=height + 10)
+
+def display_station_map(data, cache_key=None, location=[-1.95, 30.06], zoom_start=8):
     """Displays a Folium map with charging stations."""
-    m = folium.Map(location=location, zoom_start=zoom_start)
-    marker_cluster = MarkerCluster().add_to(m)
-
-    for _, row in data.iterrows():
-        color = "green" if row["Status"] == "Operational" else "orange"
-        folium.Marker(
-            [row['Latitude'], row['Longitude']],
-            popup=f"Station: {row['Name']}<br>Status: {row['Status']}",
-            icon=folium.Icon(color=color)
-        ).add_to(marker_cluster)
-
-    folium_static(m, width=800, height=500)
-
-def display_emission_heatmap(data):
-    """Displays a heatmap of emissions."""
-    m = folium.Map(location=[-1.95, 30.06], zoom_start=7)
-    heat_data = [
-        [row['latitude'], row['longitude'], row['CarbonMonoxide_H2O_column_number_density']]
-        for _, row in data.iterrows()
-    ]
-    HeatMap(heat_data).add_to(m)
-    folium_static(m, width=800, height=500)
+    def build_map():
+        m = folium.Map(location=location, zoom_start=zoom_start)
+        station_layer(data, [("Station", "Name"), ("Status", "Status")]).add_to(m)
+        return m
+
+    display_map(build_map, cache_key)
+
+@st.cache_resource
+def build_station_index(_data, data_version):
+    """Builds the station spatial index once per dataset version."""
+    return StationIndex.from_frame(_data, version=data_version)
+
+@st.cache_resource
+def build_town_index(_data, data_version):
+    """Builds the town search index once per dataset version."""
+    return TownIndex(_data["Address"])
+
+@st.cache_data
+def build_emission_grid(_data, data_version, resolution=0.05, how="mean"):
+    """Aggregates emissions onto a grid, cached per (dataset version, resolution, aggregation)."""
+    return aggregate_emissions(_data, resolution, how)
+
+def display_emission_heatmap(grid_data, cache_key=None):
+    """Displays a heatmap of emissions built from pre-aggregated grid cells."""
+    def build_map():
+        m = folium.Map(location=[-1.95, 30.06], zoom_start=7)
+        HeatMap(heatmap_points(grid_data)).add_to(m)
+        return m
+
+    display_map(build_map, cache_key)
 
 # --- Data Loading ---
 # File paths
@@ -60,7 +113,7 @@ charging_data_path = r"C:/Users/robyn/OneDrive/Rwanda Charging Stations/missing
 population_data_path = r"C:/Users/robyn/OneDrive/Rwanda Charging Stations/young_pop.xlsx"
 
 # Loading data with required columns
-emissions_data = load_data(emissions_data_path, ["latitude", "longitude", "CarbonMonoxide_H2O_column_number_density"])
+emissions_data = load_emissions_data(emissions_data_path)
 charging_data = load_data(charging_data_path, ["Latitude", "Longitude", "Status", "Name", "Address"])
 population_data = load_data(population_data_path, ["Latitude", "Longitude", "Total_Young_Population"])
 
@@ -115,7 +168,9 @@ else:
             st.error("Emissions data not found.")
         else:
             st.write("### Visualizing Carbon Monoxide Emissions")
-            display_emission_heatmap(emissions_data)
+            emissions_version = dataset_version(emissions_data_path, columns=EMISSION_DTYPES)
+            display_emission_heatmap(build_emission_grid(emissions_data, emissions_version),
+                                     ("emissions", emissions_version))
 
     # --- EV Charging Stations ---
     with tab2:
@@ -123,31 +178,41 @@ else:
         if charging_data.empty:
             st.error("Charging station data not found.")
         else:
+            charging_version = dataset_version(charging_data_path)
             if user_role == "Client":
                 st.write("Filter stations by status:")
-                status_filter = st.selectbox("Station Status", ["All", "Operational", "Under Construction"])
+                status_filter = st.selectbox("Station Status", ["All", "Operational", "Under-Construction"])
                 filtered_data = charging_data if status_filter == "All" else charging_data[charging_data["Status"] == status_filter]
                 st.write(filtered_data[["Name", "Status", "Latitude", "Longitude"]])
-                display_station_map(filtered_data)
+                display_station_map(filtered_data, ("stations", charging_version, status_filter, None))
             elif user_role == "EV User":
                 town = st.text_input("Enter your town to locate nearby stations:")
                 if town:
-                    stations_in_town = charging_data[charging_data["Address"].str.contains(town, case=False, na=False)]
+                    town_index = build_town_index(charging_data, charging_version)
+                    suggestions = town_index.suggest(town, limit=5)
+                    if suggestions:
+                        st.caption("Suggestions: " + ", ".join(suggestions))
+                    rows, match = town_index.search(town)
+                    stations_in_town = charging_data.iloc[rows]
                     if stations_in_town.empty:
                         st.warning("No charging stations found in your town.")
                     else:
+                        if match == "fuzzy":
+                            st.info("No exact match found; showing the closest town names.")
                         st.write("Stations in your town:")
-                        display_station_map(stations_in_town)
+                        display_station_map(stations_in_town, ("stations", charging_version, None, normalize(town)))
 
                 start_lat = st.number_input("Enter your latitude:", format="%.6f")
                 start_lon = st.number_input("Enter your longitude:", format="%.6f")
                 if st.button("Find Nearest Station"):
-                    charging_data["Distance"] = ((charging_data["Latitude"] - start_lat) ** 2 + 
-                                                 (charging_data["Longitude"] - start_lon) ** 2) ** 0.5
-                    nearest_station = charging_data.loc[charging_data["Distance"].idxmin()]
-                    st.success(f"Nearest Station: {nearest_station['Name']} ({nearest_station['Status']})")
+                    station_index = build_station_index(charging_data, charging_version)
+                    positions, distances = station_index.nearest(start_lat, start_lon)
+                    nearest_station = charging_data.iloc[positions[0]]
+                    st.success(f"Nearest Station: {nearest_station['Name']} ({nearest_station['Status']}), "
+                               f"{distances[0]:.1f} km away")
                     st.write(nearest_station[["Name", "Address", "Latitude", "Longitude"]])
-                    display_station_map(charging_data[charging_data["Name"] == nearest_station["Name"]])
+                    display_station_map(charging_data.iloc[positions[:1]],
+                                        ("nearest", charging_version, None, None, int(positions[0])))
 
     # --- Population Data ---
     with tab3:
@@ -1,69 +1,533 @@
 import streamlit as st
 import pandas as pd
-import folium
-from folium.plugins import MarkerCluster, HeatMap
-from streamlit_folium import folium_static
-import os
-import matplotlib.pyplot as plt
+from analytics import DIMENSIONS, MEASURES, RevenueCube
+from batch_lookup import iter_nearest, read_origins, write_results
+from dashboard_core import (HEATMAP_ZOOM, MAP_CENTER, POPULATION_COLUMNS, POPULATION_ZOOM, STATION_COLUMNS,
+                            STATION_ZOOM, STATUS_OPTIONS, build_heatmap, build_heatmap_animation, check_columns,
+                            filter_by_status, find_nearest_station, heatmap_layer, level_of_detail,
+                            load_emissions_table, load_table, map_viewport, new_station_store, population_features,
+                            population_index, render_map, search_towns, station_features, viewport_positions)
+from data_service import DataService, enable_copy_on_write
+from emission_periods import MAX_FRAMES, PeriodAggregates, find_period_column
+from emissions_grid import AGGREGATIONS, EMISSION_DTYPES, GRID_TYPES, STREAMING_AGGREGATIONS, aggregate_emissions
+from ingest import dataset_version, iter_numeric_chunks, numeric_column_files, source_columns
+from perf import ENABLED_ENV, RERUN_SPAN, recorder
+from render_cache import RenderCache, viewport_key
+from telemetry import TelemetryFeed, TelemetryState, state_codes
+from tiles import ensure_pyramid, load_tiles, pyramid_zoom
+from town_search import normalize
+
+# Folium (map rendering), streamlit-folium and the SciPy-backed modules (station_store, placement, catchments,
+# scenarios, routing) are imported inside the functions that use them, so the login screen and each tab only pay for
+# what they show.
 
 # --- Page Configuration ---
 st.set_page_config(page_title="Green Current Dashboard", layout="wide")
+enable_copy_on_write()
+recorder.begin_rerun(role=str(st.session_state.get("user_type")), tab=str(st.session_state.get("tab")))
+
+# Simulated telemetry: events/s across all connectors, and seconds between live-panel refreshes.
+TELEMETRY_RATE = 200
+TELEMETRY_REFRESH_S = 2
+# Road networks for drive-time nearest stations, first found wins (OSMnx GraphML or an OpenStreetMap extract).
+ROAD_NETWORK_PATHS = ("rwanda_roads.graphml", "rwanda-latest.osm.pbf")
+# Rows of the station table and bars of the population chart, taken from the features in the map's viewport.
+MAX_TABLE_ROWS = 1_000
+MAX_CHART_BARS = 50
 
 # --- Helper Functions ---
-@st.cache_data
-def load_data(file_path, required_columns=None):
-    """Loads data from an Excel file and checks required columns."""
-    if not os.path.exists(file_path):
-        st.error(f"File not found: {file_path}")
-        return pd.DataFrame()
+@st.cache_resource
+def get_data_service():
+    """Returns the read-only table store shared by every session on this server."""
+    return DataService()
+
+
+def load_data(file_path, required_columns=None, usecols=None):
+    """Returns a shared read-only view of an Excel file's columnar cache after checking required columns."""
+    try:
+        return load_table(get_data_service(), file_path, required_columns, usecols)
+    except (FileNotFoundError, KeyError) as e:
+        st.error(e.args[0])
+    except Exception as e:
+        st.error(f"Error loading data from {file_path}: {e}")
+    return pd.DataFrame()
+
+
+def load_emissions_data(file_path):
+    """Returns a shared read-only view of the emission columns, streamed into a numeric columnar cache."""
+    try:
+        return load_emissions_table(get_data_service(), file_path)
+    except (FileNotFoundError, KeyError) as e:
+        st.error(e.args[0])
+    except Exception as e:
+        st.error(f"Error loading data from {file_path}: {e}")
+    return pd.DataFrame()
+
+
+@st.cache_resource
+def get_render_cache():
+    """Returns the rendered-map cache shared by every session on this server."""
+    return RenderCache()
+
+
+def lazy_expander(label, key, render):
+    """An expander whose body, `render()`, only runs while it is open; opening or closing it reruns the script."""
+    section = st.expander(label, key=key, on_change="rerun")
+    if section.open:
+        with section:
+            render()
+
+
+def display_map(build_map, cache_key=None, width=800, height=500):
+    """Embeds a Folium map, reusing its rendered HTML from the shared cache when `cache_key` is given."""
+    if cache_key is None:
+        html = render_map(build_map())
+    else:
+        render_cache = get_render_cache()
+        html = render_cache.get(cache_key)
+        recorder.count("render_cache", hit=html is not None)
+        if html is None:
+            html = render_map(build_map())
+            render_cache.put(cache_key, html)
+    with recorder.span("embed_map", bytes=len(html)):
+        st.components.v1.html(html, width=width, height=height + 10)
+
+
+def get_st_folium():
+    """Returns streamlit-folium's st_folium, or None when it is not installed."""
+    try:
+        from streamlit_folium import st_folium
+    except ImportError:
+        return None
+    return st_folium
+
+
+def current_viewport(key, location, zoom_start):
+    """(bounds, zoom) the map under `key` last reported, or its initial view."""
+    return map_viewport(st.session_state.get(key) if get_st_folium() else None, location, zoom_start)
+
+
+def embed_viewport_layer(build_layer, key, bounds, zoom, cache_key=None, location=MAP_CENTER, zoom_start=STATION_ZOOM,
+                         name="Layer", assets=None, width=800, height=500, **attributes):
+    """Embeds a map with the layer `build_layer()` makes for the viewport (bounds, zoom).
+
+    The map reports its bounds and zoom through st_folium under `key`, and
+    each pan or zoom reruns the script to send the layer for the new view;
+    the base map is unchanged, so the browser keeps its place. With
+    `cache_key`, each viewport's layer script is kept in the shared render
+    cache under a viewport key of it, so StationStore drops it along with the
+    map. `assets` is the layer's class when it needs other JavaScript than
+    the marker-cluster layers. Without streamlit-folium the layer for the
+    initial view is embedded as static HTML under `cache_key`.
+    """
+    import folium
+    from folium.plugins import MarkerCluster
+    from map_layers import ScriptLayer, detached_script
+    st_folium = get_st_folium()
+    if st_folium is None:
+        def build_map():
+            m = folium.Map(location=location, zoom_start=zoom_start)
+            build_layer().add_to(m)
+            return m
+        display_map(build_map, cache_key, width, height)
+        return
+    script = None
+    if cache_key is not None:
+        render_cache = get_render_cache()
+        layer_key = viewport_key(cache_key, bounds, zoom)
+        script = render_cache.get(layer_key)
+        recorder.count("render_cache", hit=script is not None)
+    if script is None:
+        script = detached_script(build_layer())
+        if cache_key is not None:
+            render_cache.put(layer_key, script)
+    group = folium.FeatureGroup(name=name)
+    ScriptLayer(script, assets or MarkerCluster).add_to(group)
+    with recorder.span("embed_map", bytes=len(script), **attributes):
+        st_folium(folium.Map(location=location, zoom_start=zoom_start), key=key, width=width, height=height,
+                  returned_objects=["bounds", "zoom"], feature_group_to_add=group)
+
+
+def display_viewport_map(locate, layer_for, key, cache_key=None, location=MAP_CENTER, zoom_start=STATION_ZOOM,
+                         noun="stations"):
+    """Embeds a map of the features in the reported viewport, and returns their positions.
+
+    `locate(bounds)` returns the positions of the features inside the bounds
+    and `layer_for(positions, zoom)` builds their layer (points or clusters,
+    by level of detail).
+    """
+    bounds, zoom = current_viewport(key, location, zoom_start)
+    positions = locate(bounds)
+    detail = level_of_detail(len(positions), zoom)
+    if detail == "clusters":
+        st.caption(f"{len(positions):,} {noun} in view, grouped by area; zoom in to see them individually.")
+    embed_viewport_layer(lambda: layer_for(positions, zoom), key, bounds, zoom, cache_key, location, zoom_start,
+                         name=noun.capitalize(), detail=detail)
+    return positions
+
+
+@recorder.timed()
+def display_station_map(data, key, cache_key=None, location=MAP_CENTER, zoom_start=STATION_ZOOM, index=None):
+    """Displays a Folium map with detailed charging station information for the stations in view.
+
+    `index` is a StationIndex over `data`; returns the positions in `data` of the stations in view.
+    """
+    lat, lon = data["Latitude"].to_numpy(), data["Longitude"].to_numpy()
+    return display_viewport_map(lambda bounds: viewport_positions(lat, lon, bounds, index),
+                                lambda positions, zoom: station_features(data, positions, zoom), key, cache_key,
+                                location, zoom_start)
+
+
+@st.cache_resource(max_entries=16)
+def get_status_index(_stations, data_version, status):
+    """Builds the spatial index over the stations with one status, once per (station data version, status)."""
+    from station_index import StationIndex
+    return StationIndex.from_frame(_stations)
+
+
+@st.cache_resource(max_entries=4)
+def get_population_index(_data, data_version):
+    """Builds the spatial index over the population areas once per dataset version."""
+    return population_index(_data)
+
+
+def population_map(population_data):
+    """Maps the young population in the viewport and charts its largest areas."""
+    data_version = dataset_version(population_data_path)
+    index, people, provinces = get_population_index(population_data, data_version)
+    positions = display_viewport_map(lambda bounds: viewport_positions(None, None, bounds, index),
+                                     lambda positions, zoom: population_features(index, people, provinces, positions,
+                                                                                 zoom),
+                                     "population_map", ("population", data_version), zoom_start=POPULATION_ZOOM,
+                                     noun="areas")
+    in_view = pd.Series(people[positions], index=provinces[positions], name="Total_Young_Population")
+    if len(in_view) > MAX_CHART_BARS:
+        st.caption(f"The {MAX_CHART_BARS} most populous of {len(in_view):,} areas in view")
+    st.bar_chart(in_view.nlargest(MAX_CHART_BARS))
+
+
+@st.cache_resource
+def get_station_store(file_path, required_columns):
+    """Returns the live station store shared by every session; a background thread applies file edits."""
+    store = new_station_store(file_path, required_columns, render_cache=get_render_cache())
+    store.start()
+    return store
+
+
+@recorder.timed()
+def load_stations(file_path, required_columns):
+    """Returns the current station snapshot (frame, version and indexes), or None when the file is unusable."""
     try:
-        data = pd.read_excel(file_path)
-        if required_columns:
-            missing_cols = [col for col in required_columns if col not in data.columns]
-            if missing_cols:
-                st.error(f"Missing columns in {file_path}: {', '.join(missing_cols)}")
-                return pd.DataFrame()
-            data = data.dropna(subset=required_columns)
-        return data
+        check_columns(file_path, required_columns)
+        store = get_station_store(file_path, tuple(required_columns))
+        store.refresh()
+        return store.snapshot
+    except (FileNotFoundError, KeyError) as e:
+        st.error(e.args[0])
     except Exception as e:
         st.error(f"Error loading data from {file_path}: {e}")
-        return pd.DataFrame()
-
-
-def display_station_map(data, location=[-1.95, 30.06], zoom_start=8):
-    """Displays a Folium map with detailed charging station information."""
-    m = folium.Map(location=location, zoom_start=zoom_start)
-    marker_cluster = MarkerCluster().add_to(m)
-
-    for _, row in data.iterrows():
-        popup_content = (
-            f"<b>Station:</b> {row['Connector Name']}<br>"
-            f"<b>Status:</b> {row['Status']}<br>"
-            f"<b>Connector Type:</b> {row['Connector Type']}<br>"
-            f"<b>Availability:</b> {row['Charger Availability']}<br>"
-            f"<b>Address:</b> {row['Address']}"
-        )
-        color = "green" if row["Status"] == "Operational" else "orange"
-        folium.Marker(
-            [row['Latitude'], row['Longitude']],
-            popup=popup_content,
-            icon=folium.Icon(color=color)
-        ).add_to(marker_cluster)
-
-    folium_static(m, width=800, height=500)
-
-
-def display_emission_heatmap(data):
-    """Displays a heatmap of emissions."""
-    m = folium.Map(location=[-1.95, 30.06], zoom_start=7)
-    heat_data = [
-        [row['latitude'], row['longitude'], row['CarbonMonoxide_H2O_column_number_density']]
-        for _, row in data.iterrows()
-    ]
-    HeatMap(heat_data).add_to(m)
-    folium_static(m, width=800, height=500)
+    return None
+
+
+@st.cache_resource
+def get_road_graph(file_path):
+    """Loads the road network once per server, from its compiled on-disk cache when the file is unchanged."""
+    from routing import load_road_graph
+    return load_road_graph(file_path)
+
+
+@st.cache_resource
+def get_road_catchments(file_path, _stations, stations_version):
+    """Labels every road node with its fastest station, once per (road network, station geometry) version."""
+    from routing import load_road_catchments
+    return load_road_catchments(get_road_graph(file_path), _stations["Latitude"].to_numpy(),
+                                _stations["Longitude"].to_numpy(), stations_version)
+
+
+@st.cache_data
+def build_emission_grid(_data, data_version, resolution=0.05, how="mean", grid="square"):
+    """Aggregates emissions onto a grid, cached per (dataset version, resolution, aggregation)."""
+    return aggregate_emissions(_data, resolution, how, grid)
+
+
+@st.cache_resource
+def build_emission_tiles(file_path, data_version):
+    """Pre-renders the emission tile pyramid once per dataset version, from the emissions' columnar cache files."""
+    return ensure_pyramid("emissions", data_version[:12], numeric_column_files(file_path, EMISSION_DTYPES))
+
+
+def load_emission_tiles(data_version, bounds, zoom):
+    """Loads only the cached emission tiles that are visible in the viewport."""
+    cells = load_tiles("emissions", data_version[:12], zoom, bounds)
+    return cells.rename(columns={"mean": "value"})
+
+
+@recorder.timed()
+def display_emission_tiles(manifest, data_version, cache_key=None, location=MAP_CENTER, zoom_start=HEATMAP_ZOOM):
+    """Displays the emission heatmap from the pyramid tiles in the reported viewport, at the level for its zoom."""
+    from folium.plugins import HeatMap
+    key = "emission_tiles_map"
+    bounds, zoom = current_viewport(key, location, zoom_start)
+    cells = load_emission_tiles(data_version, bounds, zoom)
+    level = pyramid_zoom(manifest, zoom)
+    st.caption(f"{len(cells):,} cells in view from {int(cells['count'].sum()):,} observations (tile zoom {level})")
+    # One scale for the whole level, so colours stay put while panning.
+    peak = manifest.get("peaks", {}).get(str(level))
+    embed_viewport_layer(lambda: heatmap_layer(cells, peak), key, bounds, zoom, cache_key, location, zoom_start,
+                         name="Emissions", assets=HeatMap, tile_zoom=level)
+
+
+@recorder.timed()
+def display_emission_heatmap(grid_data, cache_key=None, location=MAP_CENTER, zoom_start=HEATMAP_ZOOM):
+    """Displays a heatmap of emissions built from pre-aggregated grid cells."""
+    display_map(lambda: build_heatmap(grid_data, location, zoom_start), cache_key)
+
+
+@st.cache_resource
+def get_period_aggregates(file_path):
+    """Returns the per-period emission aggregates shared by every session on this server."""
+    column, kind = find_period_column(source_columns(file_path))
+    return PeriodAggregates(period_column=column, period_kind=kind)
+
+
+def load_period_aggregates(file_path, data_version):
+    """Brings the shared per-period aggregates up to date, appending only rows added since the last version."""
+    aggregates = get_period_aggregates(file_path)
+    aggregates.refresh(data_version, lambda: iter_numeric_chunks(file_path, aggregates.columns, dropna=False))
+    return aggregates
+
+
+@recorder.timed()
+def display_emission_animation(aggregates, window, how, cache_key=None, location=MAP_CENTER,
+                               zoom_start=HEATMAP_ZOOM):
+    """Animates the precomputed rolling-window aggregates, one HeatMapWithTime frame per period."""
+    def build_map():
+        frames = aggregates.frames(window, how, max_frames=MAX_FRAMES)
+        return build_heatmap_animation(frames, [aggregates.label(period) for period, _ in frames], location,
+                                       zoom_start)
+
+    display_map(build_map, cache_key)
+
+@st.cache_resource
+def get_telemetry_feed(file_path, _stations):
+    """Returns the simulated telemetry feed shared by every session, started on first use."""
+    state = TelemetryState(_stations["Charger ID"], state_codes(_stations["Charger Availability"]))
+    feed = TelemetryFeed(state, rate=TELEMETRY_RATE)
+    feed.start()
+    return feed
+
+
+@st.fragment(run_every=TELEMETRY_REFRESH_S)
+def live_availability(stations):
+    """Shows live connector availability, refreshing on its own with only the rows changed since the last refresh."""
+    feed = get_telemetry_feed(charging_data_path, stations)
+    feed.state.track(stations["Charger ID"], state_codes(stations["Charger Availability"]))
+    stats = feed.stats()
+    counts = feed.state.counts()
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric("Available", counts["Available"])
+    col2.metric("In use", counts["In-Use"])
+    col3.metric("Offline", counts["Offline"])
+    col4.metric("Events/s", f"{stats['events_per_s']:,.0f}")
+    col5.metric("Queue", f"{stats['queue_depth']:,} / {stats['queue_size']:,}")
+    version, changed = feed.state.changes(st.session_state.get("telemetry_version", 0))
+    st.session_state.telemetry_version = version
+    changed = stations[["Charger ID", "Connector Name", "City/Suburb/Town"]].merge(changed, on="Charger ID")
+    st.caption(f"{len(changed):,} connectors updated since the last refresh "
+               f"(simulated feed, {stats['lag_ms']:.1f} ms ingest lag)")
+    st.dataframe(changed, hide_index=True)
+
+
+@st.cache_resource
+def get_revenue_cube(_stations, data_version):
+    """Builds the revenue and utilization rollups once per station-data version."""
+    return RevenueCube(_stations, version=data_version)
+
+
+def revenue_analytics(cube, status_filter):
+    """Charts revenue and utilization rollups, with drill-down into one member of the grouping."""
+    filters = {} if status_filter == "All" else {"Status": status_filter}
+    col1, col2, col3 = st.columns(3)
+    # A filtered dimension is already fixed to one member, so it is not offered for grouping or drilling into.
+    group_by = col1.selectbox("Group by", [dimension for dimension in DIMENSIONS if dimension not in filters])
+    measure = col2.selectbox("Measure", list(MEASURES), format_func=MEASURES.get)
+    member = col3.selectbox(f"Drill into {group_by}", ["(all)"] + cube.members(group_by))
+    if member != "(all)":
+        below = [dimension for dimension in DIMENSIONS if dimension != group_by and dimension not in filters]
+        then_by = st.radio("Then by", below, horizontal=True)
+        table = cube.rollup(by=(then_by,), filters={**filters, group_by: member})
+    else:
+        table = cube.rollup(by=(group_by,), filters=filters)
+    scope = f" ({status_filter} stations)" if filters else ""
+    st.caption(f"{MEASURES[measure]}{scope}, from {len(cube):,} pre-aggregated cells")
+    st.bar_chart(table[measure])
+    st.dataframe(table[["stations", "revenue_rwf", "revenue_zar", "mean_revenue_rwf", "utilization"]])
+
+
+def batch_nearest_lookup(stations, station_index):
+    """Answers nearest-station queries for every row of an uploaded origins file."""
+    uploaded = st.file_uploader("Upload origins (CSV, Parquet or Excel with latitude/longitude columns)",
+                                type=["csv", "parquet", "xlsx"])
+    col1, col2 = st.columns(2)
+    k = col1.number_input("Stations per origin", min_value=1, max_value=10, value=1)
+    file_format = col2.radio("Output format", ["csv", "parquet"], horizontal=True)
+    if uploaded is None:
+        return
+    try:
+        origins = read_origins(uploaded, uploaded.name)
+        data, rows, seconds = write_results(iter_nearest(station_index, stations, origins, k=int(k)), file_format)
+    except ValueError as e:
+        st.error(f"Could not process {uploaded.name}: {e}")
+        return
+    st.metric("Throughput", f"{rows / max(seconds, 1e-9):,.0f} rows/s", f"{rows:,} origins in {seconds:.2f} s")
+    mime = "text/csv" if file_format == "csv" else "application/octet-stream"
+    st.download_button("Download results", data, file_name=f"nearest_stations.{file_format}", mime=mime)
+
+
+@st.cache_data
+def solve_placement(_emissions, _population, _stations, data_versions, method, k, radius_km, spacing_km):
+    """Suggests new station sites, cached per (dataset versions, solver settings)."""
+    from placement import candidate_sites, demand_points, max_coverage, p_median
+    demand = demand_points(_emissions, _population)
+    candidates = candidate_sites(demand, spacing_km)
+    if method == "Maximum coverage":
+        return max_coverage(demand, candidates, _stations, k, radius_km)
+    return p_median(demand, candidates, _stations, k)
+
+
+def placement_suggestions(stations, geometry_version):
+    """Lets clients ask the placement solver for the best new station sites."""
+    from placement import SOLVERS
+    col1, col2, col3, col4 = st.columns(4)
+    method = col1.selectbox("Objective", list(SOLVERS))
+    k = col2.slider("New stations", 1, 30, 5)
+    radius_km = col3.slider("Coverage radius (km)", 2, 50, 10, disabled=method != "Maximum coverage")
+    spacing_km = col4.select_slider("Candidate spacing (km)", [1, 2, 5, 10], value=2)
+    emissions_data = load_emissions_data(emissions_data_path)
+    population_data = load_data(population_data_path, POPULATION_COLUMNS)
+    if emissions_data.empty:
+        st.error("Emissions data is needed to weight demand.")
+        return
+    data_versions = (geometry_version, dataset_version(emissions_data_path, columns=EMISSION_DTYPES),
+                     dataset_version(population_data_path) if not population_data.empty else None)
+    sites = solve_placement(emissions_data, population_data, stations, data_versions,
+                            method, k, radius_km, spacing_km)
+    if sites.empty:
+        st.info("Existing stations already serve all demand within these settings.")
+        return
+    objective = "Demand covered" if method == "Maximum coverage" else "Mean distance to a station (km)"
+    st.write(sites.rename(columns={"objective": objective}))
+    proposed = pd.DataFrame({"Connector Name": [f"Proposed site {rank}" for rank in sites["rank"]],
+                             "Status": "Proposed", "Latitude": sites["latitude"], "Longitude": sites["longitude"]})
+    display_station_map(proposed, "placement_map", ("placement", data_versions, method, k, radius_km, spacing_km))
+
+
+@st.cache_data
+def run_scenarios(_emissions, _population, _stations, data_versions, radius_km, combination_size):
+    """Ranks build-out scenarios, cached per (dataset versions, radius, combination size)."""
+    from placement import demand_points
+    from scenarios import combination_scenarios, evaluate_scenarios, standard_scenarios
+    demand = demand_points(_emissions, _population)
+    scenarios = standard_scenarios(_stations)
+    if combination_size:
+        scenarios.update(combination_scenarios(_stations, size=combination_size))
+    return evaluate_scenarios(demand, _stations, scenarios, radius_km)
+
+
+def scenario_comparison(stations, charging_version):
+    """Lets clients compare coverage and projected revenue of pipeline build-out scenarios."""
+    col1, col2 = st.columns(2)
+    radius_km = col1.slider("Service radius (km)", 2, 50, 10, key="scenario_radius")
+    combination_size = col2.selectbox("Also try every combination of N pipeline sites", [0, 1, 2, 3], index=2)
+    emissions_data = load_emissions_data(emissions_data_path)
+    population_data = load_data(population_data_path, POPULATION_COLUMNS)
+    if emissions_data.empty:
+        st.error("Emissions data is needed to weight demand.")
+        return
+    data_versions = (charging_version, dataset_version(emissions_data_path, columns=EMISSION_DTYPES),
+                     dataset_version(population_data_path) if not population_data.empty else None)
+    ranked = run_scenarios(emissions_data, population_data, stations.reset_index(drop=True), data_versions,
+                           radius_km, combination_size)
+    st.caption(f"{len(ranked):,} scenarios ranked by demand covered within {radius_km} km")
+    st.dataframe(ranked, hide_index=True)
+    st.bar_chart(ranked.head(15).set_index("scenario")["incremental_revenue_rwf"])
+
+
+# --- Performance Panel ---
+def performance_panel():
+    """Admin view of the recorded spans: per-span percentiles, cache hit rates, recent reruns and trace exports."""
+    recorder.enabled = st.toggle("Record spans", value=recorder.enabled,
+                                 help=f"Records for every session on this server; set {ENABLED_ENV}=1 to record "
+                                      "from startup.")
+    spans = recorder.spans()
+    reruns = [span for span in spans if span.name == RERUN_SPAN]
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Buffered spans", f"{len(spans):,} / {recorder.capacity:,}")
+    col2.metric("Recorded spans", f"{recorder.recorded:,}")
+    col3.metric("Reruns", f"{len(reruns):,}")
+    if not spans:
+        st.info("No spans recorded yet. Switch recording on and use the other tabs.")
+        return
+
+    st.subheader("Span durations")
+    st.dataframe(recorder.summary(), hide_index=True)
+
+    st.subheader("Caches")
+    st.caption("Hits and misses while recording")
+    st.dataframe(recorder.cache_counts(), hide_index=True)
+    render_stats, data_stats = get_render_cache().stats(), get_data_service().stats()
+    st.caption("Process totals")
+    st.dataframe(pd.DataFrame([
+        {"cache": "render_cache", "hits": render_stats["hits"], "misses": render_stats["misses"],
+         "entries": render_stats["entries"], "bytes": render_stats["bytes"]},
+        {"cache": "data_service", "hits": data_stats["hits"], "misses": data_stats["loads"],
+         "entries": len(data_stats["tables"]), "bytes": sum(table["bytes"] for table in data_stats["tables"])},
+    ]), hide_index=True)
+
+    st.subheader("Recent reruns")
+    recent = reruns[-20:][::-1]
+    st.dataframe(pd.DataFrame({"started": pd.to_datetime([span.start_ns for span in recent], unit="ns"),
+                               "ms": [span.duration_ns / 1e6 for span in recent],
+                               "role": [span.attributes.get("role") for span in recent],
+                               "tab": [span.attributes.get("tab") for span in recent]}), hide_index=True)
+
+    col1, col2, col3 = st.columns(3)
+    col1.download_button("Download spans (JSON)", recorder.export_json, file_name="optimcharge_spans.json",
+                         mime="application/json")
+    col2.download_button("Download trace (OTLP/JSON)", recorder.export_otlp, file_name="optimcharge_trace.otlp.json",
+                         mime="application/json")
+    if col3.button("Clear recorded spans"):
+        recorder.clear()
+        st.rerun()
+
 
 # --- Information for Environmental Impact ---
+@st.cache_data
+def station_catchments(_stations, _cells, _population, _station_index, data_versions, radius_km):
+    """Joins emission cells and young population to their nearest stations, cached per (dataset versions, radius)."""
+    from catchments import station_demand
+    return station_demand(_stations, _cells, _population, _station_index, radius_km)
+
+
+def demand_per_station(population_data):
+    """Shows each station's catchment demand, served population and emission exposure."""
+    station_snapshot = load_stations(charging_data_path, STATION_COLUMNS)
+    emissions_data = load_emissions_data(emissions_data_path)
+    if station_snapshot is None or emissions_data.empty:
+        st.info("Station and emissions data are needed to relate population to stations.")
+        return
+    radius_km = st.slider("Service radius (km)", 2, 50, 10, key="catchment_radius")
+    emissions_version = dataset_version(emissions_data_path, columns=EMISSION_DTYPES)
+    cells = build_emission_grid(emissions_data, emissions_version)
+    data_versions = (station_snapshot.version, emissions_version, dataset_version(population_data_path))
+    table = station_catchments(station_snapshot.frame, cells, population_data, station_snapshot.index, data_versions,
+                               radius_km)
+    served, total = table["served_population"].sum(), table["catchment_population"].sum()
+    st.caption(f"{served / total:.0%} of the young population lives within {radius_km} km of a station")
+    st.dataframe(table.sort_values("demand_share", ascending=False), hide_index=True)
+    st.bar_chart(table.groupby("Connector Name")["served_population"].sum().nlargest(15))
+
+
 def client_environmental_impact():
     st.markdown("### Key Considerations for EV Placement Companies")
     st.markdown("""
@@ -108,13 +572,8 @@ emissions_data_path = (r"emmissions .xlsx")
 charging_data_path = (r"Charging_Stations.xlsx")
 population_data_path = (r"young_pop.xlsx")
 
-# Loading data with required columns
-emissions_data = load_data(emissions_data_path, ["latitude", "longitude", "CarbonMonoxide_H2O_column_number_density"])
-charging_data = load_data(charging_data_path, [
-    "Latitude", "Longitude", "Status", "Connector Name", "Address",
-    "Connector Type", "City/Suburb/Town", "Sales Revenue (RWF)", "Charger Availability"
-])
-population_data = load_data(population_data_path, ["Latitude", "Longitude", "Total_Young_Population"])
+# Each dataset (with the required columns in dashboard_core) is loaded by the first tab that shows it, not
+# before login.
 
 # --- Authentication ---
 if "logged_in" not in st.session_state:
@@ -128,7 +587,7 @@ if not st.session_state.logged_in:
         Log in to access tailored features.
     """)
     st.sidebar.header("Login")
-    user_type = st.sidebar.selectbox("Select User Type", ["Client", "EV User"])
+    user_type = st.sidebar.selectbox("Select User Type", ["Client", "EV User", "Admin"])
     username = st.sidebar.text_input("Username")
     password = st.sidebar.text_input("Password", type="password")
     login_button = st.sidebar.button("Login")
@@ -142,6 +601,10 @@ if not st.session_state.logged_in:
             st.session_state.logged_in = True
             st.session_state.user_type = "EV User"
             st.sidebar.success("Welcome, EV User!")
+        elif username == "admin" and password == "admin123" and user_type == "Admin":
+            st.session_state.logged_in = True
+            st.session_state.user_type = "Admin"
+            st.sidebar.success("Welcome, Admin!")
         else:
             st.sidebar.error("Invalid credentials.")
 else:
@@ -158,59 +621,167 @@ else:
     st.markdown(f"Welcome, **{user_role}**! Explore tailored insights.")
 
     # --- Tabs ---
-    tab1, tab2, tab3 = st.tabs(["🌍 Environmental Impact", "⚡ EV Charging Stations", "📊 Population Data"])
+    # Rerunning on tab change lets only the open tab's body run (and load its data and build its map).
+    # Admins see the client views plus the Performance tab.
+    tab_labels = ["🌍 Environmental Impact", "⚡ EV Charging Stations", "📊 Population Data"]
+    if user_role == "Admin":
+        tab_labels.append("⏱️ Performance")
+    tab1, tab2, tab3, *admin_tabs = st.tabs(tab_labels, key="tab", on_change="rerun")
 
     # --- Environmental Impact ---
-    with tab1:
-        st.header("Environmental Impact")
-        if user_role == "Client":
-            client_environmental_impact()
-        elif user_role == "EV User":
-            ev_user_environmental_impact()
-        if emissions_data.empty:
-            st.error("Emissions data not found.")
-        else:
-            st.write("### Emissions Heatmap")
-            display_emission_heatmap(emissions_data)
-
-    # --- EV Charging Stations ---
-    with tab2:
-        st.header("EV Charging Stations")
-        if charging_data.empty:
-            st.error("Charging station data not found.")
-        else:
-            if user_role == "Client":
-                st.write("Filter stations by status:")
-                status_filter = st.selectbox("Station Status", ["All", "Operational", "Under Construction","Planned","Awaiting Contract","Pending Site Visit"])
-                filtered_data = charging_data if status_filter == "All" else charging_data[charging_data["Status"] == status_filter]
-                st.write(filtered_data[["Connector Name", "Status", "Latitude", "Longitude", "Sales Revenue (RWF)"]])
-                display_station_map(filtered_data)
+    if tab1.open:
+        with tab1:
+            st.header("Environmental Impact")
+            if user_role in ("Client", "Admin"):
+                client_environmental_impact()
             elif user_role == "EV User":
-                town = st.text_input("Enter your town to locate nearby stations:")
-                if town:
-                    stations_in_town = charging_data[charging_data["City/Suburb/Town"].str.contains(town, case=False, na=False)]
-                    if stations_in_town.empty:
-                        st.warning("No charging stations found in your town.")
+                ev_user_environmental_impact()
+            emissions_data = load_emissions_data(emissions_data_path)
+            if emissions_data.empty:
+                st.error("Emissions data not found.")
+            else:
+                st.write("### Emissions Heatmap")
+                emissions_version = dataset_version(emissions_data_path, columns=EMISSION_DTYPES)
+                heatmap_source = st.radio("Heatmap source", ["Tile pyramid", "Custom grid", "Over time"],
+                                          horizontal=True)
+                if heatmap_source == "Tile pyramid":
+                    manifest = build_emission_tiles(emissions_data_path, emissions_version)
+                    emission_grid = None
+                    display_emission_tiles(manifest, emissions_version,
+                                           ("emissions", emissions_version, heatmap_source))
+                elif heatmap_source == "Custom grid":
+                    col1, col2, col3 = st.columns(3)
+                    resolution = col1.select_slider("Grid resolution (degrees)", [0.01, 0.02, 0.05, 0.1, 0.25],
+                                                    value=0.05)
+                    aggregation = col2.selectbox("Aggregation", AGGREGATIONS)
+                    grid_type = col3.selectbox("Grid type", GRID_TYPES)
+                    emission_grid = build_emission_grid(emissions_data, emissions_version,
+                                                        resolution, aggregation, grid_type)
+                    heatmap_key = ("emissions", emissions_version, heatmap_source, resolution, aggregation, grid_type)
+                else:
+                    aggregates = load_period_aggregates(emissions_data_path, emissions_version)
+                    col1, col2, col3 = st.columns(3)
+                    window = col1.slider("Rolling window (periods)", 1, 12, 4)
+                    aggregation = col2.selectbox("Aggregation", STREAMING_AGGREGATIONS, key="period_aggregation")
+                    animate = col3.toggle("Animate")
+                    emission_grid = None
+                    if animate:
+                        st.caption(f"{len(aggregates)} periods, rolling over {window}")
+                        heatmap_key = ("emissions", emissions_version, heatmap_source, window, aggregation)
+                        display_emission_animation(aggregates, window, aggregation, heatmap_key)
                     else:
-                        st.write("Stations in your town:")
-                        display_station_map(stations_in_town)
-
-                start_lat = st.number_input("Enter your latitude:", format="%.6f")
-                start_lon = st.number_input("Enter your longitude:", format="%.6f")
-                if st.button("Find Nearest Station"):
-                    charging_data["Distance"] = ((charging_data["Latitude"] - start_lat) ** 2 +
-                                                 (charging_data["Longitude"] - start_lon) ** 2) ** 0.5
-                    nearest_station = charging_data.loc[charging_data["Distance"].idxmin()]
-                    st.success(f"Nearest Station: {nearest_station['Connector Name']} ({nearest_station['Status']})")
-                    st.write(nearest_station[["Connector Name", "Address", "Latitude", "Longitude"]])
-                    display_station_map(charging_data[charging_data["Connector Name"] == nearest_station["Connector Name"]])
+                        periods = aggregates.periods
+                        period = st.select_slider("Period", periods, value=periods[-1], format_func=aggregates.label)
+                        emission_grid = aggregates.frame(period, window, aggregation)
+                        heatmap_key = ("emissions", emissions_version, heatmap_source, period, window, aggregation)
+                if emission_grid is not None:
+                    st.caption(f"{len(emission_grid):,} grid cells from "
+                               f"{int(emission_grid['count'].sum()):,} observations")
+                    display_emission_heatmap(emission_grid, heatmap_key)
+
+    # --- EV Charging Stations ---
+    if tab2.open:
+        with tab2:
+            st.header("EV Charging Stations")
+            station_snapshot = load_stations(charging_data_path, STATION_COLUMNS)
+            if station_snapshot is None or station_snapshot.frame.empty:
+                st.error("Charging station data not found.")
+            else:
+                from station_store import nearest_map_key, station_map_key
+                charging_data = station_snapshot.frame
+                charging_version = station_snapshot.version
+                with st.expander("Live availability", expanded=True):
+                    live_availability(charging_data)
+                if user_role in ("Client", "Admin"):
+                    st.write("Filter stations by status:")
+                    status_filter = st.selectbox("Station Status", STATUS_OPTIONS)
+                    filtered_data = filter_by_status(charging_data, status_filter)
+                    station_table = st.container()
+                    in_view = display_station_map(filtered_data, "station_map", station_map_key(status=status_filter),
+                                                  index=station_snapshot.index if status_filter == "All" else
+                                                  get_status_index(filtered_data, charging_version, status_filter))
+                    if len(in_view) > MAX_TABLE_ROWS:
+                        station_table.caption(f"First {MAX_TABLE_ROWS:,} of {len(in_view):,} stations in view")
+                    station_table.write(filtered_data.iloc[in_view[:MAX_TABLE_ROWS]][
+                        ["Connector Name", "Status", "Latitude", "Longitude", "Sales Revenue (RWF)"]])
+                    lazy_expander("Revenue and utilization", "revenue_section",
+                                  lambda: revenue_analytics(get_revenue_cube(charging_data, charging_version),
+                                                            status_filter))
+                    lazy_expander("Batch nearest-station lookup", "batch_section",
+                                  lambda: batch_nearest_lookup(charging_data, station_snapshot.index))
+                    lazy_expander("Suggest new station sites", "placement_section",
+                                  lambda: placement_suggestions(charging_data, station_snapshot.geometry_version))
+                    lazy_expander("Compare build-out scenarios", "scenario_section",
+                                  lambda: scenario_comparison(charging_data, charging_version))
+                elif user_role == "EV User":
+                    town = st.text_input("Enter your town to locate nearby stations:")
+                    if town:
+                        town_index = station_snapshot.town_index
+                        rows, match, suggestions = search_towns(town_index, town)
+                        if suggestions:
+                            st.caption("Suggestions: " + ", ".join(suggestions))
+                        stations_in_town = charging_data.iloc[rows]
+                        if stations_in_town.empty:
+                            st.warning("No charging stations found in your town.")
+                        else:
+                            if match == "fuzzy":
+                                st.info("No exact match found; showing the closest town names.")
+                            st.write("Stations in your town:")
+                            display_station_map(stations_in_town, "town_map",
+                                                station_map_key(town=normalize(town)))
+
+                    start_lat = st.number_input("Enter your latitude:", format="%.6f")
+                    start_lon = st.number_input("Enter your longitude:", format="%.6f")
+                    if st.button("Find Nearest Station"):
+                        from routing import find_road_network
+                        road_network = find_road_network(ROAD_NETWORK_PATHS)
+                        road_catchments = (get_road_catchments(road_network, charging_data,
+                                                               station_snapshot.geometry_version)
+                                           if road_network else None)
+                        position, minutes, km = find_nearest_station(station_snapshot, start_lat, start_lon,
+                                                                     road_catchments)
+                        note = None
+                        if minutes is None:
+                            note = ("Straight-line distance: no road network available"
+                                    if not road_network else "Straight-line distance: no road route from this point")
+                        # Kept in the session so the answer survives the reruns its map triggers on pan or zoom.
+                        st.session_state.nearest_answer = {
+                            "origin": (start_lat, start_lon), "minutes": minutes, "km": km, "note": note,
+                            "charger_id": int(charging_data["Charger ID"].iloc[position])}
+                    answer = st.session_state.get("nearest_answer")
+                    position = -1
+                    if answer is not None and answer["origin"] == (start_lat, start_lon):
+                        position = pd.Index(charging_data["Charger ID"]).get_indexer([answer["charger_id"]])[0]
+                    if position >= 0:
+                        minutes, km = answer["minutes"], answer["km"]
+                        away = f"about {minutes:.0f} min drive" if minutes is not None else f"{km:.1f} km away"
+                        if answer["note"]:
+                            st.caption(answer["note"])
+                        nearest_station = charging_data.iloc[position]
+                        st.success(f"Nearest Station: {nearest_station['Connector Name']} "
+                                   f"({nearest_station['Status']}), {away}")
+                        st.write(nearest_station[["Connector Name", "Address", "Latitude", "Longitude"]])
+                        display_station_map(charging_data.iloc[[position]], "nearest_map",
+                                            nearest_map_key(answer["charger_id"]))
 
     # --- Population Data ---
-    with tab3:
-        st.header("Population Data Insights")
-        if population_data.empty:
-            st.error("Population data not found.")
-        else:
-            st.write("Population Overview:")
-            st.write(population_data.head())
-            st.bar_chart(population_data["Total_Young_Population"])
+    if tab3.open:
+        with tab3:
+            st.header("Population Data Insights")
+            population_data = load_data(population_data_path, POPULATION_COLUMNS)
+            if population_data.empty:
+                st.error("Population data not found.")
+            else:
+                st.write("Population Overview:")
+                st.write(population_data.head())
+                population_map(population_data)
+                st.subheader("Demand per Station")
+                demand_per_station(population_data)
+
+    # --- Performance ---
+    if admin_tabs and admin_tabs[0].open:
+        with admin_tabs[0]:
+            st.header("Performance")
+            performance_panel()
+
+recorder.end_rerun()
@@ -1,11 +1,16 @@
 import streamlit as st
-import pandas as pd
 import folium
-from folium.plugins import MarkerCluster, HeatMap
+from folium.plugins import HeatMap
 import os
+from data_service import DataService, enable_copy_on_write
+from emissions_grid import EMISSION_DTYPES, aggregate_emissions, heatmap_points
+from ingest import dataset_version, load_columns, load_numeric_columns
+from map_layers import render_map_html, station_layer
+from render_cache import RenderCache
 
 # --- Page Configuration ---
 st.set_page_config(page_title="OptimCharge Dashboard", layout="wide")
+enable_copy_on_write()
 
 # --- Custom CSS for Background Image ---
 st.markdown(
@@ -23,57 +28,67 @@ st.markdown(
 )
 
 # --- Helper Functions ---
-@st.cache_data
+@st.cache_resource
+def get_data_service():
+    """Return the read-only table store shared by every session on this server."""
+    return DataService()
+
 def load_emissions_data(file_path):
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"The file {file_path} does not exist.")
-    emissions = pd.read_excel(file_path)
-    return emissions.dropna(subset=['latitude', 'longitude', 'CarbonMonoxide_H2O_column_number_density'])
+    return get_data_service().table((file_path, "emissions"), dataset_version(file_path, columns=EMISSION_DTYPES),
+                                    lambda: load_numeric_columns(file_path, EMISSION_DTYPES))
 
-@st.cache_data
 def load_ev_station_data(file_path, sheet_name="Sheet2"):
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"The file {file_path} does not exist.")
-    data = pd.read_excel(file_path, sheet_name=sheet_name)
-    return data.dropna(subset=["Latitude", "Longitude"])
+    return get_data_service().table((file_path, sheet_name), dataset_version(file_path, sheet_name=sheet_name),
+                                    lambda: load_columns(file_path, sheet_name=sheet_name)
+                                    .dropna(subset=["Latitude", "Longitude"]))
 
-@st.cache_data
 def load_population_data(file_path):
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"The file {file_path} does not exist.")
-    return pd.read_excel(file_path)
+    return get_data_service().table((file_path, 0), dataset_version(file_path), lambda: load_columns(file_path))
+
+@st.cache_resource
+def get_render_cache():
+    """Return the rendered-map cache shared by every session on this server."""
+    return RenderCache()
+
+def display_map(build_map, cache_key):
+    """Embed a Folium map, rendering it only when its HTML is not already cached."""
+    html = get_render_cache().get_or_render(cache_key, lambda: render_map_html(build_map()))
+    st.components.v1.html(html, width=700, height=500)
 
-def display_station_map(data, zoom_start=8, location=[-1.95, 30.06]):
+def display_station_map(data, cache_key, zoom_start=8, location=[-1.95, 30.06]):
     """Display a map with EV stations."""
-    m = folium.Map(location=location, zoom_start=zoom_start)
-    marker_cluster = MarkerCluster().add_to(m)
-
-    for index, row in data.iterrows():
-        folium.Marker(
-            [row['Latitude'], row['Longitude']],
-            popup=f"Station: {row['Name']}, Status: {row['Status']}"
-        ).add_to(marker_cluster)
-
-    map_file = 'station_map.html'
-    m.save(map_file)
-    HtmlFile = open(map_file, 'r', encoding='utf-8')
-    st.components.v1.html(HtmlFile.read(), width=700, height=500)
-
-def display_emission_heatmap(data):
-    """Display a heatmap of carbon monoxide emissions."""
-    m = folium.Map(location=[-1.95, 30.06], zoom_start=7)
-    heat_data = [[row['latitude'], row['longitude'], row['CarbonMonoxide_H2O_column_number_density']] 
-                 for index, row in data.iterrows()]
-    HeatMap(heat_data).add_to(m)
-    
-    map_file = 'emission_heatmap.html'
-    m.save(map_file)
-    HtmlFile = open(map_file, 'r', encoding='utf-8')
-    st.components.v1.html(HtmlFile.read(), width=700, height=500)
+    def build_map():
+        m = folium.Map(location=location, zoom_start=zoom_start)
+        station_layer(data, [("Station", "Name"), ("Status", "Status")], status_colors=False).add_to(m)
+        return m
+
+    display_map(build_map, cache_key)
+
+@st.cache_data
+def load_emission_grid(_data, data_version, resolution=0.05, how="mean"):
+    """Aggregate emissions onto a grid, cached per (dataset version, resolution, aggregation)."""
+    return aggregate_emissions(_data, resolution, how)
+
+def display_emission_heatmap(grid_data, cache_key):
+    """Display a heatmap of carbon monoxide emissions from pre-aggregated grid cells."""
+    def build_map():
+        m = folium.Map(location=[-1.95, 30.06], zoom_start=7)
+        HeatMap(heatmap_points(grid_data)).add_to(m)
+        return m
+
+    display_map(build_map, cache_key)
 
 # --- Data Loading ---
-emissions_data = load_emissions_data(r"C:/Users/robyn/OneDrive/Rwanda Charging Stations/emmissions .xlsx")
-charging_data = load_ev_station_data(r"C:/Users/robyn/OneDrive/Rwanda Charging Stations/missing addresses .xlsx")
+emissions_data_path = r"C:/Users/robyn/OneDrive/Rwanda Charging Stations/emmissions .xlsx"
+emissions_data = load_emissions_data(emissions_data_path)
+charging_data_path = r"C:/Users/robyn/OneDrive/Rwanda Charging Stations/missing addresses .xlsx"
+charging_data = load_ev_station_data(charging_data_path)
 population_data = load_population_data(r"C:/Users/robyn/OneDrive/Rwanda Charging Stations/young_pop.xlsx")
 
 # --- User Authentication ---
@@ -149,7 +164,9 @@ else:
             st.error("Emissions data not found or loaded incorrectly.")
         else:
             st.write("#### Heatmap of Carbon Monoxide Emissions")
-            display_emission_heatmap(emissions_data)
+            emissions_version = dataset_version(emissions_data_path, columns=EMISSION_DTYPES)
+            display_emission_heatmap(load_emission_grid(emissions_data, emissions_version),
+                                     ("emissions", emissions_version))
 
     # --- EV Charging Stations Tab ---
     with tab2:
@@ -162,7 +179,8 @@ else:
             filtered_data = charging_data if status_filter == "All" else charging_data[charging_data['Status'] == status_filter]
 
             st.write("### Filtered Stations", filtered_data[['Name', 'Status', 'Latitude', 'Longitude']])
-            display_station_map(filtered_data)
+            charging_version = dataset_version(charging_data_path, sheet_name="Sheet2")
+            display_station_map(filtered_data, ("stations", charging_version, status_filter, None))
 
     # --- Population Data Tab ---
     with tab3:
@@ -0,0 +1,157 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+# --- Cube Settings ---
+DIMENSIONS = ("Province", "City/Suburb/Town", "Connector Type", "Status")
+REVENUE_COLUMNS = {"Sales Revenue (RWF)": "revenue_rwf", "Sales Revenue (ZAR)": "revenue_zar"}
+AVAILABILITY_COLUMN = "Charger Availability"
+# The station sheet marks unknown values with "-".
+MISSING_LABEL = "Unknown"
+ADDITIVE_MEASURES = ("stations", "revenue_rwf", "revenue_zar", "revenue_reported", "in_use", "availability_reported")
+MEASURES = {
+    "revenue_rwf": "Revenue (RWF)",
+    "revenue_zar": "Revenue (ZAR)",
+    "mean_revenue_rwf": "Mean revenue per reporting station (RWF)",
+    "utilization": "Share of connectors in use",
+    "stations": "Stations",
+}
+
+
+# --- Normalization ---
+def to_amounts(values):
+    """Parses revenue cells (ints, numeric strings or "-") into float64, with NaN for anything not a number.
+
+    Each distinct cell is parsed once, so repeated amounts cost a lookup.
+    """
+    codes, uniques = pd.factorize(pd.Series(values), use_na_sentinel=True)
+    amounts = pd.to_numeric(pd.Series(uniques, dtype=object), errors="coerce").to_numpy(dtype=np.float64)
+    return np.append(amounts, np.nan)[codes]
+
+
+def _labels(values):
+    """Dimension labels as a categorical, with "-" and blanks reported as MISSING_LABEL."""
+    codes, uniques = pd.factorize(pd.Series(values))
+    cleaned = pd.Series(uniques, dtype=object).astype(str).str.strip()
+    cleaned[cleaned.isin(["-", ""])] = MISSING_LABEL
+    categories = pd.Index(cleaned.unique())
+    mapped = np.append(categories.get_indexer(cleaned), categories.get_loc(MISSING_LABEL)
+                       if MISSING_LABEL in categories else len(categories))
+    if MISSING_LABEL not in categories:
+        categories = categories.append(pd.Index([MISSING_LABEL]))
+    return pd.Categorical.from_codes(mapped[codes], categories)
+
+
+def fact_table(stations, dimensions=DIMENSIONS):
+    """One row per station: the dimension labels plus typed, additive measures."""
+    facts = {}
+    for dimension in dimensions:
+        facts[dimension] = _labels(stations[dimension])
+    facts["stations"] = np.ones(len(stations), dtype=np.int64)
+    reported = np.zeros(len(stations), dtype=bool)
+    for column, measure in REVENUE_COLUMNS.items():
+        amounts = to_amounts(stations[column]) if column in stations.columns else np.full(len(stations), np.nan)
+        facts[measure] = np.nan_to_num(amounts)
+        if measure == "revenue_rwf":
+            reported = ~np.isnan(amounts)
+    facts["revenue_reported"] = reported.astype(np.int64)
+    in_use = known = np.zeros(len(stations), dtype=bool)
+    if AVAILABILITY_COLUMN in stations.columns:
+        availability = stations[AVAILABILITY_COLUMN]
+        in_use = availability.eq("In-Use").to_numpy(dtype=bool)
+        known = availability.isin(["In-Use", "Available"]).to_numpy(dtype=bool)
+    facts["in_use"] = in_use.astype(np.int64)
+    facts["availability_reported"] = known.astype(np.int64)
+    return pd.DataFrame(facts)
+
+
+def _total(table):
+    """One-row grand total of a rollup, keeping integer measures integral."""
+    return pd.DataFrame({column: [table[column].sum()] for column in table.columns}, index=["All"])
+
+
+def _with_derived(table):
+    table = table.copy()
+    table["mean_revenue_rwf"] = table["revenue_rwf"] / table["revenue_reported"].replace(0, np.nan)
+    table["utilization"] = table["in_use"] / table["availability_reported"].replace(0, np.nan)
+    return table
+
+
+# --- Cube ---
+class RevenueCube:
+    """Pre-aggregated revenue and utilization rollups over the station dimensions.
+
+    Revenue columns are parsed once. The finest grain (every combination of
+    `dimensions` present in the data) is summed once, then every coarser
+    rollup (each subset of the dimensions, 2^4 for the defaults) is summed from
+    it, so queries only select from a table with at most as many rows as
+    distinct dimension combinations. Means and shares are derived from the
+    additive measures of each rollup, and again after a filter re-groups one.
+    """
+
+    def __init__(self, stations, dimensions=DIMENSIONS, version=None):
+        self.dimensions = tuple(dimensions)
+        self.version = version
+        facts = fact_table(stations, self.dimensions)
+        base = facts.groupby(list(self.dimensions), sort=True, observed=True)[list(ADDITIVE_MEASURES)].sum()
+        base.index = base.index.set_levels([level.astype(object) for level in base.index.levels])
+        self.rollups = {self.dimensions: _with_derived(base)}
+        for size in range(len(self.dimensions) - 1, 0, -1):
+            for subset in itertools.combinations(self.dimensions, size):
+                self.rollups[subset] = _with_derived(base.groupby(level=list(subset), sort=True).sum())
+        self.rollups[()] = _with_derived(_total(base))
+
+    def __len__(self):
+        return len(self.rollups[self.dimensions])
+
+    def members(self, dimension):
+        """Sorted labels of one dimension."""
+        return self.rollups[(dimension,)].index.tolist()
+
+    def _key(self, dimensions):
+        unknown = set(dimensions) - set(self.dimensions)
+        if unknown:
+            raise KeyError(f"Not a cube dimension: {', '.join(sorted(unknown))}")
+        return tuple(dimension for dimension in self.dimensions if dimension in dimensions)
+
+    def rollup(self, by=(), filters=None):
+        """Measures grouped by the `by` dimensions, restricted to rows matching `filters`.
+
+        `filters` maps a dimension to one label or a list of labels. Returns a
+        frame indexed by `by` (in the order given) with the additive measures and
+        the derived mean revenue and utilization.
+        """
+        by = tuple(by)
+        filters = {dimension: [value] if isinstance(value, str) else list(value)
+                   for dimension, value in (filters or {}).items()}
+        table = self.rollups[self._key(set(by) | set(filters))]
+        if filters and by and not set(filters) & set(by) and all(len(values) == 1 for values in filters.values()):
+            # One member per filtered dimension: a cross-section of the finer rollup is already the answer.
+            key = tuple(values[0] for values in filters.values())
+            try:
+                table = table.xs(key, level=list(filters))
+            except KeyError:
+                table = table.iloc[:0].droplevel(list(filters))
+        elif filters:
+            mask = np.ones(len(table), dtype=bool)
+            for dimension, values in filters.items():
+                mask &= table.index.get_level_values(dimension).isin(values)
+            table = table[mask]
+            if set(filters) - set(by):
+                additive = table[list(ADDITIVE_MEASURES)]
+                table = _with_derived(additive.groupby(level=list(by), sort=True).sum() if by else _total(additive))
+        if len(by) > 1 and tuple(table.index.names) != by:
+            table = table.reorder_levels(list(by)).sort_index()
+        return table
+
+    def drill(self, path, selection=None):
+        """Drill-down along `path` (e.g. Province -> City/Suburb/Town): the level below the selected members.
+
+        `selection` maps the first levels of `path` to the chosen labels.
+        """
+        selection = dict(selection or {})
+        depth = len(selection)
+        if list(selection) != list(path[:depth]) or depth >= len(path):
+            raise ValueError("The selection must name the first levels of the drill path, leaving one below.")
+        return self.rollup(by=(path[depth],), filters=selection)
@@ -0,0 +1,124 @@
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+LAT_ALIASES = ("latitude", "lat", "start_lat", "origin_lat")
+LON_ALIASES = ("longitude", "lon", "lng", "long", "start_lon", "origin_lon")
+STATION_FIELDS = ["Charger ID", "Connector Name", "Status", "Address", "Latitude", "Longitude"]
+DEFAULT_CHUNK_ROWS = 50_000
+
+
+# --- Origin Parsing ---
+def find_coordinate_columns(columns):
+    """Returns the (latitude, longitude) column names of an origins table, matched case-insensitively."""
+    lookup = {str(col).strip().lower(): col for col in columns}
+    lat_col = next((lookup[name] for name in LAT_ALIASES if name in lookup), None)
+    lon_col = next((lookup[name] for name in LON_ALIASES if name in lookup), None)
+    if lat_col is None or lon_col is None:
+        raise ValueError("The origins file needs latitude and longitude columns "
+                         f"(e.g. {LAT_ALIASES[0]!r} and {LON_ALIASES[0]!r}).")
+    return lat_col, lon_col
+
+
+def read_origins(file, file_name):
+    """Reads an uploaded CSV, Parquet or Excel file of origin coordinates."""
+    name = file_name.lower()
+    if name.endswith(".parquet"):
+        return pd.read_parquet(file)
+    if name.endswith((".xlsx", ".xls")):
+        return pd.read_excel(file)
+    return pd.read_csv(file)
+
+
+# --- Batch Queries ---
+def _take(values, positions, missing):
+    """Gathers station values, blanking rows whose origin had no coordinates."""
+    taken = values[positions]
+    if values.dtype.kind in "iu":
+        return pd.arrays.IntegerArray(taken.astype(np.int64), missing.copy())
+    if values.dtype.kind == "f":
+        return np.where(missing, np.nan, taken)
+    taken = taken.astype(object)
+    taken[missing] = None
+    return taken
+
+
+def _arrow_schema(chunk):
+    """Fixes column types up front so every Parquet row group shares one schema."""
+    import pyarrow as pa
+
+    fields = []
+    for name, dtype in chunk.dtypes.items():
+        if str(dtype) == "Int64" or dtype.kind in "iu":
+            arrow_type = pa.int64()
+        elif dtype.kind == "f":
+            arrow_type = pa.float64()
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(name, arrow_type))
+    return pa.schema(fields)
+
+
+def iter_nearest(index, stations, origins, k=1, chunk_rows=DEFAULT_CHUNK_ROWS, fields=STATION_FIELDS):
+    """Yields long-format result chunks: one row per (origin, rank) with station fields and distance.
+
+    Every chunk is answered by a single vectorized tree query, so memory stays
+    proportional to `chunk_rows * k` whatever the size of the upload.
+    """
+    lat_col, lon_col = find_coordinate_columns(origins.columns)
+    fields = [field for field in fields if field in stations.columns]
+    station_values = {field: stations[field].to_numpy() for field in fields}
+    k = min(k, len(index))
+    for start in range(0, len(origins), chunk_rows):
+        chunk = origins.iloc[start:start + chunk_rows]
+        lat = pd.to_numeric(chunk[lat_col], errors="coerce").to_numpy(dtype=np.float64)
+        lon = pd.to_numeric(chunk[lon_col], errors="coerce").to_numpy(dtype=np.float64)
+        valid = ~(np.isnan(lat) | np.isnan(lon))
+        positions = np.zeros((len(chunk), k), dtype=np.int64)
+        distances = np.full((len(chunk), k), np.nan)
+        if valid.any():
+            positions[valid], distances[valid] = index.nearest(lat[valid], lon[valid], k=k)
+
+        result = {"origin_row": np.repeat(np.arange(start, start + len(chunk)), k),
+                  "origin_latitude": np.repeat(lat, k), "origin_longitude": np.repeat(lon, k),
+                  "rank": np.tile(np.arange(1, k + 1), len(chunk))}
+        flat = positions.ravel()
+        missing = np.repeat(~valid, k)
+        for field in fields:
+            result[f"station_{field}"] = _take(station_values[field], flat, missing)
+        result["distance_km"] = distances.ravel()
+        yield pd.DataFrame(result)
+
+
+def write_results(chunks, file_format="csv"):
+    """Streams result chunks into an in-memory CSV or Parquet file.
+
+    Returns (file bytes, number of origin rows, seconds spent).
+    """
+    start = time.perf_counter()
+    buffer = io.BytesIO()
+    origins = 0
+    if file_format == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        for chunk in chunks:
+            if writer is None:
+                schema = _arrow_schema(chunk)
+                writer = pq.ParquetWriter(buffer, schema)
+            table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+            writer.write_table(table)
+            origins += chunk["origin_row"].nunique()
+        if writer is not None:
+            writer.close()
+    else:
+        text = io.TextIOWrapper(buffer, encoding="utf-8", newline="")
+        for position, chunk in enumerate(chunks):
+            chunk.to_csv(text, index=False, header=position == 0)
+            origins += chunk["origin_row"].nunique()
+        text.flush()
+        text.detach()
+    return buffer.getvalue(), origins, time.perf_counter() - start
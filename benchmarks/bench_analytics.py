@@ -0,0 +1,68 @@
+"""Revenue rollups: queries served from the pre-aggregated cube vs re-grouping the station table.
+
+The real station table is tiled to --sizes rows. Each query groups revenue by
+one dimension, optionally filtered by status (what the client view asks on
+every rerun). The re-grouping baseline parses the revenue strings and groups
+the full table per query, as a chart built straight from the DataFrame would;
+the cube parses once at build time and answers from its rollups. Results of
+both paths are checked against each other.
+Run from the repository root:
+
+    python -m benchmarks.bench_analytics --sizes 10000 100000 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from analytics import DIMENSIONS, RevenueCube
+from ingest import load_columns
+
+REVENUE = "Sales Revenue (RWF)"
+
+
+def queries(cube):
+    statuses = [None, *cube.members("Status")]
+    return [(dimension, status) for dimension in DIMENSIONS if dimension != "Status" for status in statuses]
+
+
+def regroup(stations, dimension, status):
+    if status is not None:
+        stations = stations[stations["Status"] == status]
+    revenue = pd.to_numeric(stations[REVENUE], errors="coerce")
+    return revenue.groupby(stations[dimension]).sum()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    raw = load_columns("Charging_Stations.xlsx")
+    print(f"{'stations':>10}{'cells':>7}{'build ms':>10}{'cube query ms':>15}{'regroup ms':>12}{'speedup':>9}")
+    for n in args.sizes:
+        stations = raw.iloc[np.arange(n) % len(raw)].reset_index(drop=True)
+        start = time.perf_counter()
+        cube = RevenueCube(stations)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        cases = queries(cube)
+        start = time.perf_counter()
+        answers = [cube.rollup(by=(dimension,), filters={"Status": status} if status else None)
+                   for dimension, status in cases]
+        cube_ms = (time.perf_counter() - start) * 1000 / len(cases)
+        start = time.perf_counter()
+        expected = [regroup(stations, dimension, status) for dimension, status in cases]
+        regroup_ms = (time.perf_counter() - start) * 1000 / len(cases)
+
+        for answer, frame in zip(answers, expected):
+            # "-" labels are reported as "Unknown" by the cube.
+            frame = frame.rename(index={"-": "Unknown"})
+            assert np.allclose(answer["revenue_rwf"].reindex(frame.index).to_numpy(), frame.to_numpy())
+        print(f"{n:>10,}{len(cube):>7}{build_ms:>10.1f}{cube_ms:>15.2f}{regroup_ms:>12.2f}"
+              f"{regroup_ms / cube_ms:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
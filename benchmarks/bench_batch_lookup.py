@@ -0,0 +1,39 @@
+"""Batch nearest-station throughput (origin rows per second) for CSV and Parquet output.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_batch_lookup
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from batch_lookup import iter_nearest, write_results
+from ingest import load_columns
+from station_index import StationIndex
+
+CHARGING_PATH = "Charging_Stations.xlsx"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 5])
+    args = parser.parse_args()
+
+    stations = load_columns(CHARGING_PATH).dropna(subset=["Latitude", "Longitude"])
+    index = StationIndex.from_frame(stations)
+    rng = np.random.default_rng(0)
+    print(f"{'origins':>10}{'k':>4}{'format':>9}{'seconds':>10}{'rows/s':>12}{'MB':>8}")
+    for n in args.sizes:
+        origins = pd.DataFrame({"latitude": rng.uniform(-2.8, -1.1, n), "longitude": rng.uniform(28.9, 30.8, n)})
+        for k in args.k:
+            for file_format in ("parquet", "csv"):
+                data, rows, seconds = write_results(iter_nearest(index, stations, origins, k=k), file_format)
+                print(f"{n:>10}{k:>4}{file_format:>9}{seconds:>10.2f}{rows / seconds:>12,.0f}"
+                      f"{len(data) / 2 ** 20:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Station catchment join: KD-tree nearest-station assignment vs an O(n*m) distance scan.
+
+Synthetic emission cells and stations are drawn uniformly over Rwanda, with a
+young-population point per province spread over the cells. The indexed join
+(`catchments.station_demand`) is timed against assigning each cell by scanning
+the distance to every station, which is only run while cells x stations stays
+under --max-scan pairs; where both run, the assignments are checked to agree.
+Run from the repository root:
+
+    python -m benchmarks.bench_catchments --cells 10000 100000 1000000 --stations 100 1000 10000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from catchments import join_cells, station_demand
+from station_index import StationIndex, haversine_km
+
+# Rwanda's bounding box, padded slightly.
+SOUTH, WEST, NORTH, EAST = -2.9, 28.8, -1.0, 30.95
+SCAN_CHUNK = 2048
+
+
+def synthetic(n, rng, **columns):
+    return pd.DataFrame({"Latitude": rng.uniform(SOUTH, NORTH, n), "Longitude": rng.uniform(WEST, EAST, n),
+                         **{name: make(n) for name, make in columns.items()}})
+
+
+def scan_nearest(lat, lon, stations):
+    owner = np.empty(len(lat), dtype=np.int64)
+    for start in range(0, len(lat), SCAN_CHUNK):
+        distances = haversine_km(lat[start:start + SCAN_CHUNK, None], lon[start:start + SCAN_CHUNK, None],
+                                 stations["Latitude"].to_numpy()[None, :], stations["Longitude"].to_numpy()[None, :])
+        owner[start:start + SCAN_CHUNK] = distances.argmin(axis=1)
+    return owner
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cells", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--stations", type=int, nargs="+", default=[100, 1_000, 10_000])
+    parser.add_argument("--max-scan", type=float, default=2e8)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    population = synthetic(5, rng, Total_Young_Population=lambda n: rng.uniform(500, 1500, n))
+    print(f"{'cells':>10}{'stations':>10}{'join ms':>10}{'scan ms':>10}{'speedup':>9}")
+    for n_cells in args.cells:
+        cells = synthetic(n_cells, rng, value=lambda n: rng.gamma(2.0, 1000.0, n),
+                          count=lambda n: rng.integers(1, 20, n))
+        cells = cells.rename(columns={"Latitude": "latitude", "Longitude": "longitude"})
+        for n_stations in args.stations:
+            stations = synthetic(n_stations, rng)
+            stations["Charger ID"] = np.arange(1, n_stations + 1)
+            start = time.perf_counter()
+            index = StationIndex.from_frame(stations)
+            table = station_demand(stations, cells, population, index)
+            join_ms = (time.perf_counter() - start) * 1000
+            assert np.isclose(table["catchment_population"].sum(), population["Total_Young_Population"].sum())
+
+            scan = f"{'skipped':>10}"
+            if n_cells * n_stations <= args.max_scan:
+                start = time.perf_counter()
+                owner = scan_nearest(cells["latitude"].to_numpy(), cells["longitude"].to_numpy(), stations)
+                scan_ms = (time.perf_counter() - start) * 1000
+                joined = join_cells(stations, cells, population, index)["station"].to_numpy()[:n_cells]
+                assert (joined == owner).mean() > 0.9999, "indexed and scanned assignments disagree"
+                scan = f"{scan_ms:>10.1f}{scan_ms / join_ms:>8.0f}x"
+            print(f"{n_cells:>10,}{n_stations:>10,}{join_ms:>10.1f}{scan}")
+
+
+if __name__ == "__main__":
+    main()
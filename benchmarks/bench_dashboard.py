@@ -0,0 +1,200 @@
+"""Dashboard hot paths on seeded synthetic data: latency and peak memory per path, 10x-1000x scale.
+
+For each --scales factor, `benchmarks.synthetic` generates the station,
+emissions and population datasets (emissions capped at --max-emission-rows)
+into a scratch directory, and the Streamlit-free paths in `dashboard_core`
+are timed there: loading (cold, i.e. parsing into the columnar cache, and
+warm from the DataService), the station store and its indexes, status
+filtering, town search, nearest-station queries, emission gridding plus the
+heatmap, and the station layer script sent for the initial map view, with
+their rendered sizes. Each path reports the median of --repeats runs and its
+peak traced allocation.
+With --app-scale the real script is then driven headless through
+Streamlit's AppTest (login, then every tab; cold, then warm) against data
+at that scale, with emissions capped at --app-emission-rows since the app
+reads them from Excel.
+
+--output writes the results as JSON (with the current commit) and
+--compare checks them against an earlier file, failing when any path that
+took over --min-ms slowed down by more than --tolerance, so runs per commit
+can track regressions. Run from the repository root:
+
+    python -m benchmarks.bench_dashboard --scales 10 100 1000 --app-scale 10 --output bench.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.synthetic import generate, write_datasets
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOWN_QUERIES = ["Kigali", "musanze", "Rubavu (Gisenyi)", "kibye", "Nyamata", "huy"]
+NEAREST_QUERIES = 1_000
+APP_TABS = ["🌍 Environmental Impact", "⚡ EV Charging Stations", "📊 Population Data"]
+
+
+def measure(run, repeats):
+    """Median ms of `run()` over `repeats` calls, then peak traced MB of one more call. Returns (ms, mb, result)."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = run()
+        times.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), peak / 2 ** 20, result
+
+
+def hot_paths(paths, repeats):
+    """Times every dashboard_core path against the datasets in `paths`. Yields (path, ms, mb, bytes)."""
+    from dashboard_core import (MAP_CENTER, POPULATION_COLUMNS, STATION_COLUMNS, STATION_ZOOM, STATUS_OPTIONS,
+                                build_heatmap, filter_by_status, find_nearest_station, load_emissions_table,
+                                load_table, map_viewport, new_station_store, render_map, search_towns,
+                                station_features, viewport_positions)
+    from map_layers import detached_script
+    from data_service import DataService
+    from emissions_grid import aggregate_emissions
+
+    # Cold loads parse the files once; tracing the parse again would mostly measure the Excel reader.
+    start = time.perf_counter()
+    population = load_table(DataService(), paths["population"], POPULATION_COLUMNS)
+    yield "load population (cold)", (time.perf_counter() - start) * 1000, np.nan, None
+    start = time.perf_counter()
+    emissions = load_emissions_table(DataService(), paths["emissions"])
+    yield "load emissions (cold)", (time.perf_counter() - start) * 1000, np.nan, None
+    start = time.perf_counter()
+    store = new_station_store(paths["stations"], STATION_COLUMNS)
+    store.refresh()
+    yield "load stations + indexes (cold)", (time.perf_counter() - start) * 1000, np.nan, None
+
+    service = DataService()
+    load_emissions_table(service, paths["emissions"])
+    ms, mb, _ = measure(lambda: load_emissions_table(service, paths["emissions"]), repeats)
+    yield "load emissions (warm)", ms, mb, None
+    ms, mb, _ = measure(lambda: new_station_store(paths["stations"], STATION_COLUMNS).refresh(), repeats)
+    yield "station store rebuild", ms, mb, None
+
+    snapshot = store.snapshot
+    stations = snapshot.frame
+    ms, mb, _ = measure(lambda: [len(filter_by_status(stations, status)) for status in STATUS_OPTIONS], repeats)
+    yield f"filter by status (x{len(STATUS_OPTIONS)})", ms, mb, None
+    ms, mb, _ = measure(lambda: [search_towns(snapshot.town_index, query) for query in TOWN_QUERIES], repeats)
+    yield f"town search (x{len(TOWN_QUERIES)})", ms, mb, None
+    rng = np.random.default_rng(1)
+    points = list(zip(rng.uniform(-2.8, -1.1, NEAREST_QUERIES), rng.uniform(28.9, 30.8, NEAREST_QUERIES)))
+    ms, mb, _ = measure(lambda: [find_nearest_station(snapshot, lat, lon) for lat, lon in points], repeats)
+    yield f"nearest station (x{NEAREST_QUERIES:,})", ms, mb, None
+
+    ms, mb, grid = measure(lambda: aggregate_emissions(emissions), repeats)
+    yield "emission grid", ms, mb, None
+    ms, mb, html = measure(lambda: render_map(build_heatmap(grid)), repeats)
+    yield "heatmap build + render", ms, mb, len(html)
+    bounds, zoom = map_viewport(None, MAP_CENTER, STATION_ZOOM)
+    ms, mb, script = measure(lambda: detached_script(station_features(
+        stations, viewport_positions(None, None, bounds, snapshot.index), zoom)), repeats)
+    yield "station viewport layer + script", ms, mb, len(script)
+    assert len(population) and len(emissions) and len(stations)
+
+
+def app_paths():
+    """Drives the dashboard through AppTest: login, then each tab, first cold and then with the server's caches
+    warm. Yields (path, ms, mb, bytes)."""
+    from streamlit.testing.v1 import AppTest
+
+    for state in ("cold", "warm"):
+        at = AppTest.from_file(os.path.join(REPO_ROOT, "OptimChargeDashboard.py"), default_timeout=900)
+        timings = {}
+        start = time.perf_counter()
+        at.run()
+        timings[f"app: login screen ({state})"] = time.perf_counter() - start
+        at.sidebar.selectbox[0].set_value("Client")
+        at.sidebar.text_input[0].input("client")
+        at.sidebar.text_input[1].input("client123")
+        at.sidebar.button[0].click().run()
+        for tab in APP_TABS:
+            at.session_state["tab"] = tab
+            start = time.perf_counter()
+            at.run()
+            timings[f"app: {tab[2:]} ({state})"] = time.perf_counter() - start
+            assert not at.exception, [exception.value for exception in at.exception]
+        for name, seconds in timings.items():
+            yield name, seconds * 1000, np.nan, None
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path, tolerance, min_ms):
+    with open(baseline_path) as handle:
+        baseline = {(row["scale"], row["path"]): row["ms"] for row in json.load(handle)["results"]}
+    regressions = []
+    for row in results:
+        before = baseline.get((row["scale"], row["path"]))
+        if before is not None and before >= min_ms and row["ms"] > before * tolerance:
+            regressions.append(f"{row['path']} at {row['scale']}x: {before:.1f} -> {row['ms']:.1f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=float, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--max-emission-rows", type=int, default=10_000_000)
+    parser.add_argument("--app-scale", type=float)
+    parser.add_argument("--app-emission-rows", type=int, default=200_000)
+    parser.add_argument("--output")
+    parser.add_argument("--compare")
+    parser.add_argument("--tolerance", type=float, default=1.25)
+    parser.add_argument("--min-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    sys.path.insert(0, REPO_ROOT)
+    results = []
+    runs = [(scale, False) for scale in args.scales] + ([(args.app_scale, True)] if args.app_scale else [])
+    print(f"{'scale':>7}  {'path':<36}{'ms':>10}{'peak MB':>9}{'HTML KB':>9}")
+    for scale, through_app in runs:
+        with tempfile.TemporaryDirectory(prefix="optimcharge_bench_") as directory:
+            datasets = generate(scale, args.seed, args.app_emission_rows if through_app else args.max_emission_rows)
+            paths = write_datasets(directory, datasets, emissions_format="xlsx" if through_app else "parquet")
+            # Relative data and cache paths (the app's file names, .optimcharge_cache) resolve in the scratch dir.
+            previous = os.getcwd()
+            os.chdir(directory)
+            try:
+                paths = {name: os.path.basename(path) for name, path in paths.items()}
+                rows = app_paths() if through_app else hot_paths(paths, args.repeats)
+                for path, ms, mb, size in rows:
+                    results.append({"scale": scale, "path": path, "ms": ms,
+                                    "peak_mb": None if np.isnan(mb) else mb, "html_bytes": size})
+                    print(f"{scale:>6g}x  {path:<36}{ms:>10.1f}{mb:>9.1f}"
+                          f"{'' if size is None else f'{size / 1024:>9.0f}'}")
+            finally:
+                os.chdir(previous)
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump({"commit": git_commit(), "seed": args.seed, "results": results}, handle, indent=1)
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance, args.min_ms)
+        if regressions:
+            sys.exit("Regressions over the baseline:\n  " + "\n  ".join(regressions))
+        print(f"No path slower than {args.tolerance:g}x the baseline in {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
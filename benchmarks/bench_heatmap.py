@@ -0,0 +1,72 @@
+"""Heatmap payload size and render time: raw emission rows vs pre-aggregated grid cells.
+
+Also checks that binning preserves totals (point counts and value sums) on both grid types.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_heatmap
+"""
+import argparse
+import time
+
+import folium
+import numpy as np
+from folium.plugins import HeatMap
+
+from emissions_grid import VALUE_COLUMN, aggregate_emissions, heatmap_points
+from ingest import load_columns
+
+EMISSIONS_PATH = "emmissions .xlsx"
+EMISSION_COLUMNS = ["latitude", "longitude", VALUE_COLUMN]
+
+
+def render(heat_data):
+    """Builds the heatmap page and returns (seconds, html bytes)."""
+    start = time.perf_counter()
+    m = folium.Map(location=[-1.95, 30.06], zoom_start=7)
+    HeatMap(heat_data).add_to(m)
+    html = m.get_root().render()
+    return time.perf_counter() - start, len(html.encode("utf-8"))
+
+
+def check_totals(data):
+    """Asserts that grid aggregation neither drops nor duplicates observations."""
+    values = data[VALUE_COLUMN].to_numpy()
+    for grid in ("square", "hex"):
+        for resolution in (0.01, 0.05, 0.25):
+            counts = aggregate_emissions(data, resolution, "count", grid)
+            sums = aggregate_emissions(data, resolution, "sum", grid)
+            assert int(counts["count"].sum()) == len(values), (grid, resolution)
+            assert np.isclose(sums["value"].sum(), values.sum(), rtol=1e-9), (grid, resolution)
+    print(f"totals preserved: {len(values):,} observations, sum {values.sum():,.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--file", default=EMISSIONS_PATH)
+    parser.add_argument("--how", default="mean")
+    args = parser.parse_args()
+
+    data = load_columns(args.file, EMISSION_COLUMNS).dropna(subset=EMISSION_COLUMNS)
+    check_totals(data)
+
+    print(f"{'layer':<18}{'points':>10}{'aggregate s':>14}{'render s':>10}{'payload KB':>12}")
+    start = time.perf_counter()
+    raw = [[row["latitude"], row["longitude"], row[VALUE_COLUMN]] for _, row in data.iterrows()]
+    prepare = time.perf_counter() - start
+    seconds, size = render(raw)
+    print(f"{'raw iterrows':<18}{len(raw):>10}{prepare:>14.3f}{seconds:>10.3f}{size / 1024:>12.0f}")
+
+    for grid in ("square", "hex"):
+        for resolution in (0.01, 0.02, 0.05, 0.1, 0.25):
+            start = time.perf_counter()
+            cells = aggregate_emissions(data, resolution, args.how, grid)
+            points = heatmap_points(cells)
+            prepare = time.perf_counter() - start
+            seconds, size = render(points)
+            label = f"{grid} {resolution}"
+            print(f"{label:<18}{len(points):>10}{prepare:>14.3f}{seconds:>10.3f}{size / 1024:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Cold-load time and peak RSS of the emissions workbook: pd.read_excel vs the columnar cache.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_ingest
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+EMISSIONS_PATH = "emmissions .xlsx"
+EMISSION_COLUMNS = ["latitude", "longitude", "CarbonMonoxide_H2O_column_number_density"]
+
+
+def _child(mode, file_path):
+    """Runs one load in a fresh interpreter and prints its timings as JSON."""
+    import pandas as pd
+    import ingest
+
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if mode == "read_excel":
+        data = pd.read_excel(file_path).dropna(subset=EMISSION_COLUMNS)
+    elif mode == "build_cache":
+        ingest.build_columnar_cache(file_path)
+        data = ingest.load_columns(file_path, EMISSION_COLUMNS).dropna(subset=EMISSION_COLUMNS)
+    else:
+        data = ingest.load_columns(file_path, EMISSION_COLUMNS).dropna(subset=EMISSION_COLUMNS)
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"mode": mode, "rows": len(data), "seconds": elapsed,
+                      "peak_rss_mb": peak_kb / 1024, "delta_rss_mb": (peak_kb - baseline_kb) / 1024}))
+
+
+def run(mode, file_path):
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_ingest", "--child", mode, "--file", file_path],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--file", default=EMISSIONS_PATH)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        _child(args.child, args.file)
+        return
+
+    results = [run("build_cache", args.file)]
+    for mode in ("read_excel", "columnar_cache"):
+        runs = [run(mode, args.file) for _ in range(args.repeat)]
+        results.append(min(runs, key=lambda result: result["seconds"]))
+
+    print(f"{'mode':<16}{'rows':>10}{'seconds':>10}{'peak RSS MB':>14}{'load RSS MB':>14}")
+    for result in results:
+        print(f"{result['mode']:<16}{result['rows']:>10}{result['seconds']:>10.3f}"
+              f"{result['peak_rss_mb']:>14.1f}{result['delta_rss_mb']:>14.1f}")
+    speedup = results[1]["seconds"] / max(results[2]["seconds"], 1e-9)
+    print(f"columnar cache cold load is {speedup:.0f}x faster than pd.read_excel")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Instrumentation overhead: `perf.recorder` spans and `timed` wrappers, recording off and on.
+
+Times --calls invocations of a trivial function bare, through a `timed`
+wrapper and inside a `span` block, first with recording off (the default)
+and then on, and reports the added cost per call. Recording off must stay
+under --max-off-ns per call over the bare call, so it can gate
+regressions; with it on, the buffer is checked to hold the newest spans.
+Run from the repository root:
+
+    python -m benchmarks.bench_perf --calls 1000000 --max-off-ns 1000
+"""
+import argparse
+import sys
+import time
+
+from perf import Recorder
+
+
+def work(x):
+    return x
+
+
+def per_call_ns(loop, calls):
+    start = time.perf_counter_ns()
+    loop(calls)
+    return (time.perf_counter_ns() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    parser.add_argument("--max-off-ns", type=float, default=1000)
+    args = parser.parse_args()
+
+    recorder = Recorder(capacity=10_000)
+    timed_work = recorder.timed("work")(work)
+
+    def bare(n):
+        for i in range(n):
+            work(i)
+
+    def timed(n):
+        for i in range(n):
+            timed_work(i)
+
+    def spanned(n):
+        for i in range(n):
+            with recorder.span("work"):
+                work(i)
+
+    baseline = per_call_ns(bare, args.calls)
+    print(f"{'recording':>10}{'bare ns':>9}{'timed +ns':>11}{'span +ns':>10}")
+    added = {}
+    for enabled in (False, True):
+        recorder.enabled = enabled
+        calls = args.calls if not enabled else args.calls // 10
+        added[enabled] = (per_call_ns(timed, calls) - baseline, per_call_ns(spanned, calls) - baseline)
+        print(f"{'on' if enabled else 'off':>10}{baseline:>9.0f}{added[enabled][0]:>11.0f}{added[enabled][1]:>10.0f}")
+    assert len(recorder) == recorder.capacity and recorder.recorded == 2 * (args.calls // 10)
+    if max(added[False]) > args.max_off_ns:
+        sys.exit(f"Disabled instrumentation adds {max(added[False]):.0f} ns per call, over {args.max_off_ns:.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Per-period emission aggregates: appending one period vs rebuilding the full history.
+
+The real export is repeated --scale times along the time axis (each repeat adds
+another run of satellite passes). The benchmark times a full build, appending
+the last pass to aggregates that already hold the history, and reading the
+rolling windows, and checks that the appended aggregates match the full build.
+It then refreshes aggregates holding all but the last pass from the workbook
+itself, as the dashboard does, to show what re-reading the source costs next
+to hashing the rows already aggregated. Run from the repository root:
+
+    python -m benchmarks.bench_periods --scale 1 10
+"""
+import argparse
+import hashlib
+import time
+
+import numpy as np
+import pandas as pd
+
+from emission_periods import PeriodAggregates
+from emissions_grid import EMISSION_DTYPES, LAT_COLUMN, LON_COLUMN
+from ingest import iter_numeric_chunks
+
+EMISSIONS_PATH = "emmissions .xlsx"
+
+
+def time_series(raw, scale):
+    """Rows ordered by pass, so the last pass of every site comes last, as a weekly append would."""
+    ordinal = raw.groupby([LAT_COLUMN, LON_COLUMN]).cumcount().to_numpy()
+    passes = ordinal.max() + 1
+    repeated = pd.concat([raw] * scale, ignore_index=True)
+    order = np.argsort(np.tile(ordinal, scale) + np.repeat(np.arange(scale) * passes, len(raw)), kind="stable")
+    return repeated.iloc[order].reset_index(drop=True)
+
+
+def chunked(frame, chunk_rows):
+    return lambda: (frame.iloc[start:start + chunk_rows] for start in range(0, len(frame), chunk_rows))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--window", type=int, default=4)
+    parser.add_argument("--chunk-rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    raw = pd.concat(iter_numeric_chunks(EMISSIONS_PATH, EMISSION_DTYPES, dropna=False), ignore_index=True)
+    print(f"{'scale':>6}{'rows':>11}{'periods':>9}{'full build s':>14}{'append s':>10}{'new rows':>10}"
+          f"{'windows s':>11}")
+    for scale in args.scale:
+        series = time_series(raw, scale)
+        sites = series.groupby([LAT_COLUMN, LON_COLUMN]).ngroups
+        history = series.iloc[:len(series) - sites]
+
+        full = PeriodAggregates()
+        start = time.perf_counter()
+        full.refresh("full", chunked(series, args.chunk_rows))
+        full_seconds = time.perf_counter() - start
+
+        incremental = PeriodAggregates()
+        incremental.refresh("history", chunked(history, args.chunk_rows))
+        start = time.perf_counter()
+        added = incremental.refresh("appended", chunked(series, args.chunk_rows))
+        append_seconds = time.perf_counter() - start
+        assert incremental.table.equals(full.table), "appended aggregates differ from a full build"
+
+        start = time.perf_counter()
+        incremental.frames(args.window)
+        window_seconds = time.perf_counter() - start
+        print(f"{scale:>6}{len(series):>11,}{len(full):>9}{full_seconds:>14.3f}{append_seconds:>10.3f}"
+              f"{added:>10,}{window_seconds:>11.3f}")
+
+    # The workbook's last rows stand in for a newly appended pass.
+    workbook = lambda: iter_numeric_chunks(EMISSIONS_PATH, EMISSION_DTYPES, dropna=False)
+    sites = raw.groupby([LAT_COLUMN, LON_COLUMN]).ngroups
+    start = time.perf_counter()
+    chunks = list(workbook())
+    read_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    PeriodAggregates().extend(iter(chunks))
+    build_seconds = time.perf_counter() - start
+    digest = hashlib.sha1()
+    start = time.perf_counter()
+    for chunk in chunks:
+        digest.update(PeriodAggregates._row_bytes(chunk))
+    hash_seconds = time.perf_counter() - start
+
+    incremental = PeriodAggregates()
+    incremental.refresh("history", chunked(raw.iloc[:len(raw) - sites], args.chunk_rows))
+    start = time.perf_counter()
+    added = incremental.refresh("workbook", workbook)
+    refresh_seconds = time.perf_counter() - start
+    assert added == sites, "the workbook refresh did not append only the last pass"
+    print(f"\nWorkbook refresh appending {added:,} rows: {refresh_seconds:.2f} s, of which reading the .xlsx "
+          f"{read_seconds:.2f} s and hashing the history {hash_seconds * 1000:.1f} ms "
+          f"(re-aggregating it all: {build_seconds:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Placement solver harness: solve time and objective against k and candidate count.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_placement
+"""
+import argparse
+import time
+
+from ingest import load_columns
+from placement import candidate_sites, demand_points, max_coverage, p_median
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--spacing-km", type=float, nargs="+", default=[10.0, 5.0, 2.0, 1.5])
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 5, 10, 25, 50])
+    parser.add_argument("--radius-km", type=float, default=10.0)
+    args = parser.parse_args()
+
+    emissions = load_columns("emmissions .xlsx").dropna()
+    population = load_columns("young_pop.xlsx")
+    stations = load_columns("Charging_Stations.xlsx").dropna(subset=["Latitude", "Longitude"])
+    demand = demand_points(emissions, population)
+    print(f"{len(demand)} demand points, {len(stations)} existing stations")
+    print(f"{'solver':<14}{'candidates':>11}{'k':>5}{'seconds':>10}{'objective':>12}")
+    for spacing_km in args.spacing_km:
+        candidates = candidate_sites(demand, spacing_km)
+        for k in args.k:
+            for label, solve in (("max_coverage", lambda: max_coverage(demand, candidates, stations, k,
+                                                                          args.radius_km)),
+                                 ("p_median", lambda: p_median(demand, candidates, stations, k))):
+                start = time.perf_counter()
+                sites = solve()
+                seconds = time.perf_counter() - start
+                objective = sites["objective"].iloc[-1] if len(sites) else float("nan")
+                print(f"{label:<14}{len(candidates):>11,}{k:>5}{seconds:>10.3f}{objective:>12.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Rendered-map cache: cold render vs cache-hit latency, and LRU behaviour under a memory cap.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_render_cache
+"""
+import argparse
+import time
+
+import folium
+from folium.plugins import HeatMap
+
+from dashboard_core import STATUS_OPTIONS
+from emissions_grid import aggregate_emissions, heatmap_points
+from ingest import load_columns
+from map_layers import render_map_html, station_layer
+from render_cache import RenderCache
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hits", type=int, default=10_000)
+    parser.add_argument("--max-mb", type=float, default=1.0)
+    args = parser.parse_args()
+
+    stations = load_columns("Charging_Stations.xlsx").dropna(subset=["Latitude", "Longitude"])
+    emissions = load_columns("emmissions .xlsx").dropna()
+    cache = RenderCache(max_bytes=int(args.max_mb * 2 ** 20))
+
+    def station_map(status):
+        data = stations if status == "All" else stations[stations["Status"] == status]
+        m = folium.Map(location=[-1.95, 30.06], zoom_start=8)
+        station_layer(data).add_to(m)
+        return render_map_html(m)
+
+    def emission_map():
+        m = folium.Map(location=[-1.95, 30.06], zoom_start=7)
+        HeatMap(heatmap_points(aggregate_emissions(emissions))).add_to(m)
+        return render_map_html(m)
+
+    print(f"{'map':<28}{'miss ms':>10}{'hit us':>10}{'KB':>8}")
+    for label, key, render in [("stations / " + status, ("stations", "v1", status, None),
+                                lambda status=status: station_map(status)) for status in STATUS_OPTIONS] + \
+                              [("emissions heatmap", ("emissions", "v1"), emission_map)]:
+        start = time.perf_counter()
+        html = cache.get_or_render(key, render)
+        miss_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        for _ in range(args.hits):
+            cache.get_or_render(key, render)
+        hit_us = (time.perf_counter() - start) / args.hits * 1e6
+        print(f"{label:<28}{miss_ms:>10.1f}{hit_us:>10.2f}{len(html) / 1024:>8.0f}")
+
+    stats = cache.stats()
+    print(f"cache: {stats['entries']} entries, {stats['bytes'] / 1024:.0f} KB of {args.max_mb:g} MB cap, "
+          f"{stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions")
+    assert stats["bytes"] <= cache.max_bytes
+
+
+if __name__ == "__main__":
+    main()
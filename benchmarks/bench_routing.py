@@ -0,0 +1,112 @@
+"""Drive-time catchments: one multi-source Dijkstra vs a shortest-path run per station.
+
+A country-sized synthetic road network is laid out as a jittered grid over
+Rwanda with a share of its links dropped, a mix of road classes (and so
+speeds) and some one-way links. Timed are compiling the edge list into the
+CSR graph, labelling every node with its fastest station in one multi-source
+pass (`routing.RoadCatchments.build`), the per-station baseline (a
+single-source run per station, keeping the running minimum; only run while
+stations x nodes stays under --max-scan), the catchment cache round-trip and
+point queries. Where the baseline runs, the travel times are checked to agree.
+Run from the repository root:
+
+    python -m benchmarks.bench_routing --nodes 100000 1000000 --stations 100 1000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+from scipy.sparse.csgraph import dijkstra
+
+from routing import HIGHWAY_SPEEDS_KMH, RoadCatchments, RoadGraph
+from station_index import haversine_km
+
+# Rwanda's bounding box, padded slightly.
+SOUTH, WEST, NORTH, EAST = -2.9, 28.8, -1.0, 30.95
+ROAD_CLASSES = ("trunk", "primary", "secondary", "tertiary", "residential")
+CLASS_SHARES = (0.02, 0.05, 0.13, 0.3, 0.5)
+QUERIES = 10_000
+
+
+def synthetic_roads(n_nodes, rng, drop=0.15, oneway=0.05):
+    side = int(np.sqrt(n_nodes))
+    rows, cols = np.divmod(np.arange(side * side), side)
+    step_lat, step_lon = (NORTH - SOUTH) / side, (EAST - WEST) / side
+    lat = SOUTH + (rows + rng.uniform(0.1, 0.9, side * side)) * step_lat
+    lon = WEST + (cols + rng.uniform(0.1, 0.9, side * side)) * step_lon
+    grid = np.arange(side * side).reshape(side, side)
+    source = np.concatenate([grid[:, :-1].ravel(), grid[:-1, :].ravel()])
+    target = np.concatenate([grid[:, 1:].ravel(), grid[1:, :].ravel()])
+    keep = rng.random(len(source)) >= drop
+    source, target = source[keep], target[keep]
+    speed = np.array([HIGHWAY_SPEEDS_KMH[name] for name in ROAD_CLASSES])[
+        rng.choice(len(ROAD_CLASSES), len(source), p=CLASS_SHARES)]
+    seconds = haversine_km(lat[source], lon[source], lat[target], lon[target]) / speed * 3600.0
+    both = rng.random(len(source)) >= oneway
+    return (lat, lon, np.concatenate([source, target[both]]), np.concatenate([target, source[both]]),
+            np.concatenate([seconds, seconds[both]]))
+
+
+def per_station(graph, station_lat, station_lon):
+    nodes, _ = graph.snap(station_lat, station_lon)
+    reversed_csr = graph.csr.T.tocsr()
+    best = np.full(len(graph), np.inf)
+    for node in np.unique(nodes):
+        np.minimum(best, dijkstra(reversed_csr, directed=True, indices=node), out=best)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--stations", type=int, nargs="+", default=[100, 1_000])
+    parser.add_argument("--max-scan", type=float, default=2e7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'nodes':>10}{'edges':>11}{'stations':>10}{'csr ms':>9}{'multi ms':>10}{'per-stn ms':>12}"
+          f"{'speedup':>9}{'load ms':>9}{'query us':>10}")
+    for n_nodes in args.nodes:
+        lat, lon, source, target, seconds = synthetic_roads(n_nodes, rng)
+        start = time.perf_counter()
+        graph = RoadGraph(lat, lon, source, target, seconds, version=f"synthetic-{n_nodes}")
+        csr_ms = (time.perf_counter() - start) * 1000
+        for n_stations in args.stations:
+            station_lat = rng.uniform(SOUTH, NORTH, n_stations)
+            station_lon = rng.uniform(WEST, EAST, n_stations)
+            start = time.perf_counter()
+            catchments = RoadCatchments.build(graph, station_lat, station_lon)
+            multi_ms = (time.perf_counter() - start) * 1000
+
+            scan = f"{'skipped':>12}{'':>9}"
+            if len(graph) * n_stations <= args.max_scan:
+                start = time.perf_counter()
+                best = per_station(graph, station_lat, station_lon)
+                scan_ms = (time.perf_counter() - start) * 1000
+                assert np.allclose(np.where(np.isinf(best), -1, best),
+                                   np.where(np.isinf(catchments.node_seconds), -1, catchments.node_seconds),
+                                   rtol=1e-5), "multi-source and per-station travel times disagree"
+                scan = f"{scan_ms:>12.0f}{scan_ms / multi_ms:>8.0f}x"
+
+            with tempfile.TemporaryDirectory() as directory:
+                cache_path = os.path.join(directory, "catchments.npz")
+                catchments.save(cache_path)
+                start = time.perf_counter()
+                with np.load(cache_path) as arrays:
+                    loaded = RoadCatchments(graph, arrays["node_station"], arrays["node_seconds"])
+                load_ms = (time.perf_counter() - start) * 1000
+            assert np.array_equal(loaded.node_station, catchments.node_station)
+
+            query_lat, query_lon = rng.uniform(SOUTH, NORTH, QUERIES), rng.uniform(WEST, EAST, QUERIES)
+            start = time.perf_counter()
+            for i in range(QUERIES):
+                catchments.nearest(query_lat[i], query_lon[i])
+            query_us = (time.perf_counter() - start) * 1e6 / QUERIES
+            print(f"{len(graph):>10,}{graph.edges:>11,}{n_stations:>10,}{csr_ms:>9.0f}{multi_ms:>10.0f}{scan}"
+                  f"{load_ms:>9.1f}{query_us:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
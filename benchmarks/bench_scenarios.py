@@ -0,0 +1,51 @@
+"""Scenario runner harness: throughput and parallel efficiency against worker count.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_scenarios --combination-size 4 --resolution 0.02
+"""
+import argparse
+import os
+import time
+
+from ingest import load_columns
+from placement import demand_points
+from scenarios import combination_scenarios, evaluate_scenarios, standard_scenarios
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--combination-size", type=int, default=3)
+    parser.add_argument("--resolution", type=float, default=0.02, help="demand grid resolution (degrees)")
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--chunk-size", type=int, default=256)
+    args = parser.parse_args()
+
+    emissions = load_columns("emmissions .xlsx").dropna()
+    population = load_columns("young_pop.xlsx")
+    stations = load_columns("Charging_Stations.xlsx").dropna(subset=["Latitude", "Longitude"]).reset_index(drop=True)
+    demand = demand_points(emissions, population, args.resolution)
+    scenarios = standard_scenarios(stations)
+    scenarios.update(combination_scenarios(stations, size=args.combination_size))
+    print(f"{len(scenarios):,} scenarios, {len(demand):,} demand points, {len(stations)} stations, "
+          f"{os.cpu_count()} CPUs")
+    print(f"{'workers':>8}{'seconds':>10}{'scenarios/s':>13}{'speedup':>9}{'efficiency':>12}")
+    serial = None
+    reference = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        ranked = evaluate_scenarios(demand, stations, scenarios, max_workers=workers, chunk_size=args.chunk_size)
+        seconds = time.perf_counter() - start
+        serial = serial or seconds
+        if reference is None:
+            reference = ranked
+        else:
+            assert ranked["scenario"].equals(reference["scenario"]), "parallel ranking differs from serial"
+        speedup = serial / seconds
+        print(f"{workers:>8}{seconds:>10.3f}{len(scenarios) / seconds:>13,.0f}{speedup:>9.2f}"
+              f"{speedup / workers:>12.0%}")
+
+
+if __name__ == "__main__":
+    main()
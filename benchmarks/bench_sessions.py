@@ -0,0 +1,109 @@
+"""Concurrent-session load test: memory per session and rerun latency of the Client dashboard.
+
+Keeps --sessions AppTest sessions alive in one process, as a Streamlit server
+hosts them, and interleaves their reruns round-robin (AppTest itself is not
+thread-safe, so requests are not issued in parallel). Each session logs in as a
+client, then reruns the script --reruns times, changing the station-status
+filter each time. Also compares handing a table to a session through the
+shared DataService (a view) against the pickle round trip st.cache_data
+performs on every hit.
+Run from the repository root:
+
+    python -m benchmarks.bench_sessions --sessions 1 4 8
+"""
+import argparse
+import gc
+import os
+import pickle
+import time
+
+import numpy as np
+
+from data_service import DataService, enable_copy_on_write, frame_nbytes
+from emissions_grid import EMISSION_DTYPES
+from ingest import dataset_version, load_columns, load_numeric_columns
+
+APP_PATH = os.path.abspath("OptimChargeDashboard.py")
+# Tabs only render once opened, so each session keeps the station tab open.
+STATION_TAB = "⚡ EV Charging Stations"
+STATUSES = ["All", "Operational", "Planned", "Awaiting Contract", "Pending Site Visit"]
+
+
+def rss_mb():
+    with open("/proc/self/statm") as handle:
+        return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def start_session():
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(APP_PATH, default_timeout=300)
+    app.run()
+    app.sidebar.selectbox[0].set_value("Client")
+    app.sidebar.text_input[0].input("client")
+    app.sidebar.text_input[1].input("client123")
+    app.sidebar.button[0].click().run()
+    app.session_state["tab"] = STATION_TAB
+    app.run()
+    return app
+
+
+def rerun(app, status):
+    """Changes the status filter and times the rerun it triggers."""
+    next(box for box in app.selectbox if box.label == "Station Status").set_value(status)
+    app.session_state["tab"] = STATION_TAB
+    start = time.perf_counter()
+    app.run()
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+    return time.perf_counter() - start
+
+
+def handoff_costs(repeat=20):
+    """Per-hit cost of getting each table from the shared service vs a cache_data-style pickle copy."""
+    tables = {
+        "emissions": ("emmissions .xlsx", lambda: load_numeric_columns("emmissions .xlsx", EMISSION_DTYPES),
+                      dataset_version("emmissions .xlsx", columns=EMISSION_DTYPES)),
+        "stations": ("Charging_Stations.xlsx", lambda: load_columns("Charging_Stations.xlsx"),
+                     dataset_version("Charging_Stations.xlsx")),
+    }
+    service = DataService()
+    print(f"{'table':<12}{'rows':>8}{'MB':>8}{'view µs':>10}{'pickle copy µs':>16}")
+    for name, (path, load, version) in tables.items():
+        frame = service.table(path, version, load)
+        payload = pickle.dumps(frame)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            service.table(path, version, load)
+        view = (time.perf_counter() - start) / repeat
+        start = time.perf_counter()
+        for _ in range(repeat):
+            pickle.loads(payload)
+        copy = (time.perf_counter() - start) / repeat
+        print(f"{name:<12}{len(frame):>8,}{frame_nbytes(frame) / 2 ** 20:>8.2f}{view * 1e6:>10.1f}{copy * 1e6:>16.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--reruns", type=int, default=5)
+    args = parser.parse_args()
+    enable_copy_on_write()
+
+    handoff_costs()
+    # Warm the shared caches once so every row measures steady-state sessions.
+    rerun(start_session(), STATUSES[0])
+    print(f"\n{'sessions':>9}{'RSS MB':>9}{'MB/session':>12}{'p50 rerun s':>13}{'p95 rerun s':>13}")
+    for sessions in args.sessions:
+        gc.collect()
+        before = rss_mb()
+        apps = [start_session() for _ in range(sessions)]
+        latencies = [rerun(app, STATUSES[round_ % len(STATUSES)])
+                     for round_ in range(args.reruns) for app in apps]
+        after = rss_mb()
+        print(f"{sessions:>9}{after:>9.1f}{(after - before) / sessions:>12.2f}"
+              f"{np.percentile(latencies, 50):>13.3f}{np.percentile(latencies, 95):>13.3f}")
+        del apps
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Dashboard cold start: time to the login screen and to the first tab, in fresh interpreters.
+
+Each repeat starts a new Python process (so no module, Streamlit cache or
+DataService table is warm) and drives the dashboard with Streamlit's AppTest:
+the first run renders the login screen, the next log in as --role and
+render the default tab. Reported are the medians of interpreter start plus
+importing Streamlit, the login-screen run and the first-tab run, and which
+heavy modules the login screen pulled in. The run fails when the login
+screen exceeds --max-login-ms or imports any of them, so it can gate
+regressions. On-disk dataset caches are left as they are; delete
+.optimcharge_cache first to include the one-off Excel conversion.
+Run from the repository root:
+
+    python -m benchmarks.bench_startup --repeats 5 --max-login-ms 1500
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+# Modules the login screen has no use for; importing any of them before login is a regression.
+HEAVY_MODULES = ("folium", "matplotlib", "scipy", "branca")
+CREDENTIALS = {"Client": ("client", "client123"), "EV User": ("evuser", "evuser123")}
+
+PROBE = """
+import json, os, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+at = AppTest.from_file(os.path.abspath({script!r}), default_timeout=600)
+at.run()
+login = time.perf_counter()
+heavy = sorted(name for name in {heavy!r} if name in sys.modules)
+at.sidebar.selectbox[0].set_value({role!r})
+at.sidebar.text_input[0].input({username!r})
+at.sidebar.text_input[1].input({password!r})
+at.sidebar.button[0].click().run()
+at.run()
+done = time.perf_counter()
+assert not at.exception, [e.value for e in at.exception]
+print(json.dumps({{"import_s": imported - start, "login_s": login - imported, "tab_s": done - login, "heavy": heavy}}))
+"""
+
+
+def probe(script, role):
+    username, password = CREDENTIALS[role]
+    code = PROBE.format(script=script, heavy=HEAVY_MODULES, role=role, username=username, password=password)
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings["process_s"] = time.perf_counter() - start
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--script", default="OptimChargeDashboard.py")
+    parser.add_argument("--role", choices=list(CREDENTIALS), default="Client")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--max-login-ms", type=float, default=1500)
+    args = parser.parse_args()
+
+    runs = [probe(args.script, args.role) for _ in range(args.repeats)]
+
+    def median_ms(field):
+        return statistics.median(run[field] for run in runs) * 1000
+
+    heavy = sorted({name for run in runs for name in run["heavy"]})
+    print(f"{'process ms':>11}{'import ms':>11}{'login ms':>10}{'first tab ms':>14}  heavy modules at login")
+    print(f"{median_ms('process_s'):>11.0f}{median_ms('import_s'):>11.0f}{median_ms('login_s'):>10.0f}"
+          f"{median_ms('tab_s'):>14.0f}  {', '.join(heavy) or '-'}")
+    if median_ms("login_s") > args.max_login_ms:
+        sys.exit(f"Login screen took {median_ms('login_s'):.0f} ms, over the {args.max_login_ms:.0f} ms budget")
+    if heavy:
+        sys.exit(f"Login screen imported {', '.join(heavy)}")
+
+
+if __name__ == "__main__":
+    main()
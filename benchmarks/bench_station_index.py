@@ -0,0 +1,59 @@
+"""Station index build and query latency vs a brute-force haversine scan, up to 100k stations.
+
+Stations come from `benchmarks.synthetic`, scattered around the province
+centres like the real sheet; queries are uniform over Rwanda. Run from the
+repository root:
+
+    python -m benchmarks.bench_station_index
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import EAST, NORTH, SOUTH, WEST, stations
+from station_index import StationIndex, haversine_km
+
+
+def per_query_ms(func, queries):
+    start = time.perf_counter()
+    for lat, lon in queries:
+        func(lat, lon)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    queries = list(zip(rng.uniform(SOUTH, NORTH, args.queries), rng.uniform(WEST, EAST, args.queries)))
+    print(f"{'stations':>10}{'build ms':>10}{'k=1 ms':>10}{'k=5 ms':>10}{'10 km ms':>10}"
+          f"{'bbox ms':>10}{'scan ms':>10}")
+    for n in args.sizes:
+        data = stations(n, np.random.default_rng(0))
+        lat, lon = data["Latitude"].to_numpy(), data["Longitude"].to_numpy()
+        start = time.perf_counter()
+        index = StationIndex(lat, lon)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        # Correctness: the index must agree with an exhaustive haversine scan.
+        for q_lat, q_lon in queries[:50]:
+            distances = haversine_km(q_lat, q_lon, lat, lon)
+            positions, found = index.nearest(q_lat, q_lon, k=5)
+            assert np.allclose(found, np.sort(distances)[:5], atol=1e-6)
+            inside, _ = index.within_radius(q_lat, q_lon, 10.0)
+            assert set(inside) == set(np.flatnonzero(distances <= 10.0))
+
+        k1 = per_query_ms(lambda a, b: index.nearest(a, b), queries)
+        k5 = per_query_ms(lambda a, b: index.nearest(a, b, k=5), queries)
+        radius = per_query_ms(lambda a, b: index.within_radius(a, b, 10.0), queries)
+        bbox = per_query_ms(lambda a, b: index.in_bbox(a - 0.05, b - 0.05, a + 0.05, b + 0.05), queries)
+        scan = per_query_ms(lambda a, b: np.argmin(haversine_km(a, b, lat, lon)), queries)
+        print(f"{n:>10}{build_ms:>10.1f}{k1:>10.3f}{k5:>10.3f}{radius:>10.3f}{bbox:>10.3f}{scan:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Station map build + HTML render time: per-row folium.Marker vs the columnar StationLayer.
+
+Stations come from `benchmarks.synthetic`. Run from the repository root:
+
+    python -m benchmarks.bench_station_markers
+"""
+import argparse
+import time
+
+import folium
+import numpy as np
+from folium.plugins import MarkerCluster
+
+from benchmarks.synthetic import stations
+from map_layers import station_layer
+
+def iterrows_map(data):
+    """The original display_station_map marker loop."""
+    m = folium.Map(location=[-1.95, 30.06], zoom_start=8)
+    marker_cluster = MarkerCluster().add_to(m)
+    for _, row in data.iterrows():
+        popup_content = (
+            f"<b>Station:</b> {row['Connector Name']}<br>"
+            f"<b>Status:</b> {row['Status']}<br>"
+            f"<b>Connector Type:</b> {row['Connector Type']}<br>"
+            f"<b>Availability:</b> {row['Charger Availability']}<br>"
+            f"<b>Address:</b> {row['Address']}"
+        )
+        color = "green" if row["Status"] == "Operational" else "orange"
+        folium.Marker([row["Latitude"], row["Longitude"]], popup=popup_content,
+                      icon=folium.Icon(color=color)).add_to(marker_cluster)
+    return m
+
+
+def layer_map(data):
+    m = folium.Map(location=[-1.95, 30.06], zoom_start=8)
+    station_layer(data).add_to(m)
+    return m
+
+
+def measure(build, data):
+    start = time.perf_counter()
+    html = build(data).get_root().render()
+    return time.perf_counter() - start, len(html.encode("utf-8"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 100_000])
+    parser.add_argument("--skip-iterrows-above", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"{'stations':>10}{'path':>12}{'seconds':>10}{'payload MB':>12}")
+    for n in args.sizes:
+        data = stations(n, np.random.default_rng(0))
+        paths = [("layer", layer_map)]
+        if n <= args.skip_iterrows_above:
+            paths.insert(0, ("iterrows", iterrows_map))
+        for label, build in paths:
+            seconds, size = measure(build, data)
+            print(f"{n:>10}{label:>12}{seconds:>10.3f}{size / 2 ** 20:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Station hot reload: applying a status edit incrementally vs rebuilding everything.
+
+`benchmarks.synthetic` generates --sizes stations with the real sheet's
+schema. For each size a render cache is filled with one map per status
+and per town, plus nearest-station maps, then one station's status is edited.
+The full reload rebuilds both indexes and drops every rendered map; the
+StationStore diffs by Charger ID, reuses the indexes and drops only the maps
+showing the edited station. Reading the source costs the same either way and
+is left out of both timings.
+Run from the repository root:
+
+    python -m benchmarks.bench_station_reload --sizes 1000 10000 100000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import stations
+from render_cache import RenderCache
+from station_index import StationIndex
+from station_store import STATION_KEY, TOWN_COLUMN, StationStore, nearest_map_key, station_map_key
+from town_search import TownIndex, normalize
+
+STATIONS_PATH = "Charging_Stations.xlsx"
+
+
+def fill(cache, frame, nearest=200):
+    for status in ["All", *frame["Status"].unique()]:
+        cache.put(station_map_key(status=status), "<html/>")
+    for town in frame[TOWN_COLUMN].unique():
+        cache.put(station_map_key(town=normalize(town)), "<html/>")
+    for charger_id in frame[STATION_KEY].iloc[:nearest]:
+        cache.put(nearest_map_key(int(charger_id)), "<html/>")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    print(f"{'stations':>10}{'full ms':>10}{'maps kept':>11}{'store ms':>10}{'maps kept':>11}{'diff':>18}")
+    for n in args.sizes:
+        frame = stations(n, np.random.default_rng(0))
+        cache = RenderCache(max_entries=10 ** 6)
+        store = StationStore(STATIONS_PATH, lambda: frame, render_cache=cache)
+        fill(cache, frame)
+
+        edited = frame.copy()
+        row = len(edited) // 2
+        edited.loc[row, "Status"] = "Operational" if edited.loc[row, "Status"] != "Operational" else "Planned"
+
+        full_cache = RenderCache(max_entries=10 ** 6)
+        fill(full_cache, frame)
+        start = time.perf_counter()
+        StationIndex.from_frame(edited, version="edited")
+        TownIndex(edited[TOWN_COLUMN])
+        full_cache.invalidate(lambda key: True)
+        full_ms = (time.perf_counter() - start) * 1000
+
+        index = store.snapshot.index
+        start = time.perf_counter()
+        diff = store.apply(edited, "edited")
+        store_ms = (time.perf_counter() - start) * 1000
+        assert store.snapshot.index is index, "a status edit must not rebuild the spatial index"
+        assert store.snapshot.frame.equals(edited), "incremental frame differs from the edited source"
+        summary = ", ".join(f"{len(keys)} {kind}" for kind, keys in diff.items() if keys)
+        print(f"{n:>10}{full_ms:>10.1f}{len(full_cache):>11}{store_ms:>10.1f}{len(cache):>11}{summary:>18}")
+
+if __name__ == "__main__":
+    main()
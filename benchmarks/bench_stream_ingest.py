@@ -0,0 +1,128 @@
+"""Streaming emissions ingest: peak RSS and rows/s on synthetic exports of growing size.
+
+Writes seeded synthetic emissions workbooks (or CSVs) at each --scale multiple of
+the real export's row count, then loads each one in a fresh interpreter with
+pd.read_excel, the streaming grid aggregation and the streaming numeric cache.
+Run from the repository root:
+
+    python -m benchmarks.bench_stream_ingest --scale 1 10
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from emissions_grid import EMISSION_DTYPES, LAT_COLUMN, LON_COLUMN, VALUE_COLUMN
+
+BASE_ROWS = 79_023
+MODES = ("read_excel", "stream_aggregate", "numeric_cache")
+
+
+def write_synthetic(file_path, rows, seed=0, chunk_rows=100_000):
+    """Writes an emissions export with the real schema: text cells on a 0.01 degree lattice, ~3% blanks."""
+    rng = np.random.default_rng(seed)
+
+    def chunks():
+        for start in range(0, rows, chunk_rows):
+            n = min(chunk_rows, rows - start)
+            lat = np.round(rng.uniform(-2.84, -1.05, n), 2)
+            lon = np.round(rng.uniform(28.86, 30.90, n), 2)
+            value = rng.lognormal(7.5, 0.3, n).astype(str).astype(object)
+            value[rng.random(n) < 0.03] = None
+            yield zip(lat.astype(str), lon.astype(str), value)
+
+    header = (LAT_COLUMN, LON_COLUMN, VALUE_COLUMN)
+    if file_path.endswith(".csv"):
+        with open(file_path, "w", encoding="utf-8") as handle:
+            handle.write(",".join(header) + "\n")
+            for chunk in chunks():
+                handle.writelines(f"{a},{b},{'' if c is None else c}\n" for a, b, c in chunk)
+        return
+    import openpyxl
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet("emissions")
+    sheet.append(header)
+    for chunk in chunks():
+        for row in chunk:
+            sheet.append(row)
+    workbook.save(file_path)
+
+
+def _child(mode, file_path, cache_dir):
+    """Runs one load in a fresh interpreter and prints its timings as JSON."""
+    os.environ["OPTIMCHARGE_CACHE_DIR"] = cache_dir
+    import pandas as pd
+
+    import ingest
+    from emissions_grid import aggregate_chunks, aggregate_emissions
+
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if mode == "read_excel":
+        reader = pd.read_csv if file_path.endswith(".csv") else pd.read_excel
+        data = reader(file_path).dropna(subset=list(EMISSION_DTYPES))
+        rows, cells = len(data), len(aggregate_emissions(data))
+    elif mode == "stream_aggregate":
+        counter = {"rows": 0}
+
+        def counted(chunks):
+            for chunk in chunks:
+                counter["rows"] += len(chunk)
+                yield chunk
+
+        grid = aggregate_chunks(counted(ingest.iter_numeric_chunks(file_path, EMISSION_DTYPES)))
+        rows, cells = counter["rows"], len(grid)
+    else:
+        manifest = ingest.build_numeric_cache(file_path, EMISSION_DTYPES)
+        rows, cells = manifest["rows"], len(aggregate_emissions(ingest.load_numeric_columns(file_path,
+                                                                                            EMISSION_DTYPES)))
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"mode": mode, "rows": rows, "cells": cells, "seconds": elapsed,
+                      "peak_rss_mb": peak_kb / 1024, "delta_rss_mb": (peak_kb - baseline_kb) / 1024}))
+
+
+def run(mode, file_path, cache_dir):
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_stream_ingest", "--child", mode, "--file", file_path,
+         "--cache-dir", cache_dir],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--format", choices=["xlsx", "csv"], default="xlsx")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--file", help=argparse.SUPPRESS)
+    parser.add_argument("--cache-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        _child(args.child, args.file, args.cache_dir)
+        return
+
+    print(f"{'scale':>6}{'mode':>18}{'rows':>11}{'cells':>7}{'seconds':>9}{'rows/s':>11}"
+          f"{'peak RSS MB':>13}{'load RSS MB':>13}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for scale in args.scale:
+            file_path = os.path.join(workdir, f"emissions_x{scale}.{args.format}")
+            write_synthetic(file_path, BASE_ROWS * scale, seed=scale)
+            for mode in args.modes:
+                result = run(mode, file_path, os.path.join(workdir, "cache"))
+                print(f"{scale:>6}{mode:>18}{result['rows']:>11,}{result['cells']:>7}{result['seconds']:>9.2f}"
+                      f"{result['rows'] / result['seconds']:>11,.0f}{result['peak_rss_mb']:>13.1f}"
+                      f"{result['delta_rss_mb']:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Telemetry ingestion throughput: simulator -> bounded queue -> array-backed state on one core.
+
+For each --connectors size, the simulator first runs paced at --rate events/s
+for --duration seconds (the sustained case: every event must be ingested, the
+queue must stay bounded and the CPU share shows the headroom left), then
+unthrottled to find the ceiling, where backpressure stalls the producer
+instead of growing the queue. Producer and consumer share one event loop.
+Run from the repository root:
+
+    python -m benchmarks.bench_telemetry --connectors 1000 10000 --rate 10000
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from telemetry import DEFAULT_QUEUE_SIZE, TelemetryIngestor, TelemetrySimulator, TelemetryState
+
+
+async def run(connectors, rate, duration, queue_size):
+    state = TelemetryState(np.arange(1, connectors + 1))
+    ingestor = TelemetryIngestor(state, queue_size)
+    simulator = TelemetrySimulator(state, rate)
+    consumer = asyncio.create_task(ingestor.run())
+    wall, cpu = time.perf_counter(), time.process_time()
+    await simulator.run(ingestor.queue, duration)
+    while not ingestor.queue.empty():
+        await asyncio.sleep(0)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    consumer.cancel()
+    assert state.events == simulator.sent, "events were lost between the simulator and the state table"
+    assert ingestor.max_depth <= queue_size
+    lag_ms = np.asarray(ingestor.lag) * 1000
+    return {"events/s": state.events / wall, "cpu %": cpu / wall * 100, "stalls": simulator.stalls,
+            "max depth": ingestor.max_depth, "lag p50 ms": np.percentile(lag_ms, 50),
+            "lag p99 ms": np.percentile(lag_ms, 99)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--connectors", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--rate", type=int, default=10_000)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE)
+    args = parser.parse_args()
+
+    columns = ["events/s", "cpu %", "stalls", "max depth", "lag p50 ms", "lag p99 ms"]
+    print(f"{'connectors':>11}{'mode':>12}" + "".join(f"{name:>12}" for name in columns))
+    for connectors in args.connectors:
+        for mode, rate in ((f"{args.rate:,}/s", args.rate), ("unthrottled", None)):
+            result = asyncio.run(run(connectors, rate, args.duration, args.queue_size))
+            print(f"{connectors:>11}{mode:>12}" + "".join(
+                f"{result[name]:>12,.0f}" if name in ("events/s", "stalls", "max depth") else f"{result[name]:>12.1f}"
+                for name in columns))
+            if rate is not None:
+                assert result["events/s"] >= 0.98 * rate, f"could not sustain {rate:,} events/s"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Time to build the full emission tile pyramid, serially and with a process pool.
+
+The (optionally scaled) points are written to Parquet and streamed into an
+ingest cache, whose .npy files the workers map. Fails if the banded build
+disagrees with rendering each zoom level from all points at once. Run from
+the repository root:
+
+    python -m benchmarks.bench_tiles --scale 10
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import ingest
+import tiles
+from emissions_grid import EMISSION_DTYPES, LAT_COLUMN, LON_COLUMN, VALUE_COLUMN
+from ingest import load_columns, numeric_column_files
+
+EMISSIONS_PATH = "emmissions .xlsx"
+
+
+def synthetic_points(data, scale, seed=0):
+    """Repeats the emission points `scale` times with sub-cell jitter."""
+    rng = np.random.default_rng(seed)
+    lat = np.repeat(data["latitude"].to_numpy(), scale)
+    lon = np.repeat(data["longitude"].to_numpy(), scale)
+    values = np.repeat(data[VALUE_COLUMN].to_numpy(), scale)
+    if scale > 1:
+        lat = lat + rng.uniform(-0.05, 0.05, len(lat))
+        lon = lon + rng.uniform(-0.05, 0.05, len(lon))
+    return lat, lon, values
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--file", default=EMISSIONS_PATH)
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--min-zoom", type=int, default=tiles.MIN_ZOOM)
+    parser.add_argument("--max-zoom", type=int, default=tiles.MAX_ZOOM)
+    args = parser.parse_args()
+
+    data = load_columns(args.file, ["latitude", "longitude", VALUE_COLUMN]).dropna()
+    lat, lon, values = synthetic_points(data, args.scale)
+    workers = sorted({1, 2, os.cpu_count() or 1})
+    print(f"{len(values):,} points, zoom {args.min_zoom}-{args.max_zoom}")
+    print(f"{'workers':>8}{'seconds':>10}{'tiles':>10}")
+    with tempfile.TemporaryDirectory() as tile_dir:
+        tiles.TILE_DIR = ingest.CACHE_DIR = tile_dir
+        source = os.path.join(tile_dir, "points.parquet")
+        pd.DataFrame({LAT_COLUMN: lat, LON_COLUMN: lon, VALUE_COLUMN: values}).to_parquet(source, index=False)
+        paths = numeric_column_files(source, EMISSION_DTYPES)
+        for count in workers:
+            start = time.perf_counter()
+            manifest = tiles.build_pyramid("bench", f"w{count}", paths, args.min_zoom, args.max_zoom,
+                                           max_workers=count)
+            elapsed = time.perf_counter() - start
+            print(f"{count:>8}{elapsed:>10.2f}{sum(manifest['tiles'].values()):>10}")
+
+        # Bands must add up to the same tiles as rendering each level whole.
+        values = np.load(paths[2]).astype(np.float64)
+        for zoom in range(args.min_zoom, args.max_zoom + 1):
+            n_tiles, peak = tiles.render_zoom_level(os.path.join(tile_dir, "whole"), zoom, np.load(paths[0]),
+                                                    np.load(paths[1]), values, "whole")
+            assert manifest["tiles"][str(zoom)] == n_tiles and np.isclose(manifest["peaks"][str(zoom)], peak)
+
+        bounds = tiles.viewport_bounds([-1.95, 30.06], 7)
+        start = time.perf_counter()
+        cells = tiles.load_tiles("bench", f"w{workers[-1]}", 7, bounds)
+        print(f"viewport read at z7: {len(cells)} cells in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
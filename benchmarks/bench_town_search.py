@@ -0,0 +1,60 @@
+"""Town/address search: TownIndex vs Series.str.contains on a synthetic 1M-row address table.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_town_search
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from town_search import TownIndex
+
+TOWNS = ["Kigali", "Ruhengeri (Musanze)", "Kinigi (Musanze)", "Rubavu (Gisenyi)", "Butare (Huye)", "Kayonza",
+         "Nyamagabe", "Kibuye (Karongi)", "Kamembe (Rusizi)", "Nyanza", "Rwamagana", "Muhanga", "Nyagatare",
+         "Rulindo", "Gicumbi", "Kicukiro", "Gasabo", "Nyarugenge", "Rugunga", "Kanombe"]
+STREETS = ["KN", "KG", "KK", "RN", "NR"]
+QUERIES = ["musanze", "Gisenyi", "kig", "Nyamagabe", "KK 12", "Rusizi", "zzz"]
+
+
+def synthetic_addresses(n, distinct, seed=0):
+    rng = np.random.default_rng(seed)
+    pool = np.array([f"{rng.integers(1, 400)} {rng.choice(STREETS)} {rng.integers(1, 99)} Ave, "
+                     f"{rng.choice(TOWNS)}, Rwanda" for _ in range(distinct)], dtype=object)
+    return pd.Series(pool[rng.integers(0, distinct, n)])
+
+
+def timed(func, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--distinct", type=int, default=50_000)
+    args = parser.parse_args()
+
+    addresses = synthetic_addresses(args.rows, args.distinct)
+    build_ms, index = timed(lambda: TownIndex(addresses))
+    print(f"{args.rows:,} rows, {args.distinct:,} distinct addresses, index built in {build_ms:.0f} ms")
+    print(f"{'query':<12}{'str.contains ms':>16}{'index cold ms':>15}{'index warm ms':>15}"
+          f"{'prefix ms':>11}{'fuzzy ms':>10}{'matches':>10}")
+    for query in QUERIES:
+        scan_ms, mask = timed(lambda: addresses.str.contains(query, case=False, na=False))
+        cold_ms, rows = timed(lambda: index.contains(query))
+        warm_ms, _ = timed(lambda: index.contains(query), repeat=100)
+        prefix_ms, _ = timed(lambda: index.prefix(query))
+        fuzzy_ms, _ = timed(lambda: index.fuzzy(query))
+        assert np.array_equal(np.flatnonzero(mask.to_numpy()), rows), query
+        print(f"{query:<12}{scan_ms:>16.1f}{cold_ms:>15.2f}{warm_ms:>15.4f}"
+              f"{prefix_ms:>11.2f}{fuzzy_ms:>10.2f}{len(rows):>10,}")
+    print("suggestions for 'ki':", index.suggest("ki", limit=5))
+
+
+if __name__ == "__main__":
+    main()
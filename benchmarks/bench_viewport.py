@@ -0,0 +1,103 @@
+"""Viewport layers: payload and latency per pan or zoom for large station and population datasets.
+
+`benchmarks.synthetic` generates --stations stations and --population
+population areas, and the layer the dashboard sends after each map
+interaction is built for --views viewports per zoom level (random pans over
+Rwanda at the dashboard's 800 x 500 map size): markers for the stations in
+view, or server-side count bubbles below the detail zoom or past the point
+limit, and likewise for the population. Reports the median and worst build
+time and the JavaScript payload streamlit-folium sends per view, next to the
+marker layer of every station that was sent before. Fails when any view's
+payload exceeds --max-kb, or a bubble layer loses or invents points. Run from
+the repository root:
+
+    python -m benchmarks.bench_viewport --stations 200000 --population 200000 --max-kb 300
+"""
+import argparse
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import EAST, NORTH, SOUTH, WEST, population, stations
+from dashboard_core import (MAP_CENTER, cluster_points, level_of_detail, population_features, population_index,
+                            station_features, viewport_positions)
+from map_layers import detached_script, station_layer
+from station_index import StationIndex
+from tiles import viewport_bounds
+
+ZOOMS = [7, 8, 9, 10, 11, 12, 13, 14, 15]
+
+
+def payload_bytes(layer):
+    """Bytes of the layer script the dashboard caches and streamlit-folium sends for `layer`."""
+    return len(detached_script(layer))
+
+
+def sweep(name, index, layer_for, views, zooms):
+    """Finds the points in each view at each zoom and builds their layer. Yields (zoom, detail counts, ms list,
+    bytes list)."""
+    for zoom in zooms:
+        times, sizes, details = [], [], {}
+        for center in views:
+            bounds = viewport_bounds(center, zoom)
+            start = time.perf_counter()
+            positions = viewport_positions(None, None, bounds, index)
+            layer = layer_for(positions, zoom)
+            times.append((time.perf_counter() - start) * 1000)
+            sizes.append(payload_bytes(layer))
+            detail = level_of_detail(len(positions), zoom)
+            details[detail] = details.get(detail, 0) + 1
+        yield name, zoom, details, times, sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, default=200_000)
+    parser.add_argument("--population", type=int, default=200_000)
+    parser.add_argument("--views", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-kb", type=float, default=300)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    station_data = stations(args.stations, rng)
+    population_data = population(args.population, rng)
+    start = time.perf_counter()
+    station_index = StationIndex.from_frame(station_data)
+    index, people, provinces = population_index(population_data)
+    print(f"Indexed {len(station_data):,} stations and {len(people):,} population areas in "
+          f"{time.perf_counter() - start:.2f} s")
+    views = [MAP_CENTER] + list(zip(rng.uniform(SOUTH, NORTH, args.views - 1), rng.uniform(WEST, EAST, args.views - 1)))
+
+    start = time.perf_counter()
+    everything = payload_bytes(station_layer(station_data))
+    print(f"Every station as markers: {everything / 1024:,.0f} KB in {time.perf_counter() - start:.2f} s\n")
+
+    # Bubbles must account for every point in view exactly once.
+    bounds = viewport_bounds(MAP_CENTER, ZOOMS[0])
+    in_view = viewport_positions(None, None, bounds, station_index)
+    clusters = cluster_points(station_index.lat[in_view], station_index.lon[in_view], ZOOMS[0])
+    assert clusters["count"].sum() == len(in_view)
+    in_view = viewport_positions(None, None, bounds, index)
+    clusters = cluster_points(index.lat[in_view], index.lon[in_view], ZOOMS[0], people[in_view])
+    assert np.isclose(clusters["weight"].sum(), people[in_view].sum())
+
+    layers = [("stations", station_index, lambda p, z: station_features(station_data, p, z)),
+              ("population", index, lambda p, z: population_features(index, people, provinces, p, z))]
+    print(f"{'layer':<11}{'zoom':>5}  {'detail':<24}{'median ms':>10}{'max ms':>8}{'median KB':>10}{'max KB':>8}")
+    worst = 0
+    for name, layer_index, layer_for in layers:
+        for _, zoom, details, times, sizes in sweep(name, layer_index, layer_for, views, ZOOMS):
+            detail = ", ".join(f"{count} {kind}" for kind, count in sorted(details.items()))
+            print(f"{name:<11}{zoom:>5}  {detail:<24}{statistics.median(times):>10.1f}{max(times):>8.1f}"
+                  f"{statistics.median(sizes) / 1024:>10.1f}{max(sizes) / 1024:>8.1f}")
+            worst = max(worst, max(sizes))
+    if worst > args.max_kb * 1024:
+        sys.exit(f"A view sent {worst / 1024:.0f} KB, over {args.max_kb:g} KB")
+    print(f"\nLargest view: {worst / 1024:.0f} KB ({everything / worst:,.0f}x less than every station as markers)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Seeded synthetic station, emissions and population datasets with the schemas of the bundled workbooks.
+
+`generate(scale)` returns the three tables at `scale` times the rows of
+Charging_Stations.xlsx, "emmissions .xlsx" and young_pop.xlsx, with the same
+column names, dtypes and quirks: "-" for unknown station fields and revenue,
+revenue cells mixing ints and "-", emissions as repeated observations of
+grid points with a few NaN, and population latitudes stored as text (one
+with a leading non-breaking space). The same seed always gives the same
+data. `write_datasets` saves them under the dashboard's file names, so the
+app can be pointed at a directory of them. Run from the repository root:
+
+    python -m benchmarks.synthetic --scale 10 --output synthetic_data
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+BASE_ROWS = {"stations": 53, "emissions": 79_023, "population": 5}
+FILE_NAMES = {"stations": "Charging_Stations.xlsx", "emissions": "emmissions .xlsx", "population": "young_pop.xlsx"}
+SHEET_NAMES = {"stations": "Sheet1", "emissions": "emissions", "population": "Rwanda young Population"}
+
+# Bounds of the emission grid in the bundled file.
+SOUTH, WEST, NORTH, EAST = -3.3, 28.23, -0.51, 31.53
+OBSERVATIONS_PER_POINT = 159
+EMISSION_COLUMN = "CarbonMonoxide_H2O_column_number_density"
+EMISSION_MEAN, EMISSION_STD, EMISSION_MISSING = 2114.0, 620.0, 0.027
+
+# Province centres and towns as in the bundled files; stations scatter around their province's centre.
+PROVINCES = {
+    "Kigali City": ((-1.944, 30.062), ["Kigali", "Kanombe", "Gikondo", "Nyarutarama", "Nyarugenge", "Rugunga"]),
+    "Southern Province": ((-2.620, 29.605), ["Butare (Huye)", "Huye", "Nyamagabe", "Muhanga", "Gisagara", "Nyanza"]),
+    "Western Province": ((-2.372, 29.206), ["Rubavu", "Rubavu (Gisenyi)", "Kibuye (Karongi)", "Karongi", "Nyundo",
+                                            "Kamembe (Rusizi)", "Rubengera", "Nyabihu"]),
+    "Northern Province": ((-1.568, 29.906), ["Musanze", "Ruhengeri (Musanze)", "Kinigi (Musanze)", "Rulindo",
+                                             "Gicumbi"]),
+    "Eastern Province": ((-1.750, 30.500), ["Kayonza", "Rwamagana", "Nyamata", "Bumbogo"]),
+}
+PROVINCE_SHARES = [13, 12, 19, 6, 3]
+STATUSES = {"Operational": 32, "Under-Construction": 13, "Awaiting Contract": 4, "Planned": 2,
+            "Pending Site Visit": 2}
+CONNECTOR_TYPES = {"AC charger L2": 20, "AC socket L1": 15, "-": 13, "DC Charger L3": 5}
+OPERATIONAL_TIMES = ["Sat-Wed", "Mon-Sun"]
+AVAILABILITY = ["Available", "In-Use"]
+RWF_PER_ZAR = 107.4
+PLUS_CODE_CHARS = "23456789CFGHJMPQRVWX"
+POPULATION_PROVINCES = ["KIGALI", "SOUTHERN PROVINCE", "WESTERN PROVINCE", "NORTHERN PROVINCE", "EASTERN PROVINCE"]
+AGE_BANDS = ["Population_Age_20_24_Density", "Population_Age_20_29_Density", "Population_Age_30_34_Density",
+             "Population_Age_35_39_Density"]
+
+
+def _choice(rng, weighted, n):
+    labels = list(weighted)
+    weights = np.array([weighted[label] for label in labels], dtype=np.float64)
+    return np.array(labels, dtype=object)[rng.choice(len(labels), n, p=weights / weights.sum())]
+
+
+def _plus_codes(rng, n):
+    chars = np.array(list(PLUS_CODE_CHARS))
+    head = ["".join(code) for code in chars[rng.integers(0, len(chars), (n, 4))]]
+    tail = ["".join(code) for code in chars[rng.integers(0, len(chars), (n, 3))]]
+    return [f"{a}+{b}" for a, b in zip(head, tail)]
+
+
+def stations(n, rng):
+    """A Charging_Stations.xlsx sheet with `n` stations."""
+    names = list(PROVINCES)
+    province = rng.choice(len(names), n, p=np.array(PROVINCE_SHARES) / sum(PROVINCE_SHARES))
+    centres = np.array([PROVINCES[name][0] for name in names])[province]
+    lat = np.clip(centres[:, 0] + rng.normal(0, 0.2, n), SOUTH, NORTH)
+    lon = np.clip(centres[:, 1] + rng.normal(0, 0.2, n), WEST, EAST)
+    towns = np.array([PROVINCES[names[p]][1][rng.integers(len(PROVINCES[names[p]][1]))] for p in province],
+                     dtype=object)
+    status = _choice(rng, STATUSES, n)
+    operational = status == "Operational"
+    rwf = (rng.uniform(15, 60, n) * 10).round() * 100_000
+    zar = (rwf / RWF_PER_ZAR).round()
+    known_address = rng.random(n) < 0.8
+    addresses = [f"{code}, {town}, Rwanda" if known else "-"
+                 for code, town, known in zip(_plus_codes(rng, n), towns, known_address)]
+    return pd.DataFrame({
+        "Charger ID": np.arange(1, n + 1, dtype=np.int64),
+        "Connector Type": _choice(rng, CONNECTOR_TYPES, n),
+        "Connector Name": [f"{town} Charging Station {i}" for i, town in enumerate(towns, 1)],
+        "Status": status,
+        "Address": addresses,
+        "Latitude": lat,
+        "Longitude": lon,
+        "Province": np.array(names, dtype=object)[province],
+        "City/Suburb/Town": towns,
+        "Operational Times": np.where(operational, rng.choice(OPERATIONAL_TIMES, n), "-").astype(object),
+        "Sales Revenue (RWF)": np.where(operational, rwf.astype(np.int64).astype(object), "-"),
+        "Sales Revenue (ZAR)": np.where(operational, zar.astype(np.int64).astype(object), "-"),
+        "Charger Availability": np.where(operational, rng.choice(AVAILABILITY, n), "-").astype(object),
+    })
+
+
+def emissions(n, rng):
+    """An "emmissions .xlsx" sheet with `n` rows: repeated observations of grid points, a few of them NaN."""
+    points = max(1, -(-n // OBSERVATIONS_PER_POINT))
+    point_lat = np.round(rng.uniform(SOUTH, NORTH, points), 3)
+    point_lon = np.round(rng.uniform(WEST, EAST, points), 3)
+    point = np.repeat(np.arange(points), OBSERVATIONS_PER_POINT)[:n]
+    shape = (EMISSION_MEAN / EMISSION_STD) ** 2
+    value = rng.gamma(shape, EMISSION_MEAN / shape, n)
+    value[rng.random(n) < EMISSION_MISSING] = np.nan
+    return pd.DataFrame({"latitude": point_lat[point], "longitude": point_lon[point], EMISSION_COLUMN: value})
+
+
+def population(n, rng):
+    """A young_pop.xlsx sheet with `n` rows; beyond the five provinces, rows are numbered districts."""
+    base = np.array(POPULATION_PROVINCES, dtype=object)[np.arange(n) % len(POPULATION_PROVINCES)]
+    province = np.where(np.arange(n) < len(POPULATION_PROVINCES), base,
+                        [f"{name} {i}" for i, name in enumerate(base)])
+    bands = {band: np.round(rng.uniform(120, 360, n), 3) for band in AGE_BANDS}
+    centres = np.array([PROVINCES[name][0] for name in PROVINCES])[np.arange(n) % len(PROVINCES)]
+    lat = np.round(np.clip(centres[:, 0] + (np.arange(n) >= len(PROVINCES)) * rng.normal(0, 0.3, n), SOUTH, NORTH),
+                   5)
+    lon = np.round(np.clip(centres[:, 1] + (np.arange(n) >= len(PROVINCES)) * rng.normal(0, 0.3, n), WEST, EAST), 5)
+    latitude = lat.astype(str).astype(object)
+    latitude[min(3, n - 1)] = "\xa0" + latitude[min(3, n - 1)]
+    return pd.DataFrame({"Province": province, **bands, "Total_Young_Population": sum(bands.values()).round(3),
+                         "Latitude": latitude, "Longitude": lon})
+
+
+def generate(scale=1, seed=0, max_emission_rows=None):
+    """The three datasets at `scale` times the bundled row counts, keyed "stations", "emissions", "population"."""
+    rng = np.random.default_rng(seed)
+    emission_rows = int(BASE_ROWS["emissions"] * scale)
+    if max_emission_rows is not None:
+        emission_rows = min(emission_rows, max_emission_rows)
+    return {
+        "stations": stations(max(1, int(BASE_ROWS["stations"] * scale)), rng),
+        "emissions": emissions(emission_rows, rng),
+        "population": population(max(1, int(BASE_ROWS["population"] * scale)), rng),
+    }
+
+
+def write_datasets(directory, datasets, emissions_format="xlsx"):
+    """Saves the datasets under the dashboard's file names; emissions can go to .parquet to skip the slow Excel
+    writer (the dashboard's numeric loader streams either). Returns {dataset: path}."""
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for name, frame in datasets.items():
+        path = os.path.join(directory, FILE_NAMES[name])
+        if name == "emissions" and emissions_format == "parquet":
+            path = os.path.splitext(path)[0] + ".parquet"
+            frame.to_parquet(path, index=False)
+        else:
+            frame.to_excel(path, sheet_name=SHEET_NAMES[name], index=False)
+        paths[name] = path
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="synthetic_data")
+    parser.add_argument("--max-emission-rows", type=int)
+    parser.add_argument("--emissions-format", choices=["xlsx", "parquet"], default="xlsx")
+    args = parser.parse_args()
+
+    datasets = generate(args.scale, args.seed, args.max_emission_rows)
+    for name, path in write_datasets(args.output, datasets, args.emissions_format).items():
+        print(f"{name:>10}: {len(datasets[name]):>10,} rows -> {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+from placement import population_per_cell, population_points
+from station_index import StationIndex
+
+DEFAULT_SERVICE_RADIUS_KM = 10.0
+STATION_FIELDS = ["Charger ID", "Connector Name", "Status", "City/Suburb/Town"]
+
+
+# --- Spatial Join ---
+def nearest_station(index, lat, lon):
+    """Assigns points to their nearest station. Returns (station positions, distances in km)."""
+    if not len(lat):
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    positions, distances = index.nearest(np.asarray(lat, dtype=np.float64), np.asarray(lon, dtype=np.float64))
+    return positions[:, 0], distances[:, 0]
+
+
+def join_cells(stations, cells, population=None, station_index=None, population_share=0.5):
+    """Assigns every emission grid cell, and the young population spread over it, to its nearest station.
+
+    Nearest-station assignment is the Voronoi catchment of each station, found
+    with one KD-tree query per cell instead of a distance to every station.
+    `cells` is a grid table as `aggregate_emissions` returns. Population points
+    that no cell is nearest to (or all of them, without cells) are assigned as
+    points of their own. Returns one row per cell or point with the owning
+    station's position, the distance to it, people and demand (the placement
+    blend of emission and population shares).
+    """
+    index = station_index if station_index is not None else StationIndex.from_frame(stations)
+    if cells is None or not len(cells):
+        cells = pd.DataFrame({"latitude": [], "longitude": [], "value": [], "count": []})
+    lat = cells["latitude"].to_numpy(dtype=np.float64)
+    lon = cells["longitude"].to_numpy(dtype=np.float64)
+    people, orphaned = population_per_cell(lat, lon, population)
+    if orphaned.any():
+        pop_lat, pop_lon, _ = population_points(population)
+        extra = orphaned > 0
+        lat, lon = np.concatenate([lat, pop_lat[extra]]), np.concatenate([lon, pop_lon[extra]])
+        people = np.concatenate([people, orphaned[extra]])
+    value = np.zeros(len(lat))
+    value[:len(cells)] = cells["value"].to_numpy(dtype=np.float64)
+    count = np.zeros(len(lat))
+    count[:len(cells)] = cells["count"].to_numpy(dtype=np.float64)
+
+    owner, distance = nearest_station(index, lat, lon)
+    emission_weight = value / value.sum() if value.sum() > 0 else np.zeros(len(value))
+    if people.sum() > 0:
+        population_weight = people / people.sum()
+    else:
+        population_weight = np.zeros(len(people))
+        population_share = 0.0 if value.sum() > 0 else 1.0
+    demand = population_share * population_weight + (1.0 - population_share) * emission_weight
+    return pd.DataFrame({"latitude": lat, "longitude": lon, "station": owner, "distance_km": distance,
+                         "value": value, "count": count, "people": people, "demand": demand})
+
+
+def station_demand(stations, cells, population=None, station_index=None, radius_km=DEFAULT_SERVICE_RADIUS_KM,
+                   population_share=0.5):
+    """Per-station demand, served population and emission exposure of each station's catchment.
+
+    Columns, one row per station in `stations` order:
+    - cells: grid cells whose nearest station this is
+    - demand_share: share of total demand (emission and young-population blend)
+    - catchment_population: young population living nearest to this station
+    - served_population: the part of it within `radius_km`
+    - emission_mean / emission_peak: observation-weighted mean and maximum CO of the catchment
+    - exposure: people x mean CO over the catchment (person-weighted emission load)
+    - mean_distance_km: demand-weighted distance from the catchment to the station
+    """
+    joined = join_cells(stations, cells, population, station_index, population_share)
+    n = len(stations)
+    owner = joined["station"].to_numpy()
+
+    def total(weights):
+        return np.bincount(owner, weights=weights, minlength=n)[:n]
+
+    people = joined["people"].to_numpy()
+    value = joined["value"].to_numpy()
+    count = joined["count"].to_numpy()
+    demand = joined["demand"].to_numpy()
+    served = joined["distance_km"].to_numpy() <= radius_km
+    peak = np.full(n, np.nan)
+    if len(owner):
+        np.fmax.at(peak, owner, np.where(count > 0, value, np.nan))
+    demand_total = total(demand)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        table = pd.DataFrame({
+            "cells": total(count > 0).astype(np.int64),
+            "demand_share": demand_total,
+            "catchment_population": total(people),
+            "served_population": total(people * served),
+            "emission_mean": total(value * count) / total(count),
+            "emission_peak": peak,
+            "exposure": total(people * value),
+            "mean_distance_km": total(demand * joined["distance_km"].to_numpy()) / demand_total,
+        })
+    fields = [column for column in STATION_FIELDS if column in stations.columns]
+    return pd.concat([stations[fields].reset_index(drop=True), table], axis=1)
@@ -0,0 +1,236 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from emissions_grid import EMISSION_DTYPES, heatmap_points
+from ingest import cached_columns, dataset_version, load_columns, load_numeric_columns
+from perf import recorder
+from tiles import TILE_SIZE, in_bounds, lonlat_to_tile, viewport_bounds
+
+# The dashboard's data paths and logic without Streamlit, so benchmarks and other tools can drive them directly.
+# Folium and the SciPy-backed station_store are imported inside the functions that use them, as in the dashboard.
+
+# --- Dashboard Settings ---
+STATION_COLUMNS = [
+    "Latitude", "Longitude", "Status", "Connector Name", "Address",
+    "Connector Type", "City/Suburb/Town", "Sales Revenue (RWF)", "Charger Availability"
+]
+POPULATION_COLUMNS = ["Latitude", "Longitude", "Total_Young_Population"]
+STATUS_OPTIONS = ["All", "Operational", "Under-Construction", "Planned", "Awaiting Contract", "Pending Site Visit"]
+MAP_CENTER = [-1.95, 30.06]
+STATION_ZOOM = 8
+HEATMAP_ZOOM = 7
+SUGGESTION_LIMIT = 5
+POPULATION_ZOOM = 8
+
+# --- Level of Detail ---
+# Maps send the features inside the viewport the browser reports. Below DETAIL_ZOOM more than OVERVIEW_POINTS of them
+# are binned into CLUSTER_CELL_PX screen cells; from DETAIL_ZOOM up points are sent until MAX_MAP_POINTS, so one
+# interaction stays within a few hundred KB however large the dataset.
+DETAIL_ZOOM = 11
+OVERVIEW_POINTS = 250
+MAX_MAP_POINTS = 1_000
+CLUSTER_CELL_PX = 80
+
+
+# --- Loading ---
+def check_columns(file_path, required_columns):
+    """Raises FileNotFoundError for a missing file and KeyError naming any missing required columns."""
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+    if required_columns:
+        available_cols = cached_columns(file_path)
+        missing_cols = [col for col in required_columns if col not in available_cols]
+        if missing_cols:
+            raise KeyError(f"Missing columns in {file_path}: {', '.join(missing_cols)}")
+
+
+def shared_table(service, key, version, load):
+    """Returns a view of a DataService table, counting whether `load()` had to run."""
+    loaded = []
+
+    def counted_load():
+        loaded.append(True)
+        return load()
+
+    frame = service.table(key, version, counted_load)
+    recorder.count("data_service", hit=not loaded)
+    return frame
+
+
+@recorder.timed()
+def load_table(service, file_path, required_columns=None, usecols=None):
+    """Returns a shared read-only view of an Excel file's columnar cache, without rows missing required values."""
+    check_columns(file_path, required_columns)
+
+    def load():
+        data = load_columns(file_path, usecols)
+        return data.dropna(subset=required_columns) if required_columns else data
+
+    key = (file_path, tuple(required_columns or ()), tuple(usecols or ()))
+    return shared_table(service, key, dataset_version(file_path), load)
+
+
+@recorder.timed()
+def load_emissions_table(service, file_path):
+    """Returns a shared read-only view of the emission columns, streamed into a numeric columnar cache."""
+    check_columns(file_path, None)
+    return shared_table(service, (file_path, "emissions"), dataset_version(file_path, columns=EMISSION_DTYPES),
+                        lambda: load_numeric_columns(file_path, EMISSION_DTYPES))
+
+
+def new_station_store(file_path, required_columns, render_cache=None):
+    """A StationStore over the station sheet, dropping rows missing required values; not yet refreshed or started."""
+    from station_store import StationStore
+    check_columns(file_path, required_columns)
+    return StationStore(file_path, lambda: load_columns(file_path).dropna(subset=list(required_columns)),
+                        render_cache=render_cache)
+
+
+# --- Filtering and Search ---
+def filter_by_status(stations, status):
+    """Stations with the given status, or all of them for "All"."""
+    return stations if status == "All" else stations[stations["Status"] == status]
+
+
+def search_towns(town_index, query, limit=SUGGESTION_LIMIT):
+    """Looks up a typed town. Returns (station rows, "contains"/"fuzzy"/None match, suggestions)."""
+    with recorder.span("search_towns") as span:
+        suggestions = town_index.suggest(query, limit=limit)
+        rows, match = town_index.search(query)
+        span.set(match=match, rows=len(rows))
+    return rows, match, suggestions
+
+
+def find_nearest_station(snapshot, lat, lon, road_catchments=None):
+    """Nearest station to a point. Returns (station position, drive minutes, straight-line km).
+
+    With `road_catchments` (a routing.RoadCatchments) the answer is by drive
+    time and km is None; without it, or when no station is reachable by road
+    from the point, it is the straight-line nearest and minutes is None.
+    """
+    with recorder.span("find_nearest_station") as span:
+        if road_catchments is not None:
+            positions, seconds, _ = road_catchments.nearest(lat, lon)
+            if positions[0] >= 0:
+                span.set(method="road")
+                return int(positions[0]), float(seconds[0]) / 60, None
+        positions, distances = snapshot.index.nearest(lat, lon)
+        span.set(method="straight_line")
+        return int(positions[0]), None, float(distances[0])
+
+
+# --- Viewport ---
+def map_viewport(state, location, zoom_start):
+    """(bounds, zoom) from an st_folium return value, or of the initial view before the map has reported one."""
+    try:
+        south_west, north_east = state["bounds"]["_southWest"], state["bounds"]["_northEast"]
+        bounds = tuple(float(corner[axis]) for corner, axis in
+                       ((south_west, "lat"), (south_west, "lng"), (north_east, "lat"), (north_east, "lng")))
+        zoom = int(state["zoom"])
+    except (KeyError, TypeError, ValueError):
+        return viewport_bounds(location, zoom_start), zoom_start
+    return bounds, zoom
+
+
+def viewport_positions(lat, lon, bounds, index=None):
+    """Positions of the points inside (south, west, north, east), from `index` (a StationIndex over the same
+    points) when given."""
+    if index is not None:
+        return index.in_bbox(*bounds)
+    return np.flatnonzero(in_bounds(lat, lon, bounds))
+
+
+def level_of_detail(count, zoom):
+    """"points" to send `count` features in view at `zoom` one by one, or "clusters" to aggregate them."""
+    return "points" if count <= (MAX_MAP_POINTS if zoom >= DETAIL_ZOOM else OVERVIEW_POINTS) else "clusters"
+
+
+def cluster_points(lat, lon, zoom, weights=None, cell_px=CLUSTER_CELL_PX):
+    """Bins points into square screen cells of `cell_px` pixels at `zoom`.
+
+    Returns a frame with one row per occupied cell: the mean latitude and
+    longitude of its points, their count and the sum of their weights.
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    weights = np.ones(len(lat)) if weights is None else np.asarray(weights, dtype=np.float64)
+    x, y = lonlat_to_tile(lat, lon, zoom)
+    cells_per_tile = TILE_SIZE / cell_px
+    columns = int(np.ceil(2 ** zoom * cells_per_tile)) + 1
+    cell = np.floor(y * cells_per_tile).astype(np.int64) * columns + np.floor(x * cells_per_tile).astype(np.int64)
+    _, inverse, count = np.unique(cell, return_inverse=True, return_counts=True)
+    return pd.DataFrame({"lat": np.bincount(inverse, lat) / count, "lon": np.bincount(inverse, lon) / count,
+                         "count": count, "weight": np.bincount(inverse, weights)})
+
+
+# --- Maps ---
+@recorder.timed()
+def station_features(stations, positions, zoom):
+    """The station layer for the stations at `positions` (those in view): markers, or count bubbles when there are
+    too many for the zoom."""
+    from map_layers import BubbleLayer, compact_number, station_layer
+    if level_of_detail(len(positions), zoom) == "points":
+        return station_layer(stations.iloc[positions])
+    clusters = cluster_points(stations["Latitude"].to_numpy()[positions], stations["Longitude"].to_numpy()[positions],
+                              zoom)
+    return BubbleLayer(clusters["lat"], clusters["lon"], [compact_number(n) for n in clusters["count"]],
+                       clusters["count"], [f"{n:,} stations" for n in clusters["count"]])
+
+
+def population_index(population):
+    """(StationIndex, people, provinces) over the population rows with usable coordinates and totals."""
+    from placement import population_rows
+    from station_index import StationIndex
+    pop_lat, pop_lon, people, valid = population_rows(population)
+    provinces = population["Province"].to_numpy()[valid] if "Province" in population else np.full(valid.sum(), "")
+    return StationIndex(pop_lat[valid], pop_lon[valid]), people[valid], provinces
+
+
+@recorder.timed()
+def population_features(index, people, provinces, positions, zoom):
+    """The young-population layer for the areas at `positions` (those in view): a bubble per area, or per screen cell
+    when there are too many for the zoom."""
+    from map_layers import BubbleLayer, compact_number
+    if level_of_detail(len(positions), zoom) == "points":
+        values = people[positions]
+        return BubbleLayer(index.lat[positions], index.lon[positions], [compact_number(v) for v in values], values,
+                           [f"{province}: {value:,.0f}" for province, value in zip(provinces[positions], values)])
+    clusters = cluster_points(index.lat[positions], index.lon[positions], zoom, people[positions])
+    return BubbleLayer(clusters["lat"], clusters["lon"], [compact_number(v) for v in clusters["weight"]],
+                       clusters["weight"], [f"{n:,} areas" for n in clusters["count"]])
+
+
+def heatmap_layer(grid_data, peak=None):
+    """A Folium HeatMap layer of pre-aggregated emission grid cells, scaled to `peak` (default: their own maximum)."""
+    from folium.plugins import HeatMap
+    return HeatMap(heatmap_points(grid_data, peak))
+
+
+@recorder.timed()
+def build_heatmap(grid_data, location=MAP_CENTER, zoom_start=HEATMAP_ZOOM):
+    """A Folium heatmap of pre-aggregated emission grid cells."""
+    import folium
+    m = folium.Map(location=location, zoom_start=zoom_start)
+    heatmap_layer(grid_data).add_to(m)
+    return m
+
+
+@recorder.timed()
+def build_heatmap_animation(frames, labels, location=MAP_CENTER, zoom_start=HEATMAP_ZOOM):
+    """A Folium HeatMapWithTime with one frame per (period, grid) in `frames`, scaled to the peak over all frames."""
+    import folium
+    from folium.plugins import HeatMapWithTime
+    peak = max((grid["value"].max() for _, grid in frames if len(grid)), default=0.0)
+    m = folium.Map(location=location, zoom_start=zoom_start)
+    HeatMapWithTime([heatmap_points(grid, peak) for _, grid in frames], index=labels,
+                    auto_play=True, max_opacity=0.8).add_to(m)
+    return m
+
+
+@recorder.timed()
+def render_map(m):
+    """The map's standalone HTML, as embedded in the page."""
+    from map_layers import render_map_html
+    return render_map_html(m)
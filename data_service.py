@@ -0,0 +1,90 @@
+import threading
+
+import pandas as pd
+
+
+def enable_copy_on_write():
+    """Turns on pandas copy-on-write, which DataService views rely on; call it once from the app's entry point.
+
+    Views hand out shared column arrays, and copy-on-write makes an in-place
+    edit copy the column instead of changing the shared table. It is the only
+    mode from pandas 3; before that the option is process-wide and applies when
+    a frame is modified, not when the view is made, so it cannot be scoped to
+    DataService and is left for the application to set.
+    """
+    if int(pd.__version__.split(".")[0]) < 3:
+        pd.options.mode.copy_on_write = True
+
+
+def frame_nbytes(frame):
+    """Bytes held by a frame, including string data."""
+    return int(frame.memory_usage(index=True, deep=True).sum())
+
+
+class DataService:
+    """Process-wide store of read-only tables shared by every session.
+
+    Each table is loaded once per (key, version); callers get a shallow view (a
+    new DataFrame over the same column arrays), so a session can add columns or
+    filter freely without copying or affecting anyone else. Each table's text is
+    held once per process, whatever string dtype the pandas version uses, and
+    numeric columns from the columnar cache stay memory-mapped, so their pages
+    are also shared with other server processes through the OS page cache.
+    Sessions only stay isolated with copy-on-write on; see enable_copy_on_write.
+    """
+
+    def __init__(self):
+        self._tables = {}
+        self._lock = threading.Lock()
+        self._loading = {}
+        self.loads = 0
+        self.hits = 0
+
+    def __len__(self):
+        return len(self._tables)
+
+    def table(self, key, version, load):
+        """Returns a view of the table for `key` at `version`, calling `load()` only when it is missing or stale.
+
+        Concurrent callers missing on the same key wait for a single load.
+        """
+        while True:
+            with self._lock:
+                entry = self._tables.get(key)
+                if entry is not None and entry[0] == version:
+                    self.hits += 1
+                    return entry[1].copy(deep=False)
+                event = self._loading.get(key)
+                if event is None:
+                    event = self._loading[key] = threading.Event()
+                    break
+            event.wait()
+        try:
+            frame = load()
+            with self._lock:
+                self._tables[key] = (version, frame)
+                self.loads += 1
+            return frame.copy(deep=False)
+        finally:
+            with self._lock:
+                del self._loading[key]
+            event.set()
+
+    def invalidate(self, predicate):
+        """Drops every table whose key satisfies `predicate(key)`. Returns the number dropped."""
+        with self._lock:
+            stale = [key for key in self._tables if predicate(key)]
+            for key in stale:
+                del self._tables[key]
+            return len(stale)
+
+    def stats(self):
+        with self._lock:
+            tables = {key: (version, frame) for key, (version, frame) in self._tables.items()}
+            loads, hits = self.loads, self.hits
+        return {
+            "tables": [{"key": key, "version": version, "rows": len(frame), "bytes": frame_nbytes(frame)}
+                       for key, (version, frame) in tables.items()],
+            "loads": loads,
+            "hits": hits,
+        }
@@ -0,0 +1,204 @@
+import numpy as np
+import pandas as pd
+
+# --- Defaults ---
+LAT_COLUMN = "latitude"
+LON_COLUMN = "longitude"
+VALUE_COLUMN = "CarbonMonoxide_H2O_column_number_density"
+GRID_TYPES = ("square", "hex")
+# Streaming ingest keeps coordinates in float64: observations sit on a 0.01 degree
+# lattice, exactly on cell edges, where float32 rounding would move them between cells.
+EMISSION_DTYPES = {LAT_COLUMN: np.float64, LON_COLUMN: np.float64, VALUE_COLUMN: np.float32}
+AGGREGATIONS = ("mean", "sum", "max", "min", "count", "p50", "p90", "p95")
+# Aggregations that can be combined from per-chunk partials without the raw points.
+STREAMING_AGGREGATIONS = ("mean", "sum", "max", "min", "count")
+
+SQRT3 = np.sqrt(3.0)
+
+
+# --- Cell Assignment ---
+def _square_cells(lat, lon, resolution):
+    row = np.floor(lat / resolution).astype(np.int64)
+    col = np.floor(lon / resolution).astype(np.int64)
+    return row, col
+
+
+def _square_centers(row, col, resolution):
+    return (row + 0.5) * resolution, (col + 0.5) * resolution
+
+
+def _hex_cells(lat, lon, resolution):
+    """Assigns points to pointy-top hexagons (axial q/r) whose width is `resolution` degrees."""
+    size = resolution / SQRT3
+    q = (SQRT3 / 3.0 * lon - lat / 3.0) / size
+    r = (2.0 / 3.0 * lat) / size
+    # Cube rounding: round all three coordinates, then fix the one with the largest error.
+    x, z = q, r
+    y = -x - z
+    rx, ry, rz = np.rint(x), np.rint(y), np.rint(z)
+    dx, dy, dz = np.abs(rx - x), np.abs(ry - y), np.abs(rz - z)
+    fix_x = (dx > dy) & (dx > dz)
+    fix_z = ~fix_x & (dz >= dy)
+    rx = np.where(fix_x, -ry - rz, rx)
+    rz = np.where(fix_z, -rx - ry, rz)
+    return rz.astype(np.int64), rx.astype(np.int64)
+
+
+def _hex_centers(r, q, resolution):
+    size = resolution / SQRT3
+    return size * 1.5 * r, size * SQRT3 * (q + r / 2.0)
+
+
+def assign_cells(lat, lon, resolution, grid="square"):
+    """Returns integer (row, col) cell coordinates for every point on a square or hex grid."""
+    if grid == "square":
+        return _square_cells(lat, lon, resolution)
+    if grid == "hex":
+        return _hex_cells(lat, lon, resolution)
+    raise ValueError(f"Unknown grid type: {grid}")
+
+
+def cell_centers(row, col, resolution, grid="square"):
+    """Returns the (lat, lon) centre of each grid cell."""
+    if grid == "square":
+        return _square_centers(row, col, resolution)
+    if grid == "hex":
+        return _hex_centers(row, col, resolution)
+    raise ValueError(f"Unknown grid type: {grid}")
+
+
+# --- Group Reductions ---
+def _percentile(values, inverse, counts, q):
+    """Linear-interpolated percentile per group without a Python loop."""
+    order = np.lexsort((values, inverse))
+    ordered = values[order]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    position = starts + (q / 100.0) * (counts - 1)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.ceil(position).astype(np.int64)
+    fraction = position - lower
+    return ordered[lower] * (1.0 - fraction) + ordered[upper] * fraction
+
+
+def _reduce(values, inverse, n_groups, how):
+    counts = np.bincount(inverse, minlength=n_groups)
+    if how == "count":
+        return counts.astype(np.float64), counts
+    if how in ("sum", "mean"):
+        sums = np.bincount(inverse, weights=values, minlength=n_groups)
+        return (sums if how == "sum" else sums / counts), counts
+    if how in ("max", "min"):
+        fill = -np.inf if how == "max" else np.inf
+        result = np.full(n_groups, fill)
+        (np.maximum if how == "max" else np.minimum).at(result, inverse, values)
+        return result, counts
+    if how.startswith("p") and how[1:].replace(".", "", 1).isdigit():
+        q = float(how[1:])
+        if not 0 <= q <= 100:
+            raise ValueError(f"Percentile out of range: {how}")
+        return _percentile(values, inverse, counts, q), counts
+    raise ValueError(f"Unknown aggregation: {how}")
+
+
+def aggregate_points(lat, lon, values, resolution=0.05, how="mean", grid="square"):
+    """Bins point values onto a grid and reduces each cell with `how`.
+
+    Returns a DataFrame with one row per non-empty cell: latitude/longitude of the
+    cell centre, the aggregated value and the number of points that fell in it.
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    keep = ~(np.isnan(lat) | np.isnan(lon) | np.isnan(values))
+    lat, lon, values = lat[keep], lon[keep], values[keep]
+    if not len(values):
+        return pd.DataFrame({"latitude": [], "longitude": [], "value": [], "count": []})
+
+    row, col = assign_cells(lat, lon, resolution, grid)
+    row_min, col_min = row.min(), col.min()
+    span = col.max() - col_min + 1
+    keys = (row - row_min) * span + (col - col_min)
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    aggregated, counts = _reduce(values, inverse, len(unique_keys), how)
+
+    center_lat, center_lon = cell_centers(unique_keys // span + row_min, unique_keys % span + col_min,
+                                          resolution, grid)
+    return pd.DataFrame({"latitude": center_lat, "longitude": center_lon,
+                         "value": aggregated, "count": counts})
+
+
+def aggregate_emissions(data, resolution=0.05, how="mean", grid="square"):
+    """Aggregates the emissions frame onto a lat/lon grid."""
+    return aggregate_points(data[LAT_COLUMN].to_numpy(), data[LON_COLUMN].to_numpy(),
+                            data[VALUE_COLUMN].to_numpy(), resolution, how, grid)
+
+
+# --- Chunked Aggregation ---
+def partial_aggregates(lat, lon, values, resolution=0.05, grid="square"):
+    """Per-cell sum, count, max and min of one chunk of points, indexed by integer (row, col)."""
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    keep = ~(np.isnan(lat) | np.isnan(lon) | np.isnan(values))
+    row, col = assign_cells(lat[keep], lon[keep], resolution, grid)
+    points = pd.DataFrame({"row": row, "col": col, "value": values[keep]})
+    return points.groupby(["row", "col"], sort=False)["value"].agg(["sum", "count", "max", "min"])
+
+
+def merge_partials(partials):
+    """Combines partial aggregates from several chunks (or periods) into one."""
+    partials = [partial for partial in partials if len(partial)]
+    if not partials:
+        empty = pd.MultiIndex.from_arrays([np.empty(0, np.int64), np.empty(0, np.int64)], names=["row", "col"])
+        return pd.DataFrame({"sum": [], "count": [], "max": [], "min": []}, index=empty)
+    if len(partials) == 1:
+        return partials[0]
+    combined = pd.concat(partials)
+    return combined.groupby(level=["row", "col"], sort=False).agg({"sum": "sum", "count": "sum",
+                                                                    "max": "max", "min": "min"})
+
+
+def finalize_partials(partials, resolution=0.05, how="mean", grid="square"):
+    """Turns merged partial aggregates into the same cell table `aggregate_points` returns."""
+    if how not in STREAMING_AGGREGATIONS:
+        raise ValueError(f"Aggregation {how!r} cannot be computed from partials; "
+                         f"use one of {', '.join(STREAMING_AGGREGATIONS)}")
+    row = partials.index.get_level_values("row").to_numpy()
+    col = partials.index.get_level_values("col").to_numpy()
+    order = np.lexsort((col, row))
+    counts = partials["count"].to_numpy()[order].astype(np.int64)
+    if how == "mean":
+        value = partials["sum"].to_numpy()[order] / counts
+    elif how == "count":
+        value = counts.astype(np.float64)
+    else:
+        value = partials[how].to_numpy()[order].astype(np.float64)
+    center_lat, center_lon = cell_centers(row[order], col[order], resolution, grid)
+    return pd.DataFrame({"latitude": center_lat, "longitude": center_lon, "value": value, "count": counts})
+
+
+def aggregate_chunks(chunks, resolution=0.05, how="mean", grid="square"):
+    """Aggregates a stream of emissions chunks (e.g. `ingest.iter_numeric_chunks`) onto a grid.
+
+    Only per-cell partials are kept between chunks, so memory is bounded by the
+    number of occupied cells rather than the number of points.
+    """
+    merged = merge_partials([])
+    for chunk in chunks:
+        partial = partial_aggregates(chunk[LAT_COLUMN].to_numpy(), chunk[LON_COLUMN].to_numpy(),
+                                     chunk[VALUE_COLUMN].to_numpy(), resolution, grid)
+        merged = merge_partials([merged, partial])
+    return finalize_partials(merged, resolution, how, grid)
+
+
+def heatmap_points(grid_data, peak=None):
+    """Returns [lat, lon, weight] triples with weights scaled to 0..1 for folium's HeatMap.
+
+    Pass a shared `peak` to keep several frames on the same scale.
+    """
+    values = grid_data["value"].to_numpy()
+    if peak is None:
+        peak = values.max() if len(values) else 0.0
+    weights = values / peak if peak > 0 else values
+    return np.column_stack((grid_data["latitude"].to_numpy(), grid_data["longitude"].to_numpy(),
+                            weights)).tolist()
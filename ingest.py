@@ -0,0 +1,408 @@
+import contextlib
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# --- Cache Location ---
+CACHE_DIR = os.environ.get("OPTIMCHARGE_CACHE_DIR", ".optimcharge_cache")
+MANIFEST_NAME = "manifest.json"
+CACHE_FORMAT = 2
+DEFAULT_CHUNK_ROWS = 100_000
+NUMERIC_DTYPE = np.dtype(np.float32)
+
+
+# --- Source Fingerprints ---
+def file_digest(file_path, chunk_size=1 << 20):
+    """Returns the SHA-1 hex digest of a file, read in chunks."""
+    digest = hashlib.sha1()
+    with open(file_path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _fingerprint(file_path):
+    stat = os.stat(file_path)
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def cache_dir_for(file_path, sheet_name=0, columns=None):
+    """Returns the cache directory used for one sheet of a source workbook.
+
+    A numeric projection (see `build_numeric_cache`) gets its own directory per column spec.
+    """
+    source = os.path.abspath(file_path)
+    stem = re.sub(r"[^A-Za-z0-9_-]+", "_", os.path.splitext(os.path.basename(source))[0]).strip("_")
+    identity = f"{source}|{sheet_name}"
+    if columns is not None:
+        identity += "".join(f"|{name}:{dtype.str}" for name, dtype in _numeric_spec(columns))
+    key = hashlib.sha1(identity.encode("utf-8")).hexdigest()[:10]
+    return os.path.join(CACHE_DIR, f"{stem or 'data'}-{key}")
+
+
+def _read_manifest(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_NAME), "r", encoding="utf-8") as handle:
+            manifest = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("format") == CACHE_FORMAT else None
+
+
+def _write_manifest(cache_dir, manifest):
+    # A unique temporary name, so sessions refreshing the same manifest never write into one file.
+    descriptor, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix=MANIFEST_NAME + ".", suffix=".tmp")
+    with os.fdopen(descriptor, "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=2)
+    os.replace(tmp_path, os.path.join(cache_dir, MANIFEST_NAME))
+
+
+def _is_fresh(file_path, cache_dir, manifest):
+    """Checks a manifest against its source: mtime/size first, content hash as fallback."""
+    if manifest is None:
+        return False
+    fingerprint = _fingerprint(file_path)
+    if fingerprint == manifest["source"]["fingerprint"]:
+        return True
+    # The file was touched or copied; only rebuild if the content really changed.
+    if file_digest(file_path) != manifest["source"]["sha1"]:
+        return False
+    manifest["source"]["fingerprint"] = fingerprint
+    _write_manifest(cache_dir, manifest)
+    return True
+
+
+# --- Atomic Builds ---
+def _new_build_dir(target):
+    """Creates a uniquely named directory next to `target` to build into, so concurrent builds never share one."""
+    parent = os.path.dirname(target) or "."
+    os.makedirs(parent, exist_ok=True)
+    return tempfile.mkdtemp(dir=parent, prefix=os.path.basename(target) + ".tmp-")
+
+
+def publish_dir(build_dir, target):
+    """Swaps a finished build in as `target` by renames.
+
+    A directory cannot be renamed over a non-empty one, so an existing target
+    is first renamed aside and deleted afterwards. If another process
+    publishes the same target in between, its build (from the same source) is
+    kept and this one is dropped.
+    """
+    try:
+        os.replace(build_dir, target)
+        return
+    except OSError:
+        pass
+    stale = build_dir + ".old"
+    try:
+        os.replace(target, stale)
+    except FileNotFoundError:
+        pass  # Another build already moved it aside.
+    try:
+        os.replace(build_dir, target)
+    except OSError:
+        shutil.rmtree(build_dir, ignore_errors=True)
+    shutil.rmtree(stale, ignore_errors=True)
+
+
+@contextlib.contextmanager
+def building_dir(target):
+    """Yields a new directory to build `target` in and publishes it when the block completes; a failed build is
+    deleted."""
+    build_dir = _new_build_dir(target)
+    try:
+        yield build_dir
+    except BaseException:
+        shutil.rmtree(build_dir, ignore_errors=True)
+        raise
+    publish_dir(build_dir, target)
+
+
+# --- Columnar Conversion ---
+def _column_array(series):
+    """Converts a column to an array for np.save, plus a null mask for text.
+
+    Numeric, boolean, datetime and text columns can be memory-mapped. Mixed
+    columns (revenue stored as numbers and "-", booleans with gaps) stay an
+    object array of their original values, pickled, so they load back exactly
+    as read_excel returned them.
+    """
+    values = series.to_numpy()
+    if values.dtype.kind in "biufcmM":
+        return values, None
+    mask = series.isna().to_numpy()
+    if not all(isinstance(value, str) for value in values[~mask]):
+        return values.astype(object), None
+    return np.where(mask, "", values).astype(str), mask
+
+
+def build_columnar_cache(file_path, sheet_name=0):
+    """Parses a workbook sheet once and stores every column as a separate .npy file."""
+    cache_dir = cache_dir_for(file_path, sheet_name)
+    fingerprint = _fingerprint(file_path)
+    sha1 = file_digest(file_path)
+    data = pd.read_excel(file_path, sheet_name=sheet_name)
+
+    with building_dir(cache_dir) as tmp_dir:
+        columns = []
+        for position, name in enumerate(data.columns):
+            values, mask = _column_array(data[name])
+            entry = {"name": str(name), "file": f"col_{position:03d}.npy", "dtype": values.dtype.str,
+                     "source_dtype": str(data[name].dtype)}
+            np.save(os.path.join(tmp_dir, entry["file"]), values)
+            if mask is not None:
+                entry["mask"] = f"col_{position:03d}.mask.npy"
+                np.save(os.path.join(tmp_dir, entry["mask"]), mask)
+            columns.append(entry)
+
+        manifest = {
+            "format": CACHE_FORMAT,
+            "source": {"path": os.path.abspath(file_path), "sheet": sheet_name,
+                       "fingerprint": fingerprint, "sha1": sha1},
+            "rows": int(len(data)),
+            "columns": columns,
+        }
+        _write_manifest(tmp_dir, manifest)
+    return manifest
+
+
+# --- Streaming Numeric Ingest ---
+def _numeric_spec(columns):
+    """Normalizes a column list (all float32) or a {name: dtype} mapping to [(name, dtype)]."""
+    if isinstance(columns, dict):
+        return [(name, np.dtype(dtype)) for name, dtype in columns.items()]
+    return [(name, NUMERIC_DTYPE) for name in columns]
+
+
+def _projection(header, columns, file_path):
+    positions = {name: i for i, name in enumerate(header)}
+    missing = [name for name in columns if name not in positions]
+    if missing:
+        raise KeyError(f"Missing columns in {file_path}: {', '.join(missing)}")
+    return [positions[name] for name in columns]
+
+
+def source_columns(file_path, sheet_name=0):
+    """Reads only the header row of an .xlsx, .csv or .parquet source."""
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == ".csv":
+        return pd.read_csv(file_path, nrows=0).columns.tolist()
+    if extension == ".parquet":
+        import pyarrow.parquet as pq
+
+        return pq.ParquetFile(file_path).schema_arrow.names
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[sheet_name] if isinstance(sheet_name, int) else workbook[sheet_name]
+        header = next(sheet.iter_rows(max_row=1, values_only=True), ())
+        return ["" if value is None else str(value) for value in header]
+    finally:
+        workbook.close()
+
+
+def _coerce(values, dtype):
+    """Parses one raw column to `dtype`; anything unparseable becomes NaN/NaT."""
+    if dtype.kind == "M":
+        return pd.to_datetime(values, errors="coerce").astype(dtype)
+    return pd.to_numeric(values, errors="coerce").astype(dtype)
+
+
+def _excel_chunks(file_path, columns, sheet_name, chunk_rows):
+    """Yields raw row chunks from a read-only openpyxl worksheet, one chunk in memory at a time."""
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[sheet_name] if isinstance(sheet_name, int) else workbook[sheet_name]
+        rows = sheet.iter_rows(values_only=True)
+        header = ["" if value is None else str(value) for value in next(rows, ())]
+        positions = _projection(header, columns, file_path)
+        width = max(positions) + 1
+        buffer = []
+        for row in rows:
+            if len(row) < width:  # Read-only rows stop at the last non-empty cell.
+                row = row + (None,) * (width - len(row))
+            buffer.append([row[position] for position in positions])
+            if len(buffer) == chunk_rows:
+                yield pd.DataFrame.from_records(buffer, columns=columns)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame.from_records(buffer, columns=columns)
+    finally:
+        workbook.close()
+
+
+def _csv_chunks(file_path, columns, chunk_rows):
+    header = pd.read_csv(file_path, nrows=0).columns.tolist()
+    _projection(header, columns, file_path)
+    yield from pd.read_csv(file_path, usecols=columns, chunksize=chunk_rows)
+
+
+def _parquet_chunks(file_path, columns, chunk_rows):
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(file_path)
+    _projection(parquet.schema_arrow.names, columns, file_path)
+    for batch in parquet.iter_batches(batch_size=chunk_rows, columns=columns):
+        yield batch.to_pandas()
+
+
+def iter_numeric_chunks(file_path, columns, sheet_name=0, chunk_rows=DEFAULT_CHUNK_ROWS, dropna=True):
+    """Streams the given columns of an .xlsx, .csv or .parquet file as numeric chunks.
+
+    `columns` is a list (every column downcast to float32) or a {name: dtype}
+    mapping; datetime64 dtypes parse dates. Only the projected columns are parsed, values that are not numbers
+    become NaN, and rows with a NaN in any projected column are dropped before the
+    chunk is yielded (unless `dropna` is False, for callers that need source row
+    order), so memory use is bounded by `chunk_rows` rather than the file size.
+    """
+    spec = _numeric_spec(columns)
+    columns = [name for name, _ in spec]
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == ".csv":
+        raw_chunks = _csv_chunks(file_path, columns, chunk_rows)
+    elif extension == ".parquet":
+        raw_chunks = _parquet_chunks(file_path, columns, chunk_rows)
+    else:
+        raw_chunks = _excel_chunks(file_path, columns, sheet_name, chunk_rows)
+    for raw in raw_chunks:
+        chunk = pd.DataFrame({name: _coerce(raw[name], dtype) for name, dtype in spec})
+        yield chunk.dropna(ignore_index=True) if dropna else chunk
+
+
+def _finish_npy(raw_path, npy_path, dtype, rows):
+    """Prefixes a raw column file with an .npy header, copying it in blocks."""
+    with open(npy_path, "wb") as target, open(raw_path, "rb") as source:
+        np.lib.format.write_array_header_1_0(target, {"descr": dtype.str, "fortran_order": False,
+                                                      "shape": (rows,)})
+        shutil.copyfileobj(source, target, 1 << 20)
+    os.remove(raw_path)
+
+
+def build_numeric_cache(file_path, columns, sheet_name=0, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Streams a numeric projection of `columns` into a columnar cache without loading the sheet.
+
+    Chunks from `iter_numeric_chunks` are appended to raw column files, which get
+    their .npy headers once the row count is known. The manifest has the same
+    layout as `build_columnar_cache`, plus the projected column list.
+    """
+    spec = _numeric_spec(columns)
+    cache_dir = cache_dir_for(file_path, sheet_name, columns)
+    fingerprint = _fingerprint(file_path)
+    sha1 = file_digest(file_path)
+
+    with building_dir(cache_dir) as tmp_dir:
+        entries = [{"name": name, "file": f"col_{position:03d}.npy", "dtype": dtype.str}
+                   for position, (name, dtype) in enumerate(spec)]
+        raw_paths = [os.path.join(tmp_dir, entry["file"] + ".raw") for entry in entries]
+        rows = 0
+        handles = [open(path, "wb") for path in raw_paths]
+        try:
+            for chunk in iter_numeric_chunks(file_path, columns, sheet_name, chunk_rows):
+                for handle, (name, _) in zip(handles, spec):
+                    handle.write(chunk[name].to_numpy().tobytes())
+                rows += len(chunk)
+        finally:
+            for handle in handles:
+                handle.close()
+        for entry, raw_path, (_, dtype) in zip(entries, raw_paths, spec):
+            _finish_npy(raw_path, os.path.join(tmp_dir, entry["file"]), dtype, rows)
+
+        manifest = {
+            "format": CACHE_FORMAT,
+            "source": {"path": os.path.abspath(file_path), "sheet": sheet_name,
+                       "fingerprint": fingerprint, "sha1": sha1},
+            "projection": [name for name, _ in spec],
+            "rows": rows,
+            "columns": entries,
+        }
+        _write_manifest(tmp_dir, manifest)
+    return manifest
+
+
+def ensure_cache(file_path, sheet_name=0, columns=None):
+    """Returns an up-to-date manifest for a workbook, rebuilding the cache if needed.
+
+    With `columns`, the cache is the streamed numeric projection of those columns.
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"The file {file_path} does not exist.")
+    cache_dir = cache_dir_for(file_path, sheet_name, columns)
+    manifest = _read_manifest(cache_dir)
+    if not _is_fresh(file_path, cache_dir, manifest):
+        if columns is None:
+            manifest = build_columnar_cache(file_path, sheet_name)
+        else:
+            manifest = build_numeric_cache(file_path, columns, sheet_name)
+    return manifest
+
+
+# --- Readers ---
+def cached_columns(file_path, sheet_name=0):
+    """Lists the column names of a workbook sheet without loading any data."""
+    return [entry["name"] for entry in ensure_cache(file_path, sheet_name)["columns"]]
+
+
+def dataset_version(file_path, sheet_name=0, columns=None):
+    """Returns the content hash of the source a cache was built from."""
+    return ensure_cache(file_path, sheet_name, columns)["source"]["sha1"]
+
+
+def load_columns(file_path, columns=None, sheet_name=0, mmap=True):
+    """Loads only the requested columns of a workbook sheet from its columnar cache."""
+    manifest = ensure_cache(file_path, sheet_name)
+    return _read_columns(file_path, cache_dir_for(file_path, sheet_name), manifest, columns, mmap)
+
+
+def load_numeric_columns(file_path, columns, sheet_name=0, mmap=True):
+    """Loads a NaN-free numeric projection of `columns` (see `iter_numeric_chunks`).
+
+    The source is streamed into the cache on first use, never read whole.
+    """
+    manifest = ensure_cache(file_path, sheet_name, columns)
+    names = [name for name, _ in _numeric_spec(columns)]
+    return _read_columns(file_path, cache_dir_for(file_path, sheet_name, columns), manifest, names, mmap)
+
+
+def numeric_column_files(file_path, columns, sheet_name=0):
+    """Paths of the cached .npy files of a numeric projection, in `columns` order, for np.load(mmap_mode="r").
+
+    Lets worker processes map the cache themselves instead of being sent the arrays.
+    """
+    manifest = ensure_cache(file_path, sheet_name, columns)
+    cache_dir = cache_dir_for(file_path, sheet_name, columns)
+    files = {entry["name"]: entry["file"] for entry in manifest["columns"]}
+    return [os.path.join(cache_dir, files[name]) for name, _ in _numeric_spec(columns)]
+
+
+def _read_columns(file_path, cache_dir, manifest, columns, mmap):
+    entries = {entry["name"]: entry for entry in manifest["columns"]}
+    names = list(entries) if columns is None else list(columns)
+    missing = [name for name in names if name not in entries]
+    if missing:
+        raise KeyError(f"Missing columns in {file_path}: {', '.join(missing)}")
+
+    mmap_mode = "r" if mmap else None
+    frame = {}
+    for name in names:
+        entry = entries[name]
+        path = os.path.join(cache_dir, entry["file"])
+        if np.dtype(entry["dtype"]).hasobject:
+            # Mixed columns are pickled by this cache, so they load whole.
+            values = np.load(path, allow_pickle=True)
+        else:
+            values = np.load(path, mmap_mode=mmap_mode)
+        if "mask" in entry:
+            mask = np.load(os.path.join(cache_dir, entry["mask"]))
+            values = values.astype(object)
+            values[mask] = None
+        frame[name] = values
+    return pd.DataFrame(frame, columns=names, copy=False)
@@ -0,0 +1,208 @@
+from html import escape
+
+import folium
+import numpy as np
+import pandas as pd
+from branca.element import MacroElement
+from folium.elements import JSCSSMixin
+from folium.plugins import MarkerCluster
+from folium.template import Template
+
+# --- Popup Fields ---
+STATION_POPUP_FIELDS = [
+    ("Station", "Connector Name"),
+    ("Status", "Status"),
+    ("Connector Type", "Connector Type"),
+    ("Availability", "Charger Availability"),
+    ("Address", "Address"),
+]
+
+
+def _encode_column(series):
+    """Dictionary-encodes a column as (codes, labels) so repeated values are sent once."""
+    text = series.astype(object).where(series.notna(), "")
+    codes, uniques = pd.factorize(text)
+    return {"codes": codes.tolist(), "labels": [str(label) for label in uniques]}
+
+
+# --- Station Layer ---
+class StationLayer(MarkerCluster):
+    """Marker-cluster layer built from column arrays.
+
+    Python only serializes the columns; markers are created in one loop in the
+    browser and popups are rendered from the columns when a marker is opened.
+    """
+
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = (function(){
+                var columns = {{ this.columns|tojson }};
+                var escapeHtml = function (value) {
+                    return String(value).replace(/[&<>"']/g, function (c) {
+                        return {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;"}[c];
+                    });
+                };
+                var popupFor = function (i) {
+                    return function () {
+                        var html = [];
+                        for (var f = 0; f < columns.fields.length; f++) {
+                            var field = columns.fields[f];
+                            html.push("<b>" + escapeHtml(field.title) + ":</b> " +
+                                      escapeHtml(field.labels[field.codes[i]]));
+                        }
+                        return html.join("<br>");
+                    };
+                };
+                var icons = columns.colors.labels.map(function (color) {
+                    return L.AwesomeMarkers.icon({
+                        "extraClasses": "fa-rotate-0", "icon": "info-sign", "iconColor": "white",
+                        "markerColor": color, "prefix": "glyphicon"
+                    });
+                });
+                var markers = new Array(columns.lat.length);
+                for (var i = 0; i < columns.lat.length; i++) {
+                    markers[i] = L.marker([columns.lat[i], columns.lon[i]], {icon: icons[columns.colors.codes[i]]})
+                        .bindPopup(popupFor(i));
+                }
+                var cluster = L.markerClusterGroup({{ this.options|tojavascript }});
+                cluster.addLayers(markers);
+                cluster.addTo({{ this._parent.get_name() }});
+                return cluster;
+            })();
+        {% endmacro %}"""
+    )
+
+    def __init__(self, lat, lon, fields=None, colors=None, name=None, **kwargs):
+        super().__init__(name=name, **kwargs)
+        self._name = "StationLayer"
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        if colors is None:
+            colors = pd.Series(["blue"] * len(lat))
+        self.columns = {
+            "lat": np.round(lat, 6).tolist(),
+            "lon": np.round(lon, 6).tolist(),
+            "colors": _encode_column(pd.Series(colors)),
+            "fields": [dict(title=title, **_encode_column(series)) for title, series in (fields or [])],
+        }
+
+
+def station_layer(data, popup_fields=STATION_POPUP_FIELDS, status_colors=True):
+    """Builds a StationLayer from a stations frame with Latitude/Longitude/Status columns."""
+    fields = [(title, data[column]) for title, column in popup_fields if column in data.columns]
+    colors = None
+    if status_colors:
+        colors = np.where(data["Status"].to_numpy() == "Operational", "green", "orange")
+    return StationLayer(data["Latitude"].to_numpy(), data["Longitude"].to_numpy(), fields, colors)
+
+
+# --- Bubble Layer ---
+class BubbleLayer(JSCSSMixin, folium.FeatureGroup):
+    """Labelled bubbles styled like marker clusters, for clusters or weighted points aggregated in Python.
+
+    Bubbles are small, medium or large by their share of the largest weight;
+    clicking one zooms in on it.
+    """
+
+    default_js = MarkerCluster.default_js
+    default_css = MarkerCluster.default_css
+
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = (function(){
+                var columns = {{ this.columns|tojson }};
+                var sizes = ["small", "medium", "large"];
+                var group = L.featureGroup();
+                var zoomIn = function (e) {
+                    group._map.setView(e.latlng, group._map.getZoom() + 2);
+                };
+                for (var i = 0; i < columns.lat.length; i++) {
+                    var marker = L.marker([columns.lat[i], columns.lon[i]], {icon: L.divIcon({
+                        html: "<div><span>" + columns.labels[i] + "</span></div>",
+                        className: "marker-cluster marker-cluster-" + sizes[columns.sizes[i]],
+                        iconSize: L.point(40, 40)
+                    })});
+                    if (columns.tooltips) {
+                        marker.bindTooltip(columns.tooltips[i]);
+                    }
+                    group.addLayer(marker.on("click", zoomIn));
+                }
+                group.addTo({{ this._parent.get_name() }});
+                return group;
+            })();
+        {% endmacro %}"""
+    )
+
+    def __init__(self, lat, lon, labels, weights, tooltips=None, name=None, **kwargs):
+        super().__init__(name=name, **kwargs)
+        self._name = "BubbleLayer"
+        weights = np.asarray(weights, dtype=np.float64)
+        peak = weights.max() if len(weights) else 0.0
+        sizes = np.minimum((3 * weights / peak).astype(np.int64), 2) if peak > 0 else np.zeros(len(weights), np.int64)
+        self.columns = {
+            "lat": np.round(np.asarray(lat, dtype=np.float64), 6).tolist(),
+            "lon": np.round(np.asarray(lon, dtype=np.float64), 6).tolist(),
+            "labels": [escape(str(label)) for label in labels],
+            "sizes": sizes.tolist(),
+            "tooltips": [escape(str(tooltip)) for tooltip in tooltips] if tooltips is not None else None,
+        }
+
+
+def compact_number(value):
+    """Short bubble label: 950, 1.2k, 34k, 1.5M."""
+    for divisor, suffix in ((1e6, "M"), (1e3, "k")):
+        if abs(value) >= divisor:
+            scaled = value / divisor
+            return f"{scaled:.1f}{suffix}" if scaled < 10 else f"{scaled:.0f}{suffix}"
+    return f"{value:.0f}"
+
+
+def layer_script(layer):
+    """The JavaScript that creates a layer on its parent, i.e. what streamlit-folium sends for a feature group."""
+    return layer._template.module.script(layer)
+
+
+# --- Cached Layers ---
+# Layers are rendered detached, under a placeholder parent (the name of a FeatureGroup with id "detached"), so their
+# script can be cached and attached to any map.
+DETACHED_ID = "detached"
+PARENT_PLACEHOLDER = f"feature_group_{DETACHED_ID}"
+
+
+def detached_script(layer):
+    """The JavaScript creating `layer`, with its parent left as a placeholder for ScriptLayer to fill in."""
+    parent = folium.FeatureGroup()
+    parent._id = DETACHED_ID
+    layer.add_to(parent)
+    return layer_script(layer)
+
+
+class ScriptLayer(JSCSSMixin, MacroElement):
+    """A layer from a script rendered earlier by `detached_script`, so cached layers are not rebuilt.
+
+    `assets` is the layer class the script came from; its JavaScript and CSS links are loaded with the map.
+    """
+
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+            {{ this.attached_script() }}
+        {% endmacro %}"""
+    )
+
+    def __init__(self, script, assets=MarkerCluster):
+        super().__init__()
+        self._name = "ScriptLayer"
+        self.script = script
+        self.default_js = assets.default_js
+        self.default_css = assets.default_css
+
+    def attached_script(self):
+        return self.script.replace(PARENT_PLACEHOLDER, self._parent.get_name())
+
+
+def render_map_html(m):
+    """Renders a Folium map to a standalone HTML page, as folium_static would embed it."""
+    return folium.Figure().add_child(m).render()
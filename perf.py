@@ -0,0 +1,249 @@
+import contextvars
+import functools
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+# --- Recorder Settings ---
+# Set OPTIMCHARGE_PERF=1 to record from startup; admins can also switch recording on from the Performance tab.
+ENABLED_ENV = "OPTIMCHARGE_PERF"
+DEFAULT_CAPACITY = 20_000
+PERCENTILES = (50, 90, 99)
+RERUN_SPAN = "rerun"
+SERVICE_NAME = "optimcharge-dashboard"
+SCOPE_NAME = "optimcharge.perf"
+
+# The innermost open span of the running script (each Streamlit script run has its own thread and context).
+_current = contextvars.ContextVar("optimcharge_span", default=None)
+
+
+def _new_id(n_bytes):
+    # Trace and span ids only need to be unique, not unpredictable.
+    return f"{random.getrandbits(8 * n_bytes):0{2 * n_bytes}x}"
+
+
+# --- Spans ---
+class Span:
+    """One timed section of a rerun: a name, wall-clock start, duration and attributes.
+
+    Used as a context manager; nested spans become its children and share its
+    trace id, so every span of one script run belongs to the same trace. The
+    span is appended to the recorder's ring buffer when it closes.
+    """
+
+    __slots__ = ("recorder", "name", "trace_id", "span_id", "parent_id", "start_ns", "duration_ns", "attributes",
+                 "_started", "_token")
+
+    def __init__(self, recorder, name, parent=None, attributes=None):
+        self.recorder = recorder
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else _new_id(16)
+        self.span_id = _new_id(8)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes = attributes or {}
+        self.start_ns = self.duration_ns = 0
+        self._started = 0
+        self._token = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def open(self):
+        self.start_ns = time.time_ns()
+        self._started = time.perf_counter_ns()
+        self._token = _current.set(self)
+        return self
+
+    def close(self, error=None):
+        self.duration_ns = time.perf_counter_ns() - self._started
+        if error is not None:
+            self.attributes["error"] = type(error).__name__
+        try:
+            _current.reset(self._token)
+        except ValueError:
+            _current.set(None)  # Closed from another context; leave no dangling parent behind.
+        self.recorder._append(self)
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(exc)
+        return False
+
+    @property
+    def end_ns(self):
+        return self.start_ns + self.duration_ns
+
+    def to_dict(self):
+        return {"name": self.name, "trace_id": self.trace_id, "span_id": self.span_id, "parent_id": self.parent_id,
+                "start_ns": self.start_ns, "duration_ms": self.duration_ns / 1e6, "attributes": self.attributes}
+
+
+class _NoSpan:
+    """Returned while recording is off: entering, leaving and setting attributes do nothing."""
+
+    __slots__ = ()
+
+    def set(self, **attributes):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NO_SPAN = _NoSpan()
+
+
+# --- Recorder ---
+class Recorder:
+    """Process-wide ring buffer of spans plus cache hit/miss counters.
+
+    While `enabled` is False, `span` returns a shared no-op and `timed`
+    wrappers call straight through, so instrumentation left in place costs
+    one attribute check. Spans from every session share the buffer; the
+    oldest are dropped once it holds `capacity`.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, enabled=False):
+        self.enabled = enabled
+        self._spans = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.recorded = 0
+
+    def __len__(self):
+        return len(self._spans)
+
+    @property
+    def capacity(self):
+        return self._spans.maxlen
+
+    def _append(self, span):
+        with self._lock:
+            self._spans.append(span)
+            self.recorded += 1
+
+    def span(self, name, **attributes):
+        """A context manager timing the block as a child of the current span."""
+        if not self.enabled:
+            return NO_SPAN
+        return Span(self, name, _current.get(), attributes)
+
+    def timed(self, name=None):
+        """Decorator recording a span per call, named after the function unless `name` is given."""
+        def decorate(func):
+            label = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with Span(self, label, _current.get()):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def begin_rerun(self, **attributes):
+        """Opens the root span of a script run; later spans in the run nest under it until `end_rerun`."""
+        if not self.enabled:
+            return NO_SPAN
+        return Span(self, RERUN_SPAN, None, attributes).open()
+
+    def end_rerun(self):
+        """Closes the current run's root span. Runs stopped early (st.stop, reruns) are not recorded."""
+        span = _current.get()
+        if span is not None and span.name == RERUN_SPAN and span.parent_id is None:
+            span.close()
+
+    def count(self, cache, hit):
+        """Counts a hit or miss of `cache` and notes it on the current span."""
+        if not self.enabled:
+            return
+        outcome = "hit" if hit else "miss"
+        with self._lock:
+            self.counters[(cache, outcome)] = self.counters.get((cache, outcome), 0) + 1
+        span = _current.get()
+        if span is not None:
+            span.attributes[cache] = outcome
+
+    def spans(self):
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+            self.counters.clear()
+            self.recorded = 0
+
+    # --- Reports ---
+    def summary(self, percentiles=PERCENTILES):
+        """Per span name: count, duration percentiles, max and total in ms, and mean payload bytes."""
+        spans = self.spans()
+        columns = ["span", "count", *(f"p{p}_ms" for p in percentiles), "max_ms", "total_ms", "mean_bytes"]
+        if not spans:
+            return pd.DataFrame(columns=columns)
+        frame = pd.DataFrame({"span": [span.name for span in spans],
+                              "ms": np.array([span.duration_ns for span in spans]) / 1e6,
+                              "bytes": [span.attributes.get("bytes", np.nan) for span in spans]})
+        rows = []
+        for name, group in frame.groupby("span", sort=False):
+            ms = group["ms"].to_numpy()
+            rows.append([name, len(ms), *np.percentile(ms, percentiles), ms.max(), ms.sum(), group["bytes"].mean()])
+        return pd.DataFrame(rows, columns=columns).sort_values("total_ms", ascending=False, ignore_index=True)
+
+    def cache_counts(self):
+        """Hits, misses and hit rate per counted cache."""
+        with self._lock:
+            counters = dict(self.counters)
+        caches = sorted({cache for cache, _ in counters})
+        hits = np.array([counters.get((cache, "hit"), 0) for cache in caches])
+        misses = np.array([counters.get((cache, "miss"), 0) for cache in caches])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return pd.DataFrame({"cache": caches, "hits": hits, "misses": misses, "hit_rate": hits / (hits + misses)})
+
+    def export_json(self):
+        """The buffered spans as a JSON array, oldest first."""
+        return json.dumps([span.to_dict() for span in self.spans()], default=str)
+
+    def export_otlp(self):
+        """The buffered spans as an OTLP/JSON trace export (an ExportTraceServiceRequest body)."""
+        return json.dumps({"resourceSpans": [{
+            "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+            "scopeSpans": [{"scope": {"name": SCOPE_NAME}, "spans": [_otlp_span(span) for span in self.spans()]}],
+        }]})
+
+
+def _otlp_attribute(key, value):
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, (int, np.integer)):
+        return {"key": key, "value": {"intValue": str(int(value))}}
+    if isinstance(value, (float, np.floating)):
+        return {"key": key, "value": {"doubleValue": float(value)}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def _otlp_span(span):
+    # OTLP/JSON writes 64-bit integers as strings; kind 1 is SPAN_KIND_INTERNAL, status code 2 is an error.
+    record = {"traceId": span.trace_id, "spanId": span.span_id, "name": span.name, "kind": 1,
+              "startTimeUnixNano": str(span.start_ns), "endTimeUnixNano": str(span.end_ns),
+              "attributes": [_otlp_attribute(key, value) for key, value in span.attributes.items()]}
+    if span.parent_id:
+        record["parentSpanId"] = span.parent_id
+    if "error" in span.attributes:
+        record["status"] = {"code": 2, "message": span.attributes["error"]}
+    return record
+
+
+recorder = Recorder(enabled=os.environ.get(ENABLED_ENV) == "1")
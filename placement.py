@@ -0,0 +1,207 @@
+import heapq
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from emissions_grid import aggregate_emissions
+from station_index import EARTH_RADIUS_KM, chord_to_km, km_to_chord, to_unit_vectors
+
+DISTANCE_CHUNK = 4096
+
+
+# --- Demand and Candidates ---
+def _numeric(values):
+    """Parses a spreadsheet column as float64; text cells may carry stray (e.g. non-breaking) spaces."""
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy(dtype=np.float64, na_value=np.nan)
+    return pd.to_numeric(values.astype("string").str.strip(), errors="coerce").to_numpy(dtype=np.float64,
+                                                                                       na_value=np.nan)
+
+
+def population_rows(population):
+    """Returns (lat, lon, people, valid): the parsed columns of every population row and which rows are usable."""
+    if population is None or not len(population):
+        return np.empty(0), np.empty(0), np.empty(0), np.zeros(0, dtype=bool)
+    pop_lat, pop_lon, people = (_numeric(population[column])
+                                for column in ("Latitude", "Longitude", "Total_Young_Population"))
+    return pop_lat, pop_lon, people, ~(np.isnan(pop_lat) | np.isnan(pop_lon) | np.isnan(people))
+
+
+def population_points(population):
+    """Returns (lat, lon, people) arrays of the population rows with usable values."""
+    pop_lat, pop_lon, people, valid = population_rows(population)
+    return pop_lat[valid], pop_lon[valid], people[valid]
+
+
+def population_per_cell(lat, lon, population):
+    """Young population per grid cell: each population point's total is spread evenly over the cells nearest it.
+
+    Returns (people per cell, people of points that no cell is nearest to).
+    """
+    pop_lat, pop_lon, people = population_points(population)
+    if not len(people) or not len(lat):
+        return np.zeros(len(lat)), people
+    _, owner = cKDTree(to_unit_vectors(pop_lat, pop_lon)).query(to_unit_vectors(lat, lon))
+    cells_per_owner = np.bincount(owner, minlength=len(people))
+    return people[owner] / cells_per_owner[owner], np.where(cells_per_owner == 0, people, 0.0)
+
+
+def demand_points(emissions, population, resolution=0.05, population_share=0.5):
+    """Builds weighted demand points from the emissions grid and the young-population table.
+
+    Demand points are emission grid cells. Each cell's weight blends its share of the
+    total emission intensity with its share of young population, where a province's
+    `Total_Young_Population` is spread evenly over the cells nearest its centroid.
+    Weights sum to 1.
+    """
+    cells = aggregate_emissions(emissions, resolution, "mean")
+    lat = cells["latitude"].to_numpy()
+    lon = cells["longitude"].to_numpy()
+    emission_weight = cells["value"].to_numpy() / cells["value"].sum()
+
+    people, _ = population_per_cell(lat, lon, population)
+    if people.sum() > 0:
+        population_weight = people / people.sum()
+    else:
+        population_weight = np.zeros(len(cells))
+        population_share = 0.0
+
+    weight = population_share * population_weight + (1.0 - population_share) * emission_weight
+    return pd.DataFrame({"latitude": lat, "longitude": lon, "weight": weight})
+
+
+def candidate_sites(demand, spacing_km=5.0, margin_km=5.0):
+    """Returns a regular grid of candidate sites covering the demand area at `spacing_km`."""
+    lat = demand["latitude"].to_numpy()
+    lon = demand["longitude"].to_numpy()
+    margin = margin_km / 111.0
+    lat_step = spacing_km / 111.0
+    lon_step = lat_step / np.cos(np.radians(lat.mean()))
+    grid_lat, grid_lon = np.meshgrid(np.arange(lat.min() - margin, lat.max() + margin, lat_step),
+                                     np.arange(lon.min() - margin, lon.max() + margin, lon_step),
+                                     indexing="ij")
+    return pd.DataFrame({"latitude": grid_lat.ravel(), "longitude": grid_lon.ravel()})
+
+
+# --- Distance Helpers ---
+def _distances_km(points, sites):
+    """Great-circle distances (km) between unit-vector points and sites, computed with one matrix product."""
+    cosine = np.clip(points @ sites.T, -1.0, 1.0)
+    return chord_to_km(np.sqrt(np.maximum(2.0 - 2.0 * cosine, 0.0)))
+
+
+def _nearest_km(points, facilities):
+    """Distance from every point to its nearest facility, or inf when there are none."""
+    if not len(facilities):
+        return np.full(len(points), np.inf)
+    chord, _ = cKDTree(facilities).query(points)
+    return chord_to_km(chord)
+
+
+def _unit(frame, lat_col="latitude", lon_col="longitude"):
+    if frame is None or not len(frame):
+        return np.empty((0, 3))
+    return to_unit_vectors(frame[lat_col].to_numpy(), frame[lon_col].to_numpy())
+
+
+def _result(candidates, picks, gains, objectives):
+    chosen = candidates.iloc[picks]
+    return pd.DataFrame({"rank": np.arange(1, len(picks) + 1),
+                         "latitude": chosen["latitude"].to_numpy(),
+                         "longitude": chosen["longitude"].to_numpy(),
+                         "gain": gains, "objective": objectives})
+
+
+# --- Solvers ---
+def max_coverage(demand, candidates, existing=None, k=5, radius_km=10.0):
+    """Lazy-greedy weighted maximum coverage.
+
+    Picks `k` candidate sites that maximize the demand weight within `radius_km`
+    of any station, with `existing` stations (Latitude/Longitude) counted as
+    already built. The `objective` column is the covered share of demand after
+    each pick.
+    """
+    demand_xyz = _unit(demand)
+    weights = demand["weight"].to_numpy(dtype=np.float64)
+    existing_xyz = _unit(existing, "Latitude", "Longitude")
+    covered = _nearest_km(demand_xyz, existing_xyz) <= radius_km
+
+    # Sparse candidate -> demand coverage lists (CSR) from one tree query.
+    coverage = cKDTree(demand_xyz).query_ball_point(_unit(candidates), km_to_chord(radius_km))
+    lengths = np.fromiter((len(c) for c in coverage), dtype=np.int64, count=len(coverage))
+    indptr = np.concatenate(([0], np.cumsum(lengths)))
+    indices = np.fromiter((i for c in coverage for i in c), dtype=np.int64, count=indptr[-1])
+
+    open_weight = np.where(covered, 0.0, weights)
+    initial = np.bincount(np.repeat(np.arange(len(lengths)), lengths), weights=open_weight[indices],
+                          minlength=len(lengths))
+    heap = [(-gain, site) for site, gain in enumerate(initial) if gain > 0]
+    heapq.heapify(heap)
+
+    total = weights.sum()
+    picks, gains, objectives = [], [], []
+    covered_weight = weights[covered].sum()
+    while heap and len(picks) < k:
+        _, site = heapq.heappop(heap)
+        members = indices[indptr[site]:indptr[site + 1]]
+        gain = weights[members][~covered[members]].sum()
+        # Gains only shrink as coverage grows, so a refreshed gain that still beats
+        # the next stale upper bound is the true maximum.
+        if heap and gain < -heap[0][0] - 1e-15:
+            if gain > 0:
+                heapq.heappush(heap, (-gain, site))
+            continue
+        if gain <= 0:
+            break
+        covered[members] = True
+        covered_weight += gain
+        picks.append(site)
+        gains.append(gain)
+        objectives.append(covered_weight / total)
+    return _result(candidates, picks, gains, objectives)
+
+
+def p_median(demand, candidates, existing=None, k=5):
+    """Lazy-greedy p-median (weighted facility location).
+
+    Picks `k` candidate sites that most reduce the demand-weighted distance to the
+    nearest station, with `existing` stations counted as already built. The
+    `objective` column is the weighted mean distance in km after each pick.
+    """
+    demand_xyz = _unit(demand)
+    candidate_xyz = _unit(candidates)
+    weights = demand["weight"].to_numpy(dtype=np.float64)
+    weights = weights / weights.sum()
+    # With no stations yet, start every point at the largest possible great-circle
+    # distance so the first pick is the plain 1-median.
+    nearest = np.minimum(_nearest_km(demand_xyz, _unit(existing, "Latitude", "Longitude")),
+                         np.pi * EARTH_RADIUS_KM)
+
+    # Initial gains for every candidate, in chunks so the matrix stays bounded.
+    initial = np.empty(len(candidate_xyz))
+    for start in range(0, len(candidate_xyz), DISTANCE_CHUNK):
+        block = _distances_km(demand_xyz, candidate_xyz[start:start + DISTANCE_CHUNK])
+        initial[start:start + DISTANCE_CHUNK] = weights @ np.maximum(nearest[:, None] - block, 0.0)
+    heap = [(-gain, site) for site, gain in enumerate(initial) if gain > 0]
+    heapq.heapify(heap)
+
+    picks, gains, objectives = [], [], []
+    while heap and len(picks) < k:
+        _, site = heapq.heappop(heap)
+        distance = _distances_km(demand_xyz, candidate_xyz[site:site + 1])[:, 0]
+        gain = weights @ np.maximum(nearest - distance, 0.0)
+        if heap and gain < -heap[0][0] - 1e-15:
+            if gain > 0:
+                heapq.heappush(heap, (-gain, site))
+            continue
+        if gain <= 0:
+            break
+        nearest = np.minimum(nearest, distance)
+        picks.append(site)
+        gains.append(gain)
+        objectives.append(float(weights @ nearest))
+    return _result(candidates, picks, gains, objectives)
+
+
+SOLVERS = {"Maximum coverage": max_coverage, "P-median": p_median}
@@ -0,0 +1,29 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Workers are never forked from the caller: the dashboard server runs threads (telemetry, file watchers, script
+# runners), and a forked child could inherit a lock one of them holds. A fork server is started once per process
+# and forks each worker from a clean single-threaded state; platforms without one spawn fresh interpreters.
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+_context = multiprocessing.get_context(START_METHOD)
+_preload = []
+
+
+def preload(module_name):
+    """Imports `module_name` in the fork server, so workers start with it (and its dependencies) loaded.
+
+    Only takes effect for modules registered before the first pool starts the server.
+    """
+    if START_METHOD == "forkserver" and module_name not in _preload:
+        _preload.append(module_name)
+        _context.set_forkserver_preload(list(_preload))
+
+
+def process_pool(max_workers=None, **kwargs):
+    """A ProcessPoolExecutor whose workers are safe to start from a multi-threaded process.
+
+    Workers share no memory with the caller, so read-only data goes to them
+    through `initargs` or named files and shared-memory segments.
+    """
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=_context, **kwargs)
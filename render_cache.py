@@ -0,0 +1,102 @@
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 64 * 2 ** 20
+DEFAULT_MAX_ENTRIES = 256
+VIEWPORT_KEY = "viewport"
+
+
+# --- Keys ---
+def viewport_key(key, bounds, zoom):
+    """Key of the layer sent for one viewport of the map cached under `key`."""
+    return (VIEWPORT_KEY, key, tuple(round(float(edge), 6) for edge in bounds), int(zoom))
+
+
+def map_key(key):
+    """The map a cache key belongs to: the key itself, or the map of a viewport key."""
+    return key[1] if key[0] == VIEWPORT_KEY else key
+
+
+class RenderCache:
+    """Thread-safe LRU cache of rendered map HTML (or a viewport's layer script) with a memory budget.
+
+    Keys are tuples such as (map type, dataset version, status filter, town query);
+    station maps are keyed without a version and dropped by `StationStore` when a
+    station they show changes.
+    One instance is shared by every session of a server process, so entries are
+    plain immutable strings and all bookkeeping happens under a single lock.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key):
+        """Returns the cached HTML for `key` (marking it recently used), or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, html):
+        """Stores HTML under `key`, evicting least recently used entries to stay in budget."""
+        size = len(html.encode("utf-8"))
+        if size > self.max_bytes:
+            return  # Larger than the whole budget; never worth caching.
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self._entries[key] = (html, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def get_or_render(self, key, render):
+        """Returns cached HTML for `key`, calling `render()` and storing its result on a miss.
+
+        Rendering happens outside the lock so a slow map never blocks other sessions;
+        two sessions missing on the same key at once may both render it.
+        """
+        html = self.get(key)
+        if html is None:
+            html = render()
+            self.put(key, html)
+        return html
+
+    def invalidate(self, predicate):
+        """Drops every entry whose key satisfies `predicate(key)`. Returns the number dropped."""
+        with self._lock:
+            stale = [key for key in self._entries if predicate(key)]
+            for key in stale:
+                self.bytes -= self._entries.pop(key)[1]
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self.bytes, "hits": self.hits,
+                    "misses": self.misses, "evictions": self.evictions}
@@ -0,0 +1,292 @@
+import os
+import re
+import tempfile
+import xml.etree.ElementTree as ET
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+from scipy.spatial import cKDTree
+
+from ingest import CACHE_DIR, file_digest
+from station_index import chord_to_km, haversine_km, to_unit_vectors
+
+# --- Routing Settings ---
+ROUTING_DIR = os.path.join(CACHE_DIR, "routing")
+ROUTING_FORMAT = 1
+# Free-flow speeds (km/h) by OSM highway class, used when an edge has neither a travel time nor a maxspeed.
+HIGHWAY_SPEEDS_KMH = {
+    "motorway": 100, "trunk": 80, "primary": 60, "secondary": 50, "tertiary": 40,
+    "unclassified": 30, "residential": 25, "living_street": 10, "service": 15, "track": 15,
+}
+DEFAULT_SPEED_KMH = 30
+# Speed assumed between a query point and the road node it snaps to.
+ACCESS_SPEED_KMH = 15
+# Edge directions (from, to) along a way for each oneway tag value; other values mean both ways.
+ONEWAY_DIRECTIONS = {"yes": [(0, 1)], "true": [(0, 1)], "1": [(0, 1)], "-1": [(1, 0)]}
+GRAPHML_NS = "{http://graphml.graphdrawing.org/xmlns}"
+MIN_EDGE_SECONDS = 1e-3
+
+
+def find_road_network(paths):
+    """Returns the first road-network extract in `paths` that exists, or None."""
+    return next((path for path in paths if os.path.exists(path)), None)
+
+
+def _highway_class(highway):
+    """Base class of an OSM highway tag; OSMnx writes multi-valued tags as "['primary', 'trunk']"."""
+    return str(highway or "").strip("[]'\" ").split("'")[0].removesuffix("_link")
+
+
+def _speed_kmh(maxspeed, highway):
+    """Speed of an edge from its maxspeed tag (first number, mph converted) or its highway class."""
+    if maxspeed:
+        match = re.search(r"\d+(\.\d+)?", str(maxspeed))
+        if match:
+            return float(match.group()) * (1.609344 if "mph" in str(maxspeed) else 1.0)
+    return HIGHWAY_SPEEDS_KMH.get(_highway_class(highway), DEFAULT_SPEED_KMH)
+
+
+def _edge_seconds(length_m, travel_time, maxspeed, highway):
+    if travel_time is not None and not np.isnan(travel_time):
+        return travel_time
+    return length_m / 1000.0 / _speed_kmh(maxspeed, highway) * 3600.0
+
+
+# --- Readers ---
+def read_graphml(file_path):
+    """Reads a road network saved as GraphML (e.g. by OSMnx), streaming the XML.
+
+    Nodes need `y`/`x` (or `lat`/`lon`) attributes. Edge travel time comes from
+    `travel_time` (s), else `length` (m, or the straight-line length) over the
+    `maxspeed` or `highway` speed. Undirected graphs get both directions.
+    Returns (lat, lon, source, target, seconds) arrays.
+    """
+    keys = {}
+    node_ids = {}
+    lat, lon = [], []
+    edges = []
+    directed = True
+    for _, element in ET.iterparse(file_path, events=("end",)):
+        tag = element.tag.removeprefix(GRAPHML_NS)
+        if tag == "key":
+            keys[element.get("id")] = element.get("attr.name")
+        elif tag == "graph":
+            directed = element.get("edgedefault", "directed") == "directed"
+        elif tag in ("node", "edge"):
+            data = {keys.get(child.get("key"), child.get("key")): child.text
+                    for child in element if child.tag.removeprefix(GRAPHML_NS) == "data"}
+            if tag == "node":
+                node_ids[element.get("id")] = len(lat)
+                lat.append(float(data.get("y", data.get("lat"))))
+                lon.append(float(data.get("x", data.get("lon"))))
+            else:
+                edges.append((element.get("source"), element.get("target"), data))
+            element.clear()
+
+    source = np.fromiter((node_ids[edge[0]] for edge in edges), np.int64, len(edges))
+    target = np.fromiter((node_ids[edge[1]] for edge in edges), np.int64, len(edges))
+    lat, lon = np.asarray(lat), np.asarray(lon)
+    straight_m = haversine_km(lat[source], lon[source], lat[target], lon[target]) * 1000.0
+    seconds = np.empty(len(edges))
+    for i, (_, _, data) in enumerate(edges):
+        length = float(data["length"]) if data.get("length") else straight_m[i]
+        travel_time = float(data["travel_time"]) if data.get("travel_time") else None
+        seconds[i] = _edge_seconds(length, travel_time, data.get("maxspeed"), data.get("highway"))
+    if not directed:
+        source, target = np.concatenate([source, target]), np.concatenate([target, source])
+        seconds = np.concatenate([seconds, seconds])
+    return lat, lon, source, target, seconds
+
+
+def read_osm_pbf(file_path):
+    """Reads the drivable ways of an OpenStreetMap PBF extract. Needs the optional `osmium` package.
+
+    Returns (lat, lon, source, target, seconds) arrays, honouring oneway tags.
+    """
+    try:
+        import osmium
+    except ImportError as e:
+        raise ImportError("Reading .osm.pbf road networks needs the 'osmium' package "
+                          "(pip install osmium); alternatively export the extract to GraphML.") from e
+
+    node_ids = {}
+    lat, lon, source, target, seconds = [], [], [], [], []
+
+    def node(location, ref):
+        position = node_ids.get(ref)
+        if position is None:
+            position = node_ids[ref] = len(lat)
+            lat.append(location.lat)
+            lon.append(location.lon)
+        return position
+
+    class Ways(osmium.SimpleHandler):
+        def way(self, way):
+            highway = way.tags.get("highway")
+            if _highway_class(highway) not in HIGHWAY_SPEEDS_KMH:
+                return
+            speed = _speed_kmh(way.tags.get("maxspeed"), highway)
+            oneway = way.tags.get("oneway", "no")
+            refs = [(node(n.location, n.ref), n.location) for n in way.nodes if n.location.valid()]
+            directions = ONEWAY_DIRECTIONS.get(oneway, [(0, 1), (1, 0)])
+            for pair in zip(refs, refs[1:]):
+                (_, a_loc), (_, b_loc) = pair
+                edge_s = float(haversine_km(a_loc.lat, a_loc.lon, b_loc.lat, b_loc.lon)) / speed * 3600.0
+                for start, end in directions:
+                    source.append(pair[start][0])
+                    target.append(pair[end][0])
+                    seconds.append(edge_s)
+
+    Ways().apply_file(file_path, locations=True)
+    return (np.asarray(lat), np.asarray(lon), np.asarray(source, dtype=np.int64),
+            np.asarray(target, dtype=np.int64), np.asarray(seconds))
+
+
+# --- Graph ---
+class RoadGraph:
+    """Road network as a CSR matrix of edge travel times (seconds) plus a KD-tree of node positions.
+
+    Parallel edges keep their fastest travel time. `snap` maps points to their
+    nearest road node in O(log n).
+    """
+
+    def __init__(self, lat, lon, source, target, seconds, version=None):
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.version = version
+        n = len(self.lat)
+        seconds = np.maximum(np.asarray(seconds, dtype=np.float64), MIN_EDGE_SECONDS)
+        # Fastest of any parallel edges: order by (edge, time) and keep each edge's first entry.
+        pair = np.asarray(source, dtype=np.int64) * n + np.asarray(target, dtype=np.int64)
+        order = np.lexsort((seconds, pair))
+        keep = order[np.r_[True, pair[order][1:] != pair[order][:-1]]]
+        self.csr = csr_matrix((seconds[keep], (pair[keep] // n, pair[keep] % n)), shape=(n, n))
+        self.tree = cKDTree(to_unit_vectors(self.lat, self.lon))
+
+    @classmethod
+    def from_csr(cls, lat, lon, csr, version=None):
+        graph = cls.__new__(cls)
+        graph.lat, graph.lon, graph.csr, graph.version = lat, lon, csr, version
+        graph.tree = cKDTree(to_unit_vectors(lat, lon))
+        return graph
+
+    def __len__(self):
+        return len(self.lat)
+
+    @property
+    def edges(self):
+        return self.csr.nnz
+
+    def snap(self, lat, lon):
+        """Returns (nearest node, distance to it in km) for each point."""
+        chord, nodes = self.tree.query(to_unit_vectors(np.atleast_1d(lat), np.atleast_1d(lon)))
+        return np.asarray(nodes, dtype=np.int64), chord_to_km(chord)
+
+    def save(self, file_path):
+        _save_npz(file_path, lat=self.lat, lon=self.lon, indptr=self.csr.indptr, indices=self.csr.indices,
+                  data=self.csr.data)
+
+    @classmethod
+    def load(cls, file_path, version=None):
+        with np.load(file_path) as arrays:
+            if int(arrays["format"]) != ROUTING_FORMAT:
+                raise ValueError(f"{file_path} was written by another version of the routing cache.")
+            n = len(arrays["lat"])
+            csr = csr_matrix((arrays["data"], arrays["indices"], arrays["indptr"]), shape=(n, n))
+            return cls.from_csr(arrays["lat"], arrays["lon"], csr, version)
+
+
+def _save_npz(file_path, **arrays):
+    """Writes a routing cache file through a unique temporary file, so concurrent builds never share one."""
+    descriptor, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path) or ".", suffix=".npz")
+    try:
+        with os.fdopen(descriptor, "wb") as handle:
+            np.savez(handle, format=ROUTING_FORMAT, **arrays)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _cache_path(kind, *parts):
+    os.makedirs(ROUTING_DIR, exist_ok=True)
+    return os.path.join(ROUTING_DIR, f"{kind}-{'-'.join(str(part)[:12] for part in parts)}.npz")
+
+
+def load_road_graph(file_path):
+    """Loads a GraphML or OSM PBF extract as a RoadGraph, compiled once to a CSR cache on disk."""
+    version = file_digest(file_path)
+    cache_path = _cache_path("graph", version)
+    if os.path.exists(cache_path):
+        try:
+            return RoadGraph.load(cache_path, version)
+        except (OSError, ValueError, KeyError):
+            pass  # Stale or partial cache; rebuild below.
+    reader = read_osm_pbf if file_path.lower().endswith(".pbf") else read_graphml
+    graph = RoadGraph(*reader(file_path), version=version)
+    graph.save(cache_path)
+    return graph
+
+
+# --- Catchments ---
+class RoadCatchments:
+    """Nearest station by travel time, and that time, for every node of a road graph.
+
+    Built with one multi-source Dijkstra over the reversed graph (travel *to* a
+    station), so every node is labelled in a single pass however many stations
+    there are. Point queries snap to the nearest node and read its label.
+    """
+
+    def __init__(self, graph, node_station, node_seconds, version=None):
+        self.graph = graph
+        self.node_station = node_station
+        self.node_seconds = node_seconds
+        self.version = version
+
+    @classmethod
+    def build(cls, graph, station_lat, station_lon, version=None):
+        station_nodes, _ = graph.snap(station_lat, station_lon)
+        sources, first = np.unique(station_nodes, return_index=True)
+        seconds, _, origin = dijkstra(graph.csr.T.tocsr(), directed=True, indices=sources, min_only=True,
+                                      return_predecessors=True)
+        # Stations snapped to the same node share it; the first one in table order owns the node.
+        station_of_node = np.full(len(graph), -1, dtype=np.int32)
+        station_of_node[sources] = first
+        node_station = np.where(origin >= 0, station_of_node[np.maximum(origin, 0)], -1).astype(np.int32)
+        return cls(graph, node_station, seconds.astype(np.float32), version)
+
+    def nearest(self, lat, lon):
+        """Returns (station positions, travel seconds, km to the road) per point; position -1 when unreachable.
+
+        Travel time includes reaching the snapped road node at ACCESS_SPEED_KMH.
+        """
+        nodes, access_km = self.graph.snap(lat, lon)
+        seconds = self.node_seconds[nodes] + access_km / ACCESS_SPEED_KMH * 3600.0
+        return self.node_station[nodes], seconds, access_km
+
+    def station_summary(self, n_stations):
+        """Per-station road nodes served and their mean travel time in seconds."""
+        reached = self.node_station >= 0
+        nodes = np.bincount(self.node_station[reached], minlength=n_stations)
+        total = np.bincount(self.node_station[reached], weights=self.node_seconds[reached], minlength=n_stations)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return nodes, total / nodes
+
+    def save(self, file_path):
+        _save_npz(file_path, node_station=self.node_station, node_seconds=self.node_seconds)
+
+
+def load_road_catchments(graph, station_lat, station_lon, stations_version):
+    """Returns catchments for the stations on `graph`, cached on disk per (graph, stations) version."""
+    cache_path = _cache_path("catchments", graph.version, stations_version)
+    if os.path.exists(cache_path):
+        try:
+            with np.load(cache_path) as arrays:
+                if int(arrays["format"]) == ROUTING_FORMAT and len(arrays["node_station"]) == len(graph):
+                    return RoadCatchments(graph, arrays["node_station"], arrays["node_seconds"], stations_version)
+        except (OSError, ValueError, KeyError):
+            pass
+    catchments = RoadCatchments.build(graph, station_lat, station_lon, stations_version)
+    catchments.save(cache_path)
+    return catchments
@@ -0,0 +1,152 @@
+import itertools
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from pools import preload, process_pool
+from station_index import haversine_km
+
+BASELINE_STATUS = "Operational"
+PIPELINE_STATUSES = ("Under-Construction", "Planned", "Awaiting Contract", "Pending Site Visit")
+REVENUE_COLUMN = "Sales Revenue (RWF)"
+DEFAULT_CHUNK_SIZE = 512
+
+# Arrays attached by each pool worker: name -> read-only view of shared memory.
+# The segments are kept referenced so the views stay valid for the worker's lifetime.
+_shared = {}
+_segments = []
+preload(__name__)
+
+
+# --- Scenario Definitions ---
+def standard_scenarios(stations, status_column="Status", province_column="Province"):
+    """Returns {name: station positions} for the usual build-out questions.
+
+    Every scenario includes the operational baseline; the others add pipeline
+    stations by status, all at once, or by province.
+    """
+    status = stations[status_column].to_numpy()
+    baseline = np.flatnonzero(status == BASELINE_STATUS)
+    pipeline = np.isin(status, PIPELINE_STATUSES)
+    scenarios = {"Operational only": baseline,
+                 "Build all pipeline": np.flatnonzero((status == BASELINE_STATUS) | pipeline)}
+    for name in PIPELINE_STATUSES:
+        if (status == name).any():
+            scenarios[f"Build all {name}"] = np.flatnonzero((status == BASELINE_STATUS) | (status == name))
+    if province_column in stations.columns:
+        province = stations[province_column].to_numpy()
+        for name in pd.unique(province[pipeline]):
+            scenarios[f"Pipeline in {name} only"] = np.flatnonzero((status == BASELINE_STATUS) |
+                                                                   (pipeline & (province == name)))
+    return scenarios
+
+
+def combination_scenarios(stations, statuses=PIPELINE_STATUSES, size=2, name_column="Connector Name",
+                          status_column="Status"):
+    """Returns {name: station positions} for every combination of `size` pipeline sites on top of the baseline.
+
+    Rows sharing a name (several connectors at one site) are built together.
+    """
+    status = stations[status_column].to_numpy()
+    baseline = np.flatnonzero(status == BASELINE_STATUS)
+    candidates = np.flatnonzero(np.isin(status, statuses))
+    codes, sites = pd.factorize(stations[name_column].astype(str).to_numpy()[candidates])
+    rows = [candidates[codes == site] for site in range(len(sites))]
+    scenarios = {}
+    for combo in itertools.combinations(range(len(sites)), size):
+        label = " + ".join(sites[list(combo)])
+        scenarios[label] = np.concatenate([baseline] + [rows[site] for site in combo])
+    return scenarios
+
+
+# --- Shared Memory ---
+def _share(array):
+    segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[...] = array
+    return segment, (segment.name, array.shape, array.dtype.str)
+
+
+def _attach(specs):
+    """Pool initializer: maps the parent's read-only arrays into this worker without copying."""
+    for key, (name, shape, dtype) in specs.items():
+        segment = shared_memory.SharedMemory(name=name)
+        view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf)
+        view.flags.writeable = False
+        _segments.append(segment)
+        _shared[key] = view
+
+
+# --- Evaluation ---
+def _evaluate(members_list, distances, weights, radius_km):
+    """Coverage share and weighted mean distance for each facility set."""
+    rows = []
+    for members in members_list:
+        if len(members):
+            nearest = distances[:, members].min(axis=1)
+            rows.append((float(weights[nearest <= radius_km].sum()), float(weights @ nearest)))
+        else:
+            rows.append((0.0, float("nan")))
+    return rows
+
+
+def _evaluate_chunk(members_list, radius_km):
+    return _evaluate(members_list, _shared["distances"], _shared["weights"], radius_km)
+
+
+def evaluate_scenarios(demand, stations, scenarios, radius_km=10.0, max_workers=None,
+                       chunk_size=DEFAULT_CHUNK_SIZE):
+    """Scores every scenario and returns them ranked by coverage, then mean distance.
+
+    The demand-to-station distance matrix and demand weights are placed in shared
+    memory once; pool tasks carry only lists of station positions. Revenue is
+    projected from the operational stations' revenue per unit of covered demand.
+    """
+    weights = demand["weight"].to_numpy(dtype=np.float64)
+    weights = weights / weights.sum()
+    distances = haversine_km(demand["latitude"].to_numpy()[:, None], demand["longitude"].to_numpy()[:, None],
+                             stations["Latitude"].to_numpy()[None, :], stations["Longitude"].to_numpy()[None, :])
+    names = list(scenarios)
+    members_list = [np.asarray(scenarios[name], dtype=np.int64) for name in names]
+
+    workers = max_workers or os.cpu_count() or 1
+    if workers == 1 or len(members_list) <= chunk_size:
+        results = _evaluate(members_list, distances, weights, radius_km)
+    else:
+        segments = []
+        try:
+            specs = {}
+            for key, array in (("distances", distances), ("weights", weights)):
+                segment, specs[key] = _share(array)
+                segments.append(segment)
+            chunks = [members_list[i:i + chunk_size] for i in range(0, len(members_list), chunk_size)]
+            with process_pool(workers, initializer=_attach, initargs=(specs,)) as pool:
+                results = [row for rows in pool.map(_evaluate_chunk, chunks, itertools.repeat(radius_km))
+                           for row in rows]
+        finally:
+            for segment in segments:
+                segment.close()
+                segment.unlink()
+
+    coverage = np.array([row[0] for row in results])
+    mean_distance = np.array([row[1] for row in results])
+    status = stations["Status"].to_numpy()
+    baseline = np.flatnonzero(status == BASELINE_STATUS)
+    baseline_coverage = _evaluate([baseline], distances, weights, radius_km)[0][0]
+    operational_revenue = 0.0
+    if REVENUE_COLUMN in stations.columns:
+        operational_revenue = float(pd.to_numeric(stations[REVENUE_COLUMN], errors="coerce").iloc[baseline].sum())
+    rate = operational_revenue / baseline_coverage if baseline_coverage > 0 else 0.0
+
+    table = pd.DataFrame({
+        "scenario": names,
+        "new_stations": [int(np.setdiff1d(members, baseline).size) for members in members_list],
+        "coverage": coverage,
+        "mean_distance_km": mean_distance,
+        "projected_revenue_rwf": coverage * rate,
+        "incremental_revenue_rwf": (coverage - baseline_coverage) * rate,
+    })
+    table = table.sort_values(["coverage", "mean_distance_km"], ascending=[False, True], ignore_index=True)
+    table.insert(0, "rank", np.arange(1, len(table) + 1))
+    return table
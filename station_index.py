@@ -0,0 +1,89 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+# --- Geometry Helpers ---
+def to_unit_vectors(lat, lon):
+    """Converts degrees to 3D points on the unit sphere."""
+    lat_rad = np.radians(np.asarray(lat, dtype=np.float64))
+    lon_rad = np.radians(np.asarray(lon, dtype=np.float64))
+    cos_lat = np.cos(lat_rad)
+    return np.column_stack((cos_lat * np.cos(lon_rad), cos_lat * np.sin(lon_rad), np.sin(lat_rad)))
+
+
+def chord_to_km(chord):
+    """Converts unit-sphere chord lengths to great-circle distances in km."""
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.clip(np.asarray(chord) / 2.0, 0.0, 1.0))
+
+
+def km_to_chord(distance_km):
+    """Converts great-circle distances in km to unit-sphere chord lengths."""
+    return 2.0 * np.sin(np.minimum(np.asarray(distance_km, dtype=np.float64) / EARTH_RADIUS_KM, np.pi) / 2.0)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km between points given in degrees."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2.0) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2.0) ** 2
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+# --- Station Index ---
+class StationIndex:
+    """KD-tree over station positions on the unit sphere.
+
+    Queries return positional row numbers into the frame the index was built from
+    (use `.iloc`) together with haversine-correct distances in km. The frame itself
+    is never modified.
+    """
+
+    def __init__(self, lat, lon, version=None):
+        self.lat = np.array(lat, dtype=np.float64)
+        self.lon = np.array(lon, dtype=np.float64)
+        self.lat.flags.writeable = False
+        self.lon.flags.writeable = False
+        self.version = version
+        self.tree = cKDTree(to_unit_vectors(self.lat, self.lon))
+
+    @classmethod
+    def from_frame(cls, data, lat_col="Latitude", lon_col="Longitude", version=None):
+        return cls(data[lat_col].to_numpy(), data[lon_col].to_numpy(), version)
+
+    def __len__(self):
+        return len(self.lat)
+
+    def nearest(self, lat, lon, k=1):
+        """Returns (positions, distances_km) of the k nearest stations to each query point.
+
+        Scalar queries give 1-D arrays of length k; array queries give (n, k) arrays.
+        """
+        k = min(k, len(self))
+        chord, positions = self.tree.query(to_unit_vectors(np.atleast_1d(lat), np.atleast_1d(lon)), k=k)
+        chord = np.asarray(chord).reshape(-1, k)
+        positions = np.asarray(positions).reshape(-1, k)
+        if np.ndim(lat) == 0:
+            return positions[0], chord_to_km(chord[0])
+        return positions, chord_to_km(chord)
+
+    def within_radius(self, lat, lon, radius_km):
+        """Returns (positions, distances_km) of stations within `radius_km`, nearest first."""
+        query = to_unit_vectors(lat, lon)[0]
+        positions = np.asarray(self.tree.query_ball_point(query, km_to_chord(radius_km)), dtype=np.int64)
+        distances = haversine_km(lat, lon, self.lat[positions], self.lon[positions])
+        order = np.argsort(distances, kind="stable")
+        return positions[order], distances[order]
+
+    def in_bbox(self, south, west, north, east):
+        """Returns the positions of stations inside a lat/lon bounding box."""
+        center_lat = (south + north) / 2.0
+        center_lon = (west + east) / 2.0
+        # The smallest sphere around the box's corners bounds every point inside it.
+        corner_km = haversine_km(center_lat, center_lon, [south, south, north, north, center_lat, center_lat],
+                                 [west, east, west, east, west, east]).max()
+        positions = np.asarray(self.tree.query_ball_point(to_unit_vectors(center_lat, center_lon)[0],
+                                                          km_to_chord(corner_km * 1.0001)), dtype=np.int64)
+        lat, lon = self.lat[positions], self.lon[positions]
+        inside = (lat >= south) & (lat <= north) & (lon >= west) & (lon <= east)
+        return np.sort(positions[inside])
@@ -0,0 +1,238 @@
+import hashlib
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from ingest import dataset_version
+from render_cache import map_key
+from station_index import StationIndex
+from town_search import TownIndex
+
+STATION_KEY = "Charger ID"
+GEOMETRY_COLUMNS = ("Latitude", "Longitude")
+TOWN_COLUMN = "City/Suburb/Town"
+DEFAULT_INTERVAL = 2.0
+HISTORY_SIZE = 20
+
+
+# --- Render Cache Keys ---
+def station_map_key(status=None, town=None):
+    """Render-cache key of a station map filtered by status or by a normalized town query."""
+    return ("stations", status, town)
+
+
+def nearest_map_key(charger_id):
+    """Render-cache key of the single-station map shown for a nearest-station answer."""
+    return ("nearest", charger_id)
+
+
+# --- Diffing ---
+def _same(old, new):
+    """Element-wise equality that treats two missing values as equal."""
+    return (old == new).fillna(False).to_numpy(dtype=bool) | (old.isna().to_numpy() & new.isna().to_numpy())
+
+
+def diff_stations(old, new, key=STATION_KEY):
+    """Compares two station frames row by row on `key`.
+
+    Returns {"added", "removed", "changed", "moved"} lists of keys, where "moved"
+    is the subset of "changed" whose coordinates differ.
+    """
+    old_keys = pd.Index(old[key])
+    new_keys = pd.Index(new[key])
+    if old_keys.equals(new_keys):
+        # Same stations in the same order (the usual edit): compare positionally, no re-alignment.
+        common, old_rows, new_rows = old_keys, old.drop(columns=key), new.drop(columns=key)
+    else:
+        common = old_keys.intersection(new_keys, sort=False)
+        old_rows = old.set_index(key).loc[common]
+        new_rows = new.set_index(key).loc[common]
+    differs = np.zeros(len(common), dtype=bool)
+    moved = np.zeros(len(common), dtype=bool)
+    for column in old_rows.columns:
+        unequal = ~_same(old_rows[column].reset_index(drop=True), new_rows[column].reset_index(drop=True))
+        differs |= unequal
+        if column in GEOMETRY_COLUMNS:
+            moved |= unequal
+    return {
+        "added": new_keys.difference(old_keys, sort=False).tolist(),
+        "removed": old_keys.difference(new_keys, sort=False).tolist(),
+        "changed": common[differs].tolist(),
+        "moved": common[moved].tolist(),
+    }
+
+
+def apply_diff(frame, new, diff, key=STATION_KEY):
+    """Returns `frame` with the diff's removed rows dropped, changed rows replaced and added rows appended.
+
+    Unchanged rows keep their relative order, so positions only shift when rows
+    are removed, and only the columns that differ in a changed row are rewritten.
+    """
+    if diff["removed"]:
+        frame = frame[~frame[key].isin(diff["removed"])]
+    if diff["changed"]:
+        positions = pd.Index(frame[key]).get_indexer(diff["changed"])
+        source = pd.Index(new[key]).get_indexer(diff["changed"])
+        frame = frame.copy(deep=False)
+        for column in frame.columns:
+            current = frame[column].iloc[positions].reset_index(drop=True)
+            replacement = new[column].iloc[source].reset_index(drop=True)
+            if not _same(current, replacement).all():
+                # The shallow copy shares its columns with the published snapshot; copy this one before writing
+                # to it, so readers never see the edit whether or not pandas copy-on-write is on.
+                frame[column] = frame[column].copy()
+                frame.iloc[positions, frame.columns.get_loc(column)] = replacement.to_numpy()
+    if diff["added"]:
+        frame = pd.concat([frame, new[new[key].isin(diff["added"])]])
+    return frame.reset_index(drop=True)
+
+
+def geometry_version(frame, key=STATION_KEY):
+    """Hash of station keys and coordinates; it changes only when stations are added, removed or moved."""
+    hashes = pd.util.hash_pandas_object(frame[[key, *GEOMETRY_COLUMNS]], index=False)
+    return hashlib.sha1(hashes.to_numpy().tobytes()).hexdigest()
+
+
+# --- Live Store ---
+class StationSnapshot:
+    """One immutable version of the station data with the indexes built on it."""
+
+    def __init__(self, frame, version, index, town_index, generation):
+        self.frame = frame
+        self.version = version
+        self.index = index
+        self.town_index = town_index
+        self.generation = generation
+        self.geometry_version = geometry_version(frame)
+
+
+class StationStore:
+    """Keeps the station table, its spatial and town indexes and rendered maps in sync with the source file.
+
+    `refresh()` checks the file's mtime and size (throttled to once per
+    `interval` seconds); when they change and the content hash differs, the new
+    rows are diffed against the current snapshot by Charger ID. Only the changed
+    rows are applied, the indexes are rebuilt only when positions, coordinates or
+    towns changed, and only the render-cache entries showing an affected station
+    are invalidated. Readers take `snapshot` once per rerun; it is swapped atomically.
+    """
+
+    def __init__(self, file_path, load, render_cache=None, interval=DEFAULT_INTERVAL, town_column=TOWN_COLUMN):
+        self.file_path = file_path
+        self.load = load
+        self.render_cache = render_cache
+        self.interval = interval
+        self.town_column = town_column
+        self.history = deque(maxlen=HISTORY_SIZE)
+        self._lock = threading.Lock()
+        self._checked = 0.0
+        self._stat = self._file_stat()
+        frame = load()
+        version = dataset_version(file_path)
+        self.snapshot = StationSnapshot(frame, version, StationIndex.from_frame(frame, version=version),
+                                        TownIndex(frame[town_column]), 0)
+        self._watcher = None
+
+    def _file_stat(self):
+        stat = os.stat(self.file_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def refresh(self, force=False):
+        """Applies changes from the source file, if any. Returns the diff applied, or None."""
+        now = time.monotonic()
+        if not force and now - self._checked < self.interval:
+            return None
+        with self._lock:
+            self._checked = now
+            stat = self._file_stat()
+            if not force and stat == self._stat:
+                return None
+            self._stat = stat
+            version = dataset_version(self.file_path)
+            current = self.snapshot
+            if version == current.version:
+                return None
+            return self._apply(current, self.load(), version)
+
+    def apply(self, new, version):
+        """Applies an already loaded station frame as `version`. Returns the diff applied."""
+        with self._lock:
+            return self._apply(self.snapshot, new, version)
+
+    def _apply(self, current, new, version):
+        old = current.frame
+        if list(new.columns) != list(old.columns):
+            diff = {"added": new[STATION_KEY].tolist(), "removed": old[STATION_KEY].tolist(),
+                    "changed": [], "moved": []}
+            frame = new.reset_index(drop=True)
+        else:
+            diff = diff_stations(old, new)
+            frame = apply_diff(old, new, diff)
+
+        reindexed = bool(diff["added"] or diff["removed"] or diff["moved"])
+        index = StationIndex.from_frame(frame, version=version) if reindexed else current.index
+        towns_changed = reindexed or self._towns_changed(old, frame, diff["changed"])
+        town_index = TownIndex(frame[self.town_column]) if towns_changed else current.town_index
+
+        snapshot = StationSnapshot(frame, version, index, town_index, current.generation + 1)
+        self.snapshot = snapshot
+        invalidated = self._invalidate(current, snapshot, diff) if self.render_cache is not None else 0
+        self.history.append({"time": time.time(), "version": version, "invalidated": invalidated,
+                             **{kind: len(keys) for kind, keys in diff.items()}})
+        return diff
+
+    def _towns_changed(self, old, new, changed):
+        if not changed:
+            return False
+        before = old[self.town_column].iloc[pd.Index(old[STATION_KEY]).get_indexer(changed)]
+        after = new[self.town_column].iloc[pd.Index(new[STATION_KEY]).get_indexer(changed)]
+        return not _same(before.reset_index(drop=True), after.reset_index(drop=True)).all()
+
+    def _invalidate(self, old, new, diff):
+        """Drops rendered maps (and their viewport layers) that show, or would now show, an added, removed or changed
+        station."""
+        affected = set(diff["added"]) | set(diff["removed"]) | set(diff["changed"])
+        if not affected:
+            return 0
+        masks = [(snapshot, snapshot.frame[STATION_KEY].isin(affected).to_numpy()) for snapshot in (old, new)]
+        statuses = set()
+        for snapshot, mask in masks:
+            statuses.update(snapshot.frame["Status"][mask])
+
+        def shows_affected(query):
+            return any(mask[snapshot.town_index.search(query)[0]].any() for snapshot, mask in masks)
+
+        def predicate(key):
+            key = map_key(key)
+            if key[0] == "stations" and len(key) == 3:
+                _, status, town = key
+                if town is not None:
+                    return shows_affected(town)
+                return status in (None, "All") or status in statuses
+            if key[0] == "nearest" and len(key) == 2:
+                return key[1] in affected
+            return False
+
+        return self.render_cache.invalidate(predicate)
+
+    # --- Background Watcher ---
+    def start(self):
+        """Starts a daemon thread that calls `refresh()` every `interval` seconds. Idempotent."""
+        with self._lock:
+            if self._watcher is not None:
+                return
+            self._watcher = threading.Thread(target=self._watch, name="station-watcher", daemon=True)
+            self._watcher.start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.refresh()
+            except Exception:
+                # A half-written file fails to parse; the next poll retries once it is complete.
+                self._stat = None
@@ -0,0 +1,285 @@
+import asyncio
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+# --- Telemetry Settings ---
+AVAILABILITY_STATES = ("Available", "In-Use", "Offline")
+# Share of simulated status reports per state, and the power drawn while in use.
+STATE_WEIGHTS = (0.55, 0.40, 0.05)
+POWER_RANGE_KW = (3.0, 50.0)
+DEFAULT_RATE = 10_000
+DEFAULT_QUEUE_SIZE = 4096
+DEFAULT_BATCH_SIZE = 1024
+DEFAULT_TICK = 0.01
+RATE_WINDOW = 5.0
+
+
+def state_codes(availability):
+    """Maps availability labels ("Available", "In-Use", ...) to state codes; unknown labels become "Offline"."""
+    codes = pd.Categorical(availability, categories=AVAILABILITY_STATES).codes.astype(np.int8)
+    codes[codes < 0] = AVAILABILITY_STATES.index("Offline")
+    return codes
+
+
+# --- State Table ---
+class TelemetryState:
+    """Latest status, power and meter reading of every connector, in flat arrays keyed by Charger ID.
+
+    Events are coalesced batch by batch: when a batch holds several events for
+    one connector, the latest wins. Every changed row records the version at
+    which it changed, so each reader can ask for the rows changed since the
+    version it last saw (see `changes`).
+    """
+
+    def __init__(self, charger_ids, states=None):
+        self._lock = threading.Lock()
+        self.version = 0
+        self.events = 0
+        self.unknown = 0
+        self._resize(np.asarray(charger_ids, dtype=np.int64), states)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _resize(self, ids, states):
+        """(Re)allocates the arrays for `ids`, keeping the values of connectors already tracked."""
+        previous = getattr(self, "_positions", None)
+        self.ids = ids
+        self._positions = pd.Index(ids)
+        count = len(ids)
+        fresh = {
+            "state": np.full(count, AVAILABILITY_STATES.index("Available"), dtype=np.int8),
+            "power_kw": np.zeros(count, dtype=np.float32),
+            "energy_kwh": np.zeros(count, dtype=np.float64),
+            "updated": np.full(count, np.nan),
+            "changed": np.zeros(count, dtype=np.int64),
+        }
+        if states is not None:
+            fresh["state"][:] = states
+        if previous is not None:
+            source = previous.get_indexer(ids)
+            kept = source >= 0
+            for name, values in fresh.items():
+                values[kept] = getattr(self, name)[source[kept]]
+        for name, values in fresh.items():
+            setattr(self, name, values)
+
+    def track(self, charger_ids, states=None):
+        """Starts tracking connectors that are not tracked yet (e.g. after the station table grew)."""
+        charger_ids = np.asarray(charger_ids, dtype=np.int64)
+        with self._lock:
+            new = ~pd.Index(charger_ids).isin(self.ids)
+            if not new.any():
+                return 0
+            added = charger_ids[new]
+            ids = np.concatenate([self.ids, added])
+            initial = None
+            if states is not None:
+                initial = np.concatenate([self.state, np.asarray(states, dtype=np.int8)[new]])
+            self._resize(ids, initial)
+            self.version += 1
+            self.changed[-len(added):] = self.version
+        return len(added)
+
+    def apply(self, ids, states, power_kw, energy_kwh, timestamps):
+        """Applies a batch of events given as parallel arrays. Events for unknown connectors are counted and dropped."""
+        # The last event of each connector in the batch wins.
+        unique_ids, first, counts = np.unique(np.asarray(ids)[::-1], return_index=True, return_counts=True)
+        last = len(ids) - 1 - first
+        with self._lock:
+            # Looked up under the lock: track() can swap the index and reallocate the arrays meanwhile.
+            positions = self._positions.get_indexer(unique_ids)
+            known = positions >= 0
+            unique, last = positions[known], last[known]
+            self.version += 1
+            self.state[unique] = states[last]
+            self.power_kw[unique] = power_kw[last]
+            self.energy_kwh[unique] = energy_kwh[last]
+            self.updated[unique] = timestamps[last]
+            self.changed[unique] = self.version
+            events = int(counts[known].sum())
+            self.events += events
+            self.unknown += len(ids) - events
+
+    def apply_events(self, events):
+        """Applies a batch of (charger id, state code, power kW, meter kWh, timestamp) tuples."""
+        ids, states, power_kw, energy_kwh, timestamps = zip(*events)
+        self.apply(np.fromiter(ids, np.int64, len(events)), np.fromiter(states, np.int8, len(events)),
+                   np.fromiter(power_kw, np.float32, len(events)), np.fromiter(energy_kwh, np.float64, len(events)),
+                   np.fromiter(timestamps, np.float64, len(events)))
+
+    def _frame(self, positions):
+        return pd.DataFrame({
+            "Charger ID": self.ids[positions],
+            "Availability": pd.Categorical.from_codes(self.state[positions], AVAILABILITY_STATES),
+            "Power (kW)": self.power_kw[positions],
+            "Energy (kWh)": self.energy_kwh[positions],
+            "Updated": pd.to_datetime(self.updated[positions], unit="s"),
+        })
+
+    def changes(self, since=0):
+        """Returns (version, rows changed after version `since`); pass the returned version next time."""
+        with self._lock:
+            positions = np.flatnonzero(self.changed > since)
+            return self.version, self._frame(positions)
+
+    def snapshot(self):
+        """Returns the whole state table."""
+        with self._lock:
+            return self._frame(np.arange(len(self.ids)))
+
+    def counts(self):
+        """Returns {availability: connectors in that state}."""
+        with self._lock:
+            counts = np.bincount(self.state, minlength=len(AVAILABILITY_STATES))
+        return dict(zip(AVAILABILITY_STATES, counts.tolist()))
+
+
+# --- Producer and Consumer ---
+class TelemetrySimulator:
+    """Stands in for the chargers: emits status, power and meter events for the tracked connectors.
+
+    Events are generated in ticks of `tick` seconds at `rate` events/s (as fast
+    as the queue accepts them when `rate` is None). Each event is awaited into
+    the bounded queue, so a slow consumer throttles the simulator instead of
+    growing memory; `stalls` counts the puts that had to wait.
+    """
+
+    def __init__(self, state, rate=DEFAULT_RATE, tick=DEFAULT_TICK, seed=0):
+        self.state = state
+        self.rate = rate
+        self.tick = tick
+        self.rng = np.random.default_rng(seed)
+        self.meters = np.zeros(len(state))
+        self.sent = 0
+        self.stalls = 0
+
+    def _events(self, count, now):
+        ids = self.state.ids
+        if len(self.meters) < len(ids):
+            self.meters = np.concatenate([self.meters, np.zeros(len(ids) - len(self.meters))])
+        positions = self.rng.integers(0, len(ids), count)
+        states = self.rng.choice(len(AVAILABILITY_STATES), count, p=STATE_WEIGHTS).astype(np.int8)
+        in_use = states == AVAILABILITY_STATES.index("In-Use")
+        power = np.where(in_use, self.rng.uniform(*POWER_RANGE_KW, count), 0.0)
+        # Meters advance by the energy delivered during the tick; every report carries the reading after it.
+        np.add.at(self.meters, positions, power * self.tick / 3600)
+        return zip(ids[positions].tolist(), states.tolist(), power.tolist(), self.meters[positions].tolist(),
+                   [now] * count)
+
+    async def run(self, queue, duration=None):
+        """Produces events until cancelled or for `duration` seconds."""
+        start = time.monotonic()
+        ticks = 0
+        while duration is None or time.monotonic() - start < duration:
+            # Unpaced ticks offer twice what the queue holds, so the producer runs into backpressure.
+            if self.rate is None:
+                count = 2 * (queue.maxsize or DEFAULT_BATCH_SIZE)
+            else:
+                count = max(1, round(self.rate * self.tick))
+            for event in self._events(count, time.time()):
+                if queue.full():
+                    self.stalls += 1
+                await queue.put(event)
+            self.sent += count
+            ticks += 1
+            if self.rate is None:
+                await asyncio.sleep(0)
+            else:
+                # Pace against the schedule, not the previous tick, so time spent blocked is caught up.
+                await asyncio.sleep(max(0.0, start + ticks * self.tick - time.monotonic()))
+
+
+class TelemetryIngestor:
+    """Drains the bounded event queue in batches into a `TelemetryState`."""
+
+    def __init__(self, state, maxsize=DEFAULT_QUEUE_SIZE, batch_size=DEFAULT_BATCH_SIZE):
+        self.state = state
+        self.queue = asyncio.Queue(maxsize)
+        self.batch_size = batch_size
+        self.batches = 0
+        self.max_depth = 0
+        self.lag = deque(maxlen=1000)
+
+    async def run(self):
+        """Consumes events until cancelled."""
+        queue = self.queue
+        while True:
+            batch = [await queue.get()]
+            self.max_depth = max(self.max_depth, queue.qsize() + 1)
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            self.state.apply_events(batch)
+            self.batches += 1
+            self.lag.append(time.time() - batch[0][4])
+
+
+# --- Background Feed ---
+class TelemetryFeed:
+    """Runs a simulator and an ingestor on a private asyncio loop in a daemon thread.
+
+    Streamlit scripts are synchronous, so the feed lives beside them: sessions
+    read `state` (thread-safe) from a periodically rerun fragment, which
+    throttles what each browser receives to one delta per refresh however many
+    events arrived in between.
+    """
+
+    def __init__(self, state, rate=DEFAULT_RATE, maxsize=DEFAULT_QUEUE_SIZE, batch_size=DEFAULT_BATCH_SIZE):
+        self.state = state
+        self.rate = rate
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.simulator = None
+        self.ingestor = None
+        self._samples = deque(maxlen=64)
+        self._thread = None
+        self._loop = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Starts the feed thread. Idempotent."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=asyncio.run, args=(self._main(),), name="telemetry-feed",
+                                            daemon=True)
+            self._thread.start()
+
+    async def _main(self):
+        self._loop = asyncio.get_running_loop()
+        self.ingestor = TelemetryIngestor(self.state, self.maxsize, self.batch_size)
+        self.simulator = TelemetrySimulator(self.state, self.rate)
+        self._tasks = [asyncio.create_task(self.ingestor.run()),
+                       asyncio.create_task(self.simulator.run(self.ingestor.queue))]
+        try:
+            await asyncio.gather(*self._tasks)
+        except asyncio.CancelledError:
+            pass
+
+    def stop(self):
+        """Cancels the producer and consumer; the thread exits once they finish."""
+        if self._loop is not None:
+            for task in self._tasks:
+                self._loop.call_soon_threadsafe(task.cancel)
+
+    def stats(self):
+        """Returns events/s over the last few seconds, queue depth and backpressure counters."""
+        now = time.monotonic()
+        self._samples.append((now, self.state.events))
+        while len(self._samples) > 2 and now - self._samples[0][0] > RATE_WINDOW:
+            self._samples.popleft()
+        (first_time, first_events), (last_time, last_events) = self._samples[0], self._samples[-1]
+        elapsed = last_time - first_time
+        ingestor, simulator = self.ingestor, self.simulator
+        return {
+            "events_per_s": (last_events - first_events) / elapsed if elapsed > 0 else 0.0,
+            "events": last_events,
+            "queue_depth": ingestor.queue.qsize() if ingestor else 0,
+            "queue_size": self.maxsize,
+            "stalls": simulator.stalls if simulator else 0,
+            "lag_ms": float(np.median(ingestor.lag)) * 1000 if ingestor and ingestor.lag else 0.0,
+        }
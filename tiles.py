@@ -0,0 +1,225 @@
+import json
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from ingest import CACHE_DIR, building_dir
+from pools import preload, process_pool
+
+# --- Pyramid Settings ---
+TILE_DIR = os.path.join(CACHE_DIR, "tiles")
+TILE_SIZE = 256
+MIN_ZOOM = 5
+MAX_ZOOM = 12
+BINS_PER_TILE = 16
+MAX_LATITUDE = 85.05112878
+preload(__name__)
+
+
+# --- Web Mercator Helpers ---
+def lonlat_to_tile(lat, lon, zoom):
+    """Returns fractional slippy-map tile coordinates (x, y) for points at a zoom level."""
+    lat = np.clip(np.asarray(lat, dtype=np.float64), -MAX_LATITUDE, MAX_LATITUDE)
+    lon = np.asarray(lon, dtype=np.float64)
+    scale = 2.0 ** zoom
+    x = (lon + 180.0) / 360.0 * scale
+    lat_rad = np.radians(lat)
+    y = (1.0 - np.log(np.tan(lat_rad) + 1.0 / np.cos(lat_rad)) / math.pi) / 2.0 * scale
+    return x, y
+
+
+def tile_to_lonlat(x, y, zoom):
+    """Inverse of lonlat_to_tile: returns (lat, lon) of fractional tile coordinates."""
+    scale = 2.0 ** zoom
+    lon = np.asarray(x, dtype=np.float64) / scale * 360.0 - 180.0
+    lat = np.degrees(np.arctan(np.sinh(math.pi * (1.0 - 2.0 * np.asarray(y, dtype=np.float64) / scale))))
+    return lat, lon
+
+
+def viewport_bounds(center, zoom, width=800, height=500):
+    """Returns (south, west, north, east) of a map of `width` x `height` pixels centred on `center`."""
+    cx, cy = lonlat_to_tile(center[0], center[1], zoom)
+    half_w = width / 2.0 / TILE_SIZE
+    half_h = height / 2.0 / TILE_SIZE
+    north, west = tile_to_lonlat(cx - half_w, cy - half_h, zoom)
+    south, east = tile_to_lonlat(cx + half_w, cy + half_h, zoom)
+    return float(south), float(west), float(north), float(east)
+
+
+def tiles_in_view(bounds, zoom):
+    """Lists the (x, y) tiles that intersect (south, west, north, east) at a zoom level."""
+    south, west, north, east = bounds
+    x0, y0 = lonlat_to_tile(north, west, zoom)
+    x1, y1 = lonlat_to_tile(south, east, zoom)
+    limit = 2 ** zoom - 1
+    xs = range(max(int(x0), 0), min(int(x1), limit) + 1)
+    ys = range(max(int(y0), 0), min(int(y1), limit) + 1)
+    return [(x, y) for x in xs for y in ys]
+
+
+def in_bounds(lat, lon, bounds):
+    """Boolean mask of points that fall inside (south, west, north, east)."""
+    south, west, north, east = bounds
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    return (lat >= south) & (lat <= north) & (lon >= west) & (lon <= east)
+
+
+# --- Pyramid Construction ---
+def pyramid_dir(layer, version):
+    return os.path.join(TILE_DIR, layer, str(version))
+
+
+def _tile_path(root, zoom, x, y):
+    return os.path.join(root, str(zoom), str(x), f"{y}.json")
+
+
+def render_zoom_level(root, zoom, lat, lon, values, version):
+    """Aggregates points into the tiles of one zoom level and writes them as JSON.
+
+    Returns (tile count, largest cell mean) so maps can keep one colour scale while loading tiles per viewport.
+    """
+    x, y = lonlat_to_tile(lat, lon, zoom)
+    tile_x = np.floor(x).astype(np.int64)
+    tile_y = np.floor(y).astype(np.int64)
+    # Sub-tile bins: BINS_PER_TILE x BINS_PER_TILE cells per 256 px tile.
+    bin_x = np.floor(x * BINS_PER_TILE).astype(np.int64)
+    bin_y = np.floor(y * BINS_PER_TILE).astype(np.int64)
+    span = 2 ** zoom * BINS_PER_TILE
+    keys, inverse = np.unique(bin_y * span + bin_x, return_inverse=True)
+    counts = np.bincount(inverse)
+    sums = np.bincount(inverse, weights=values)
+    peaks = np.full(len(keys), -np.inf)
+    np.maximum.at(peaks, inverse, values)
+
+    cell_x, cell_y = keys % span, keys // span
+    center_lat, center_lon = tile_to_lonlat((cell_x + 0.5) / BINS_PER_TILE, (cell_y + 0.5) / BINS_PER_TILE, zoom)
+    owner_x, owner_y = cell_x // BINS_PER_TILE, cell_y // BINS_PER_TILE
+    owner = owner_y * 2 ** zoom + owner_x
+    order = np.argsort(owner, kind="stable")
+    boundaries = np.flatnonzero(np.diff(owner[order])) + 1
+
+    n_tiles = 0
+    for group in np.split(order, boundaries):
+        tx, ty = int(owner_x[group[0]]), int(owner_y[group[0]])
+        cells = np.column_stack((center_lat[group], center_lon[group],
+                                 sums[group] / counts[group], peaks[group], counts[group]))
+        path = _tile_path(root, zoom, tx, ty)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump({"z": zoom, "x": tx, "y": ty, "version": version,
+                       "fields": ["latitude", "longitude", "mean", "max", "count"],
+                       "cells": np.round(cells, 6).tolist()}, handle, separators=(",", ":"))
+        n_tiles += 1
+    return n_tiles, float((sums / counts).max()) if len(keys) else 0.0
+
+
+def row_bands(rows, bands):
+    """Splits the tile rows of some points into up to `bands` contiguous [first, stop) ranges of about equal points."""
+    if not len(rows):
+        return []
+    first = int(rows.min())
+    cumulative = np.cumsum(np.bincount(rows - first))
+    cuts = np.searchsorted(cumulative, cumulative[-1] * np.arange(1, bands) / bands) + 1
+    edges = np.unique(np.concatenate(([0], cuts, [len(cumulative)])))
+    return [(first + int(a), first + int(b)) for a, b in zip(edges[:-1], edges[1:])]
+
+
+def render_row_band(root, zoom, first_row, stop_row, paths, version):
+    """Renders the tiles in rows [first_row, stop_row) of one zoom level from the memory-mapped point columns.
+
+    Only the latitudes are scanned in full; the band's points are copied out and the rest stay on disk.
+    """
+    lat, lon, values = (np.load(path, mmap_mode="r") for path in paths)
+    north = tile_to_lonlat(0, first_row, zoom)[0] if first_row > 0 else np.inf
+    south = tile_to_lonlat(0, stop_row, zoom)[0] if stop_row < 2 ** zoom else -np.inf
+    # A slightly wider latitude band; the exact row test below settles points on its edges.
+    candidates = np.flatnonzero((lat <= north + 1e-6) & (lat >= south - 1e-6))
+    lat, lon, values = (np.asarray(column[candidates], dtype=np.float64) for column in (lat, lon, values))
+    rows = np.floor(lonlat_to_tile(lat, 0.0, zoom)[1])
+    keep = (rows >= first_row) & (rows < stop_row) & ~(np.isnan(lon) | np.isnan(values))
+    return render_zoom_level(root, zoom, lat[keep], lon[keep], values[keep], version)
+
+
+def build_pyramid(layer, version, paths, min_zoom=MIN_ZOOM, max_zoom=MAX_ZOOM, max_workers=None):
+    """Renders a zoom-level pyramid of aggregated tiles, in parallel bands of tile rows.
+
+    `paths` are the .npy files of the latitude, longitude and value columns (see
+    `ingest.numeric_column_files`). Each zoom level is split into bands of whole
+    tile rows holding about the same number of points, so deep levels are shared
+    between workers; tasks carry only file paths and map the columns themselves.
+    """
+    lat = np.load(paths[0], mmap_mode="r")
+    lat = np.asarray(lat[~np.isnan(lat)], dtype=np.float64)
+    workers = max_workers or os.cpu_count() or 1
+    # Rows at a lower zoom are the deepest level's rows halved, so the tile projection runs once.
+    deepest = np.floor(lonlat_to_tile(lat, 0.0, max_zoom)[1]).astype(np.int64)
+    tasks = [(zoom, first, stop) for zoom in range(max_zoom, min_zoom - 1, -1)
+             for first, stop in row_bands(deepest >> (max_zoom - zoom), workers)]
+
+    zooms = list(range(min_zoom, max_zoom + 1))
+    with building_dir(pyramid_dir(layer, version)) as tmp_root:
+        if workers == 1:
+            results = [render_row_band(tmp_root, zoom, first, stop, paths, version) for zoom, first, stop in tasks]
+        else:
+            with process_pool(workers) as pool:
+                futures = [pool.submit(render_row_band, tmp_root, zoom, first, stop, paths, version)
+                           for zoom, first, stop in tasks]
+                results = [future.result() for future in futures]
+        counts, peaks = dict.fromkeys(zooms, 0), {}
+        for (zoom, _, _), (n_tiles, peak) in zip(tasks, results):
+            counts[zoom] += n_tiles
+            if n_tiles:
+                peaks[zoom] = max(peaks.get(zoom, peak), peak)
+
+        manifest = {"layer": layer, "version": version, "min_zoom": min_zoom, "max_zoom": max_zoom,
+                    "points": int(len(lat)), "tiles": {str(zoom): counts[zoom] for zoom in zooms},
+                    "peaks": {str(zoom): peaks.get(zoom, 0.0) for zoom in zooms}}
+        with open(os.path.join(tmp_root, "pyramid.json"), "w", encoding="utf-8") as handle:
+            json.dump(manifest, handle, indent=2)
+    return manifest
+
+
+def read_pyramid_manifest(layer, version):
+    """Returns the manifest of a finished pyramid, or None if it has not been built."""
+    try:
+        with open(os.path.join(pyramid_dir(layer, version), "pyramid.json"), "r", encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def ensure_pyramid(layer, version, paths, **kwargs):
+    """Builds the pyramid for a dataset version unless it is already on disk."""
+    manifest = read_pyramid_manifest(layer, version)
+    if manifest is None:
+        manifest = build_pyramid(layer, version, paths, **kwargs)
+    return manifest
+
+
+# --- Tile Reads ---
+def pyramid_zoom(manifest, zoom):
+    """The pyramid level served for a map zoom: the zoom itself, clamped to the levels that were built."""
+    return min(max(int(zoom), manifest["min_zoom"]), manifest["max_zoom"])
+
+
+def load_tiles(layer, version, zoom, bounds):
+    """Reads the cached tiles that intersect the viewport and returns their cells as one frame."""
+    manifest = read_pyramid_manifest(layer, version)
+    if manifest is None:
+        raise FileNotFoundError(f"No tile pyramid for {layer} version {version}.")
+    zoom = pyramid_zoom(manifest, zoom)
+    root = pyramid_dir(layer, version)
+    frames = []
+    for x, y in tiles_in_view(bounds, zoom):
+        path = _tile_path(root, zoom, x, y)
+        if not os.path.exists(path):
+            continue  # No data in this tile.
+        with open(path, "r", encoding="utf-8") as handle:
+            tile = json.load(handle)
+        frames.append(pd.DataFrame(tile["cells"], columns=tile["fields"]))
+    if not frames:
+        return pd.DataFrame(columns=["latitude", "longitude", "mean", "max", "count"])
+    return pd.concat(frames, ignore_index=True)
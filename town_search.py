@@ -0,0 +1,179 @@
+import bisect
+import difflib
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+GRAM_SIZE = 3
+QUERY_CACHE_SIZE = 1024
+NON_ALNUM = re.compile(r"[^0-9a-z]+")
+ALIAS_SEPARATORS = re.compile(r"[()/,]")
+
+
+# --- Normalization ---
+def normalize(text):
+    """Lower-cases, strips accents and punctuation, and collapses whitespace."""
+    text = str(text)
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(NON_ALNUM.sub(" ", text.casefold()).split())
+
+
+def aliases(text):
+    """Returns the normalized names a value is known by.
+
+    "Ruhengeri (Musanze)" is indexed as the full name plus "ruhengeri" and "musanze";
+    names separated by "/" or "," are split the same way.
+    """
+    names = {normalize(text)}
+    for part in ALIAS_SEPARATORS.split(str(text)):
+        part = normalize(part)
+        if part:
+            names.add(part)
+    names.discard("")
+    return names
+
+
+def _grams(text):
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+# --- Search Index ---
+class TownIndex:
+    """Inverted index over a text column (towns or addresses) for search-as-you-type.
+
+    The column is reduced to its distinct values once; trigram postings answer
+    substring queries, a sorted token list answers prefix queries, and a token
+    vocabulary answers fuzzy queries. Results are positional row numbers into the
+    indexed column, sorted ascending.
+    """
+
+    def __init__(self, values):
+        series = pd.Series(values, dtype=object)
+        codes, uniques = pd.factorize(series.where(series.notna(), None), use_na_sentinel=True)
+        self.size = len(series)
+        self.labels = [str(value) for value in uniques]
+        self.normalized = [normalize(value) for value in self.labels]
+
+        # Rows of each distinct value, grouped by one stable sort of the codes.
+        order = np.argsort(codes, kind="stable")
+        sorted_codes = codes[order]
+        bounds = np.searchsorted(sorted_codes, np.arange(len(uniques) + 1))
+        self._rows = [order[bounds[i]:bounds[i + 1]] for i in range(len(uniques))]
+
+        postings = defaultdict(list)
+        token_pairs = set()
+        for value_id, label in enumerate(self.labels):
+            for gram in _grams(self.normalized[value_id]):
+                postings[gram].append(value_id)
+            for name in aliases(label):
+                token_pairs.add((name, value_id))
+                for token in name.split():
+                    token_pairs.add((token, value_id))
+        self._postings = {gram: np.array(ids, dtype=np.int64) for gram, ids in postings.items()}
+        self._tokens = sorted(token_pairs)
+        self._token_keys = [token for token, _ in self._tokens]
+        # Fuzzy matching compares single words only; whole names are covered by prefix/contains.
+        self._vocabulary = sorted({token for token in self._token_keys if " " not in token})
+        # One index serves every session, so the query cache is shared across threads.
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.size
+
+    def _rows_for(self, value_ids):
+        if not len(value_ids):
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate([self._rows[value_id] for value_id in value_ids]))
+
+    def _memoized(self, kind, query, compute):
+        key = (kind, query)
+        result = self._cache.get(key)
+        if result is None:
+            result = compute()
+            result.flags.writeable = False
+            with self._lock:
+                if len(self._cache) >= QUERY_CACHE_SIZE:
+                    self._cache.pop(next(iter(self._cache)), None)
+                self._cache[key] = result
+        return result
+
+    # --- Value-level lookups ---
+    def _contains_ids(self, query):
+        if len(query) < GRAM_SIZE:
+            return [i for i, text in enumerate(self.normalized) if query in text]
+        postings = []
+        for gram in _grams(query):
+            ids = self._postings.get(gram)
+            if ids is None:
+                return []
+            postings.append(ids)
+        postings.sort(key=len)
+        candidates = postings[0]
+        for ids in postings[1:]:
+            candidates = np.intersect1d(candidates, ids, assume_unique=True)
+            if not len(candidates):
+                return []
+        # Trigrams can match out of order, so confirm the real substring.
+        return [i for i in candidates.tolist() if query in self.normalized[i]]
+
+    def _prefix_ids(self, query):
+        start = bisect.bisect_left(self._token_keys, query)
+        end = bisect.bisect_left(self._token_keys, query + "\uffff", lo=start)
+        return sorted({value_id for _, value_id in self._tokens[start:end]})
+
+    def _fuzzy_ids(self, query, limit, cutoff):
+        close = difflib.get_close_matches(query, self._vocabulary, n=limit, cutoff=cutoff)
+        ids = set()
+        for token in close:
+            ids.update(self._prefix_ids(token))
+        return sorted(ids)
+
+    # --- Public queries ---
+    def contains(self, query):
+        """Rows whose value contains `query` (case-, accent- and punctuation-insensitive)."""
+        query = normalize(query)
+        if not query:
+            return np.empty(0, dtype=np.int64)
+        return self._memoized("contains", query, lambda: self._rows_for(self._contains_ids(query)))
+
+    def prefix(self, query):
+        """Rows whose value, one of its aliases or one of its words starts with `query`."""
+        query = normalize(query)
+        if not query:
+            return np.empty(0, dtype=np.int64)
+        return self._memoized("prefix", query, lambda: self._rows_for(self._prefix_ids(query)))
+
+    def fuzzy(self, query, limit=5, cutoff=0.75):
+        """Rows whose words are close to `query`, tolerating typos such as "Musnaze"."""
+        query = normalize(query)
+        if not query:
+            return np.empty(0, dtype=np.int64)
+        return self._memoized(("fuzzy", limit, cutoff), query,
+                              lambda: self._rows_for(self._fuzzy_ids(query, limit, cutoff)))
+
+    def search(self, query):
+        """Substring match, falling back to fuzzy matching. Returns (rows, match kind)."""
+        rows = self.contains(query)
+        if len(rows):
+            return rows, "contains"
+        rows = self.fuzzy(query)
+        return rows, ("fuzzy" if len(rows) else None)
+
+    def suggest(self, query, limit=10):
+        """Typeahead suggestions: distinct values matching `query` by prefix, then substring."""
+        query = normalize(query)
+        if not query:
+            return []
+        ids = self._prefix_ids(query)
+        if len(ids) < limit:
+            seen = set(ids)
+            ids = ids + [i for i in self._contains_ids(query) if i not in seen]
+        ranked = sorted(ids[:max(limit * 5, limit)], key=lambda i: (-len(self._rows[i]), self.labels[i]))
+        return [self.labels[i] for i in ranked[:limit]]